@@ -1,18 +1,20 @@
 from flask import Flask
 from dotenv import load_dotenv
 from pathlib import Path
-from sqlalchemy import inspect, text
 import os
 
+from config import Config
+from logging_config import configurar_logging
+from estaticos import configurar_estaticos
+from json_provider import JSONProviderRapido
+
 # Importações de blueprints
 from controller.CategoriaController import categoria_bp
 from controller.ProdutoController import produto_bp
+from controller.StatsController import stats_bp
 
 # Extensões
-from extensions import db, bcrypt, login_manager, oauth
-
-# Modelos
-from model.UserModel import UsuarioModel
+from extensions import db, bcrypt, login_manager, oauth, migrate, cardapio_cache, metricas_pool, usuario_cache, instrumentacao, cardapio_publico, roteador_replicas, contadores_catalogo
 
 # Blueprint principal
 from main_routes import main_bp
@@ -25,12 +27,12 @@ def create_app():
 
     # Configuração do aplicativo Flask
     app = Flask(__name__, template_folder="templates")
+    app.json = JSONProviderRapido(app)
     
-    # Configurações
-    app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "chave-secreta-padrao-mude-isso")
-    database_url = os.environ.get("DATABASE_URL", "").replace("postgres://", "postgresql://", 1)
-    app.config["SQLALCHEMY_DATABASE_URI"] = database_url or "sqlite:///database.db"
-    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Configurações (banco, pool de conexões, cache) lidas do ambiente
+    app.config.from_object(Config())
+    configurar_logging(app)
+    configurar_estaticos(app)
     
     # Inicializar extensões
     initialize_extensions(app)
@@ -38,31 +40,43 @@ def create_app():
     # Registrar Blueprints
     register_blueprints(app)
     
-    # Configurar banco de dados
-    with app.app_context():
-        check_database(app)
+    # Esquema do banco: nenhuma DDL no boot, use `python migrations.py`
+    if app.config["DB_AUTO_CREATE"]:
+        create_dev_schema(app)
     
     return app
 
 def initialize_extensions(app):
     """Inicializar todas as extensões Flask"""
     db.init_app(app)
+    roteador_replicas.init_app(app, db)
+    metricas_pool.init_app(app, db)
+    instrumentacao.init_app(app, db)
+    migrate.init_app(app, db, directory=str(Path(__file__).parent / "migrations"))
     bcrypt.init_app(app)
     login_manager.init_app(app)
     oauth.init_app(app)
+    cardapio_cache.init_app(app)
+    usuario_cache.init_app(app)
+    cardapio_publico.init_app(app)
+    contadores_catalogo.init_app(app, db)
     
     # Configuração OAuth Google
     app.google = oauth.register(
         name='google',
         client_id=os.environ.get("GOOGLE_CLIENT_ID"),
         client_secret=os.environ.get("GOOGLE_CLIENT_SECRET"),
-        access_token_url='https://oauth2.googleapis.com/token',
-        authorize_url='https://accounts.google.com/o/oauth2/auth',
+        access_token_url=app.config["GOOGLE_TOKEN_URL"],
+        authorize_url=app.config["GOOGLE_AUTHORIZE_URL"],
         api_base_url='https://www.googleapis.com/',
-        userinfo_endpoint='https://openidconnect.googleapis.com/v1/userinfo',
-        jwks_uri='https://www.googleapis.com/oauth2/v3/certs',
-        client_kwargs={'scope': 'openid email profile'}
+        userinfo_endpoint=app.config["GOOGLE_USERINFO_URL"],
+        jwks_uri=app.config["GOOGLE_JWKS_URI"],
+        client_kwargs={
+            'scope': 'openid email profile',
+            'default_timeout': app.config["GOOGLE_HTTP_TIMEOUT"],
+        }
     )
+    app.google.jwks_ttl = app.config["GOOGLE_JWKS_TTL"]
     
     # Configurar login manager
     login_manager.login_view = "main.login"
@@ -70,43 +84,21 @@ def initialize_extensions(app):
     
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(UsuarioModel, int(user_id))
+        return usuario_cache.carregar(int(user_id))
 
 def register_blueprints(app):
     """Registrar todos os blueprints"""
     app.register_blueprint(categoria_bp)
     app.register_blueprint(produto_bp)
     app.register_blueprint(main_bp)
+    app.register_blueprint(stats_bp)
 
-def check_database(app):
-    """Verificar e configurar o banco de dados"""
-    try:
-        inspector = inspect(db.engine)
-        if 'usuarios' not in inspector.get_table_names():
-            db.create_all()
-        
-        # Verificar e adicionar colunas se necessário
-        columns = [col['name'] for col in inspector.get_columns('usuarios')]
-        if 'google_login' not in columns:
-            db.session.execute(text('ALTER TABLE usuarios ADD COLUMN google_login BOOLEAN DEFAULT FALSE'))
-        if 'google_id' not in columns:
-            db.session.execute(text('ALTER TABLE usuarios ADD COLUMN google_id VARCHAR(100)'))
-        
-        # Remover NOT NULL da coluna senha se existir
-        try:
-            db.session.execute(text('ALTER TABLE usuarios ALTER COLUMN senha DROP NOT NULL'))
-        except:
-            pass  # Se já não tiver NOT NULL, ignora o erro
-        
-        db.session.commit()
-        db.create_all()
-    except Exception as e:
-        print(f"❌ Erro no banco: {e}")
-        db.drop_all()
+def create_dev_schema(app):
+    """Criar as tabelas que faltam (apenas desenvolvimento, com DB_AUTO_CREATE=True)"""
+    with app.app_context():
         db.create_all()
 
-app = create_app()
-
 if __name__ == "__main__":
-    print("✅ Aplicativo pronto para produção")
-    app.run(host="0.0.0.0", port=5000, debug=False)  # debug=False em produção
\ No newline at end of file
+    app = create_app()
+    app.logger.info("✅ Aplicativo pronto para produção")
+    app.run(host="0.0.0.0", port=5000, debug=False)  # debug=False em produção
@@ -0,0 +1,246 @@
+"""
+Entrada ASGI opcional (ao lado do wsgi.py): as leituras mais frequentes do
+catálogo (GET /api/produtos/, /api/categorias/ e /api/produtos/cardapio)
+rodam num event loop com engine e sessões assíncronas do SQLAlchemy, então
+um worker atende muitas requisições esperando o Postgres ao mesmo tempo.
+
+Todo o resto (escritas, páginas, login, parâmetros inválidos, sessão sem
+usuário) segue para o app Flask de sempre, pelo adaptador WSGI do asgiref.
+As consultas são as mesmas dos repositórios (consulta_* devolvem o SELECT
+sem executar), o ETag/304 é o do get_condicional e o cache do cardápio é
+o mesmo cardapio_cache.
+
+Requer requirements-async.txt:
+    uvicorn asgi:app --workers 2
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker -w 2
+"""
+import gzip
+import logging
+import time
+import uuid
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+from itsdangerous import BadSignature
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.datastructures import Headers, MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import http_date, parse_accept_header, parse_cookie, parse_date, parse_etags
+
+from Main import create_app
+from extensions import db, cardapio_cache, usuario_cache
+from controller.ProdutoController import parse_listagem_args
+from model.UserModel import UsuarioModel, UsuarioAutenticado
+from repository.CatalogoVersaoRepository import CatalogoVersaoRepository
+from repository.CategoriaRepository import CategoriaRepository
+from repository.ProdutoRepository import ProdutoRepository
+from serializacao import linhas_para_dicts
+from service.CardapioService import CardapioService
+from service.CatalogoVersaoService import avaliar_condicional
+
+logger = logging.getLogger(__name__)
+log_requisicao = logging.getLogger('requisicao')
+
+# Driver assíncrono equivalente ao do DATABASE_URL
+DRIVERS_ASSINCRONOS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+
+def criar_engine_assincrona(app):
+    """Engine assíncrona para o mesmo banco e com os mesmos limites de pool do app"""
+    with app.app_context():
+        url = db.engine.url
+    backend = url.get_backend_name()
+    if backend not in DRIVERS_ASSINCRONOS:
+        raise RuntimeError(f"Banco '{backend}' sem driver assíncrono configurado")
+
+    config = app.config
+    opcoes = {'echo': config["SQLALCHEMY_ECHO"], 'pool_pre_ping': config["DB_POOL_PRE_PING"]}
+    if backend == 'postgresql':
+        # O asyncpg não entende sslmode/options da URL do psycopg2
+        connect_args = {'server_settings': {'statement_timeout': str(config["DB_STATEMENT_TIMEOUT_MS"])}}
+        if 'sslmode' in url.query:
+            connect_args['ssl'] = url.query['sslmode']
+            url = url.difference_update_query(['sslmode'])
+        opcoes.update({
+            'pool_size': config["DB_POOL_SIZE"],
+            'max_overflow': config["DB_MAX_OVERFLOW"],
+            'pool_timeout': config["DB_POOL_TIMEOUT"],
+            'pool_recycle': config["DB_POOL_RECYCLE"],
+            'connect_args': connect_args,
+        })
+    return create_async_engine(url.set(drivername=DRIVERS_ASSINCRONOS[backend]), **opcoes)
+
+
+class Requisicao:
+    """O pouco do scope ASGI que as leituras precisam"""
+
+    def __init__(self, scope):
+        self.metodo = scope['method']
+        self.path = scope['path']
+        self.query_string = scope.get('query_string', b'').decode('utf-8', 'replace')
+        self.headers = Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in scope['headers']])
+        self.args = MultiDict(parse_qsl(self.query_string, keep_blank_values=True))
+        self.full_path = f"{self.path}?{self.query_string}"
+        self.request_id = self.headers.get('X-Request-ID') or uuid.uuid4().hex
+        self.inicio = time.perf_counter()
+
+
+class LeituraAssincrona:
+    """App ASGI: atende as leituras com sessões assíncronas e repassa o resto ao Flask"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.engine = criar_engine_assincrona(flask_app)
+        self.sessoes = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.serializador_sessao = flask_app.session_interface.get_signing_serializer(flask_app)
+        self.rotas = {
+            '/api/produtos/': self.listar_produtos,
+            '/api/categorias/': self.listar_categorias,
+            '/api/produtos/cardapio': self.cardapio,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        rota = self.rotas.get(scope['path']) if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD') else None
+        if rota is not None:
+            requisicao = Requisicao(scope)
+            resposta = None
+            try:
+                usuario = await self._usuario_logado(requisicao)
+                if usuario is not None:
+                    resposta = await self._condicional(requisicao, usuario, rota)
+            except HTTPException:
+                # Parâmetro inválido: o Flask monta a mesma resposta de erro
+                pass
+            except Exception:
+                logger.exception("Erro na leitura assíncrona de %s; repassando ao Flask", requisicao.path)
+            if resposta is not None:
+                return await self._enviar(send, requisicao, *resposta)
+
+        await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensagem['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _usuario_logado(self, requisicao):
+        """Usuário do cookie de sessão do Flask; None deixa o Flask-Login decidir (remember, 401...)"""
+        cookie = parse_cookie(requisicao.headers.get('Cookie', '')).get(self.flask_app.config["SESSION_COOKIE_NAME"])
+        if not cookie:
+            return None
+        try:
+            sessao = self.serializador_sessao.loads(
+                cookie, max_age=int(self.flask_app.permanent_session_lifetime.total_seconds())
+            )
+        except BadSignature:
+            return None
+        usuario_id = sessao.get('_user_id')
+        if not usuario_id:
+            return None
+        return await usuario_cache.obter_async(int(usuario_id), lambda: self._buscar_usuario(int(usuario_id)))
+
+    async def _buscar_usuario(self, usuario_id):
+        async with self.sessoes() as sessao:
+            linha = (await sessao.execute(db.select(
+                UsuarioModel.id, UsuarioModel.nome, UsuarioModel.email,
+                UsuarioModel.google_login, UsuarioModel.google_id
+            ).filter_by(id=usuario_id))).first()
+        return UsuarioAutenticado(*linha) if linha else None
+
+    async def _condicional(self, requisicao, usuario, rota):
+        """Mesmo ETag/Last-Modified do get_condicional; 304 sem consultar o catálogo"""
+        async with self.sessoes() as sessao:
+            versao, atualizado_em = CatalogoVersaoRepository.versao_da_linha(
+                (await sessao.execute(CatalogoVersaoRepository.consulta(usuario.id))).first()
+            )
+            etag, atualizado_em, nao_modificado = avaliar_condicional(
+                usuario.id, versao, atualizado_em, requisicao.full_path,
+                parse_etags(requisicao.headers.get('If-None-Match')),
+                parse_date(requisicao.headers.get('If-Modified-Since'))
+            )
+            if nao_modificado:
+                dados, cabecalhos, status = None, {}, 304
+            else:
+                dados, cabecalhos = await rota(sessao, requisicao, usuario, versao)
+                status = 200
+
+        cabecalhos['ETag'] = f'"{etag}"'
+        if atualizado_em is not None:
+            cabecalhos['Last-Modified'] = http_date(atualizado_em)
+        cabecalhos['Cache-Control'] = 'private, no-cache'
+        return status, dados, cabecalhos
+
+    async def listar_produtos(self, sessao, requisicao, usuario, versao):
+        filtros = parse_listagem_args(requisicao.args)
+        linhas = (await sessao.execute(ProdutoRepository.consulta_paginada(usuario.id, **filtros))).all()
+        campos = filtros['campos']
+        omitir = ('id',) if campos and 'id' not in campos else ()
+        cabecalhos = {}
+        if filtros['limit'] and len(linhas) == filtros['limit']:
+            cabecalhos['X-Proximo-Cursor'] = str(linhas[-1].id)
+        return linhas_para_dicts(linhas, omitir), cabecalhos
+
+    async def listar_categorias(self, sessao, requisicao, usuario, versao):
+        if requisicao.args.get('include') == 'produtos':
+            categorias = (await sessao.execute(CategoriaRepository.consulta_leitura(usuario.id))).all()
+            produtos = (await sessao.execute(ProdutoRepository.consulta_leitura(usuario.id))).all()
+            return CategoriaRepository.agrupar_produtos(categorias, produtos), {}
+        linhas = (await sessao.execute(CategoriaRepository.consulta_com_contagem(usuario.id))).all()
+        return linhas_para_dicts(linhas), {}
+
+    async def cardapio(self, sessao, requisicao, usuario, versao):
+        async def montar():
+            return CardapioService.agrupar((await sessao.execute(CardapioService.consulta(usuario.id))).all())
+
+        dados = await cardapio_cache.obter_async(usuario.id, montar, versao)
+        return {
+            'atualizado_em': dados['atualizado_em'],
+            'categorias': dados['categorias'],
+            'total_produtos': dados['total_produtos'],
+            'usuario': usuario.nome
+        }, {}
+
+    async def _enviar(self, send, requisicao, status, dados, cabecalhos):
+        config = self.flask_app.config
+        corpo = b''
+        if dados is not None:
+            # Mesmo provider (orjson) e mesma quebra de linha final do jsonify
+            corpo = (self.flask_app.json.dumps(dados) + '\n').encode()
+            cabecalhos['Content-Type'] = 'application/json'
+            cabecalhos['Vary'] = 'Cookie, Accept-Encoding'
+            minimo = config["JSON_GZIP_MINIMO"]
+            aceita_gzip = parse_accept_header(requisicao.headers.get('Accept-Encoding'))['gzip'] > 0
+            if minimo and aceita_gzip and len(corpo) >= minimo:
+                corpo = gzip.compress(corpo, compresslevel=config["JSON_GZIP_NIVEL"])
+                cabecalhos['Content-Encoding'] = 'gzip'
+                cabecalhos['ETag'] = 'W/' + cabecalhos['ETag']
+        cabecalhos['Content-Length'] = str(len(corpo))
+        cabecalhos['X-Request-ID'] = requisicao.request_id
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in cabecalhos.items()],
+        })
+        await send({'type': 'http.response.body', 'body': corpo if requisicao.metodo != 'HEAD' else b''})
+
+        if log_requisicao.isEnabledFor(logging.INFO):
+            duracao = time.perf_counter() - requisicao.inicio
+            log_requisicao.info(
+                "%s %s %s", requisicao.metodo, requisicao.path, status,
+                extra={'request_id': requisicao.request_id,
+                       'dados': {'metodo': requisicao.metodo, 'rota': requisicao.path, 'status': status,
+                                 'duracao_ms': round(duracao * 1000, 2), 'async': True}}
+            )
+
+
+app = LeituraAssincrona(create_app())
@@ -0,0 +1,114 @@
+"""
+Compara requisições por segundo do cardápio dinâmico (/cardapio, logado,
+renderizado a cada visita) com o cardápio público pré-renderado
+(/cardapio/<slug>, servido do disco, com e sem gzip).
+
+Usa o app completo do create_app() com o cliente de teste do Flask,
+em várias threads, para medir o custo do lado do servidor sem a rede.
+
+Uso:
+    python benchmarks/bench_cardapio_publico.py [--url sqlite:///bench_cardapio.db]
+                                                [--produtos 300] [--segundos 5] [--threads 4]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from comum import resumo_ms
+
+
+def popular(db, usuario_model, categoria_model, produto_model, produtos):
+    db.drop_all()
+    db.create_all()
+    usuario = usuario_model(nome='Padaria Benchmark', email='bench@bench.local')
+    db.session.add(usuario)
+    db.session.flush()
+    categorias = [categoria_model(nome=f'Categoria {c}', usuario_id=usuario.id) for c in range(8)]
+    db.session.add_all(categorias)
+    db.session.flush()
+    for i in range(produtos):
+        db.session.add(produto_model(
+            nome=f'Produto {i}', preco=1 + i % 50, disponivel=i % 4 != 0, quantidade=i % 20,
+            categoria_id=categorias[i % len(categorias)].id, usuario_id=usuario.id
+        ))
+    db.session.commit()
+    return usuario.id
+
+
+def carga(app, caminho, segundos, threads, headers=None, logado_como=None, antes=None):
+    """Dispara requisições em `threads` clientes durante `segundos`; devolve req/s e latências"""
+    latencias = []
+    lock = threading.Lock()
+    fim = time.perf_counter() + segundos
+
+    def cliente():
+        client = app.test_client()
+        if logado_como is not None:
+            with client.session_transaction() as sessao:
+                sessao['_user_id'] = str(logado_como)
+                sessao['_fresh'] = True
+        locais = []
+        while time.perf_counter() < fim:
+            if antes:
+                antes()
+            inicio = time.perf_counter()
+            resposta = client.get(caminho, headers=headers or {})
+            locais.append(time.perf_counter() - inicio)
+            assert resposta.status_code == 200, resposta.status_code
+        with lock:
+            latencias.extend(locais)
+
+    workers = [threading.Thread(target=cliente) for _ in range(threads)]
+    inicio = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    duracao = time.perf_counter() - inicio
+    return {'req_por_s': round(len(latencias) / duracao, 1), **resumo_ms(latencias)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='sqlite:///bench_cardapio.db')
+    parser.add_argument('--produtos', type=int, default=300)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ.update({
+        'DATABASE_URL': args.url, 'RENDER': '1', 'LOG_LEVEL': 'WARNING',
+        'CARDAPIO_PUBLICO_DIR': tempfile.mkdtemp(prefix='bench-cardapio-'),
+    })
+    from Main import create_app
+    from extensions import db, cardapio_cache, cardapio_publico
+    from repository.UsuarioRepository import UsuarioRepository
+    from model.UserModel import UsuarioModel
+    from model.CategoriaModel import CategoriaModel
+    from model.ProdutoModel import ProdutoModel
+
+    app = create_app()
+    with app.app_context():
+        usuario_id = popular(db, UsuarioModel, CategoriaModel, ProdutoModel, args.produtos)
+        slug = UsuarioRepository.publicar_cardapio(usuario_id, True)
+    cardapio_publico.gerar(usuario_id)
+
+    resultado = {
+        'produtos': args.produtos,
+        'threads': args.threads,
+        # Rota atual sem o cache do cardápio: consultas + template a cada visita
+        'dinamico_sem_cache': carga(app, '/cardapio', args.segundos, args.threads, logado_como=usuario_id,
+                                    antes=lambda: cardapio_cache.invalidar(usuario_id)),
+        'dinamico_com_cache': carga(app, '/cardapio', args.segundos, args.threads, logado_como=usuario_id),
+        'publico': carga(app, f'/cardapio/{slug}', args.segundos, args.threads),
+        'publico_gzip': carga(app, f'/cardapio/{slug}', args.segundos, args.threads,
+                              headers={'Accept-Encoding': 'gzip'}),
+    }
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
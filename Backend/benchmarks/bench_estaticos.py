@@ -0,0 +1,103 @@
+"""
+Mede bytes transferidos e latência do dashboard (HTML + CSS local) e da
+listagem JSON, sem compressão x gzip/brotli, e quantas requisições de
+assets uma segunda visita ainda faz com e sem URLs versionadas (?v=hash).
+
+Rode `python compactar_estaticos.py` antes para existirem as variantes .gz/.br.
+
+Uso:
+    python benchmarks/bench_estaticos.py [--url sqlite:///bench_estaticos.db]
+                                         [--produtos 300] [--repeticoes 200]
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+
+from comum import cronometrar, resumo_ms
+
+SEM_COMPRESSAO = {'Accept-Encoding': 'identity'}
+COM_COMPRESSAO = {'Accept-Encoding': 'gzip, deflate, br'}
+
+
+def medir(client, caminho, headers, repeticoes):
+    resposta = client.get(caminho, headers=headers)
+    assert resposta.status_code == 200, (caminho, resposta.status_code)
+    latencias = cronometrar(lambda: client.get(caminho, headers=headers), repeticoes)
+    return {
+        'bytes': len(resposta.get_data()),
+        'content_encoding': resposta.headers.get('Content-Encoding'),
+        'cache_control': resposta.headers.get('Cache-Control'),
+        **resumo_ms(latencias),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='sqlite:///bench_estaticos.db')
+    parser.add_argument('--produtos', type=int, default=300)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.update({
+        'DATABASE_URL': args.url, 'RENDER': '1', 'LOG_LEVEL': 'WARNING',
+        'CARDAPIO_PUBLICO_DIR': tempfile.mkdtemp(prefix='bench-estaticos-'),
+    })
+    from Main import create_app
+    from extensions import db
+    from model.UserModel import UsuarioModel
+    from model.CategoriaModel import CategoriaModel
+    from model.ProdutoModel import ProdutoModel
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        usuario = UsuarioModel(nome='Padaria Benchmark', email='bench@bench.local')
+        db.session.add(usuario)
+        db.session.flush()
+        categoria = CategoriaModel(nome='Pães', usuario_id=usuario.id)
+        db.session.add(categoria)
+        db.session.flush()
+        db.session.add_all([
+            ProdutoModel(nome=f'Produto {i}', descricao=f'Descrição do produto {i}', preco=1 + i % 50,
+                         quantidade=i % 20, categoria_id=categoria.id, usuario_id=usuario.id)
+            for i in range(args.produtos)
+        ])
+        db.session.commit()
+        usuario_id = usuario.id
+
+    client = app.test_client()
+    with client.session_transaction() as sessao:
+        sessao['_user_id'] = str(usuario_id)
+        sessao['_fresh'] = True
+
+    html = client.get('/dashboard').get_data(as_text=True)
+    assets = sorted(set(re.findall(r'(?:href|src)="(/static/[^"]+)"', html)))
+
+    resultado = {'assets': assets}
+    for nome, headers in (('sem_compressao', SEM_COMPRESSAO), ('com_compressao', COM_COMPRESSAO)):
+        paginas = {caminho: medir(client, caminho, headers, args.repeticoes)
+                   for caminho in ['/dashboard', '/api/produtos/'] + assets}
+        resultado[nome] = {
+            'por_recurso': paginas,
+            'bytes_dashboard_mais_assets': sum(
+                medicao['bytes'] for caminho, medicao in paginas.items() if caminho != '/api/produtos/'
+            ),
+        }
+
+    sem = resultado['sem_compressao']['bytes_dashboard_mais_assets']
+    com = resultado['com_compressao']['bytes_dashboard_mais_assets']
+    resultado['economia_bytes_pct'] = round((1 - com / sem) * 100, 1) if sem else 0.0
+    # Segunda visita: com ?v=hash e immutable o navegador não revalida os assets
+    resultado['requisicoes_assets_na_revisita'] = {
+        'sem_versao': len(assets),
+        'com_versao': sum(1 for caminho in assets if 'immutable' not in (
+            client.get(caminho, headers=COM_COMPRESSAO).headers.get('Cache-Control') or '')),
+    }
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
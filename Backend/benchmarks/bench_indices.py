@@ -0,0 +1,134 @@
+"""
+Benchmark dos métodos do ProdutoRepository/CategoriaRepository com e sem os
+índices compostos por usuário.
+
+Uso:
+    python benchmarks/bench_indices.py [--url sqlite:///bench.db] [--usuarios 1000]
+                                       [--produtos 100000] [--repeticoes 200]
+"""
+import argparse
+import json
+import random
+
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from comum import criar_app_benchmark, cronometrar, resumo_ms
+
+from extensions import db
+from model.UserModel import UsuarioModel
+from model.CategoriaModel import CategoriaModel
+from model.ProdutoModel import ProdutoModel
+from repository.ProdutoRepository import ProdutoRepository
+from repository.CategoriaRepository import CategoriaRepository
+
+CATEGORIAS_POR_USUARIO = 8
+
+
+def popular(usuarios, produtos):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(UsuarioModel.__table__.insert(), [
+        {'id': u, 'nome': f'Usuário {u}', 'email': f'u{u}@bench.local'} for u in range(1, usuarios + 1)
+    ])
+    db.session.execute(CategoriaModel.__table__.insert(), [
+        {'id': (u - 1) * CATEGORIAS_POR_USUARIO + c + 1, 'nome': f'Categoria {c}', 'usuario_id': u}
+        for u in range(1, usuarios + 1) for c in range(CATEGORIAS_POR_USUARIO)
+    ])
+    lote = []
+    for i in range(produtos):
+        u = i % usuarios + 1
+        lote.append({
+            'nome': f'Produto {i}', 'preco': round(random.uniform(1, 100), 2),
+            'disponivel': i % 3 != 0, 'quantidade': i % 50, 'descricao': None,
+            'categoria_id': (u - 1) * CATEGORIAS_POR_USUARIO + i % CATEGORIAS_POR_USUARIO + 1,
+            'usuario_id': u,
+        })
+        if len(lote) == 10000:
+            db.session.execute(ProdutoModel.__table__.insert(), lote)
+            lote = []
+    if lote:
+        db.session.execute(ProdutoModel.__table__.insert(), lote)
+    db.session.commit()
+
+
+def indices():
+    return list(ProdutoModel.__table__.indexes) + list(CategoriaModel.__table__.indexes)
+
+
+def consultas(usuarios, produtos):
+    """Cada consulta sorteia um usuário para evitar medir sempre as mesmas páginas"""
+    def usuario():
+        return random.randint(1, usuarios)
+
+    def categoria(u):
+        return (u - 1) * CATEGORIAS_POR_USUARIO + random.randrange(CATEGORIAS_POR_USUARIO) + 1
+
+    def produto(u):
+        return random.randrange(produtos // usuarios) * usuarios + u
+
+    return {
+        'ProdutoRepository.find_by_usuario': lambda: ProdutoRepository.find_by_usuario(usuario()),
+        'ProdutoRepository.find_by_id_e_usuario': lambda: (lambda u: ProdutoRepository.find_by_id_e_usuario(produto(u), u))(usuario()),
+        'ProdutoRepository.find_by_categoria_id_e_usuario': lambda: (lambda u: ProdutoRepository.find_by_categoria_id_e_usuario(categoria(u), u))(usuario()),
+        'ProdutoRepository.find_by_disponivel_true_e_usuario': lambda: ProdutoRepository.find_by_disponivel_true_e_usuario(usuario()),
+        'ProdutoRepository.find_by_nome_e_usuario': lambda: (lambda u: ProdutoRepository.find_by_nome_e_usuario(f'Produto {produto(u) - 1}', u))(usuario()),
+        'ProdutoRepository.find_by_nome_ignore_case_e_usuario': lambda: (lambda u: ProdutoRepository.find_by_nome_ignore_case_e_usuario(f'PRODUTO {produto(u) - 1}', u))(usuario()),
+        'ProdutoRepository.count_by_usuario': lambda: ProdutoRepository.count_by_usuario(usuario()),
+        'ProdutoRepository.count_disponiveis_by_usuario': lambda: ProdutoRepository.count_disponiveis_by_usuario(usuario()),
+        'ProdutoRepository.count_por_categoria_e_usuario': lambda: (lambda u: ProdutoRepository.count_por_categoria_e_usuario(categoria(u), u))(usuario()),
+        'CategoriaRepository.listar_por_usuario': lambda: CategoriaRepository.listar_por_usuario(usuario()),
+        'CategoriaRepository.buscar_por_id_e_usuario': lambda: (lambda u: CategoriaRepository.buscar_por_id_e_usuario(categoria(u), u))(usuario()),
+        'CategoriaRepository.existe_por_nome_e_usuario': lambda: CategoriaRepository.existe_por_nome_e_usuario('Categoria 3', usuario()),
+        'CategoriaRepository.count_por_usuario': lambda: CategoriaRepository.count_por_usuario(usuario()),
+    }
+
+
+def medir(usuarios, produtos, repeticoes):
+    resultado = {}
+    for nome, consulta in consultas(usuarios, produtos).items():
+        def executar():
+            consulta()
+            # Descarta o identity map para que cada chamada vá ao banco
+            db.session.remove()
+        executar()
+        resultado[nome] = resumo_ms(cronometrar(executar, repeticoes))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='sqlite:///bench_indices.db')
+    parser.add_argument('--usuarios', type=int, default=1000)
+    parser.add_argument('--produtos', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--json', help='arquivo para gravar o resultado em JSON')
+    args = parser.parse_args()
+
+    random.seed(42)
+    app = criar_app_benchmark(args.url)
+    with app.app_context():
+        print(f"Populando {args.produtos} produtos para {args.usuarios} usuários...")
+        popular(args.usuarios, args.produtos)
+
+        with db.engine.begin() as conexao:
+            for indice in indices():
+                conexao.execute(DropIndex(indice, if_exists=True))
+        antes = medir(args.usuarios, args.produtos, args.repeticoes)
+
+        with db.engine.begin() as conexao:
+            for indice in indices():
+                conexao.execute(CreateIndex(indice, if_not_exists=True))
+        depois = medir(args.usuarios, args.produtos, args.repeticoes)
+
+    print(f"\n{'método':<55} {'p50 antes':>10} {'p50 depois':>11} {'p99 antes':>10} {'p99 depois':>11}")
+    for nome in antes:
+        print(f"{nome:<55} {antes[nome]['p50_ms']:>10.3f} {depois[nome]['p50_ms']:>11.3f} "
+              f"{antes[nome]['p99_ms']:>10.3f} {depois[nome]['p99_ms']:>11.3f}")
+
+    if args.json:
+        with open(args.json, 'w') as arquivo:
+            json.dump({'antes': antes, 'depois': depois}, arquivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Micro-benchmark da serialização da listagem de produtos:
+
+- orm_to_dict_stdlib: objetos do ORM + to_dict() + provider padrão do Flask
+  (caminho antigo, com float() no preço)
+- orm_to_dict_rapido: objetos do ORM + to_dict() + JSONProviderRapido
+- linhas_rapido:      consulta por colunas + linhas_para_dicts + JSONProviderRapido
+
+Mede só a montagem dos dicts e a serialização, com os dados já carregados;
+`carga_e_serializacao` inclui também a consulta ao banco.
+
+Uso:
+    python benchmarks/bench_json.py [--url sqlite:///bench_json.db] [--produtos 5000] [--repeticoes 30]
+"""
+import argparse
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+from comum import criar_app_benchmark, cronometrar, resumo_ms
+
+from extensions import db
+from json_provider import JSONProviderRapido, orjson
+from model.UserModel import UsuarioModel
+from model.CategoriaModel import CategoriaModel
+from model.ProdutoModel import ProdutoModel
+from repository.ProdutoRepository import ProdutoRepository
+from serializacao import linhas_para_dicts
+
+
+def popular(produtos):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(UsuarioModel.__table__.insert(), [{'id': 1, 'nome': 'Bench', 'email': 'bench@bench.local'}])
+    db.session.execute(CategoriaModel.__table__.insert(), [
+        {'id': c, 'nome': f'Categoria {c}', 'usuario_id': 1} for c in range(1, 9)
+    ])
+    db.session.execute(ProdutoModel.__table__.insert(), [
+        {'nome': f'Produto {i}', 'preco': f'{1 + i % 97}.{i % 100:02d}', 'disponivel': i % 3 != 0,
+         'quantidade': i % 50, 'descricao': f'Descrição do produto {i}', 'categoria_id': i % 8 + 1, 'usuario_id': 1}
+        for i in range(produtos)
+    ])
+    db.session.commit()
+
+
+def to_dict_antigo(produto):
+    """to_dict() como era antes do provider: preço convertido com float()"""
+    dados = produto.to_dict()
+    dados['preco'] = float(dados['preco'])
+    return dados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='sqlite:///bench_json.db')
+    parser.add_argument('--produtos', type=int, default=5000)
+    parser.add_argument('--repeticoes', type=int, default=30)
+    args = parser.parse_args()
+
+    app = criar_app_benchmark(args.url)
+    padrao = DefaultJSONProvider(app)
+    rapido = JSONProviderRapido(app)
+
+    with app.app_context():
+        popular(args.produtos)
+        objetos = ProdutoModel.query.filter_by(usuario_id=1).order_by(ProdutoModel.id).all()
+        for produto in objetos:
+            produto.categoria  # carrega antes de medir, só a serialização entra na conta
+        linhas = ProdutoRepository.find_by_usuario_paginado(1)
+
+        serializacao = {
+            'orm_to_dict_stdlib': resumo_ms(cronometrar(
+                lambda: padrao.dumps([to_dict_antigo(p) for p in objetos]), args.repeticoes)),
+            'orm_to_dict_rapido': resumo_ms(cronometrar(
+                lambda: rapido.dumps([p.to_dict() for p in objetos]), args.repeticoes)),
+            'linhas_rapido': resumo_ms(cronometrar(
+                lambda: rapido.dumps(linhas_para_dicts(linhas)), args.repeticoes)),
+        }
+
+        def carga_orm():
+            db.session.expunge_all()
+            produtos = ProdutoModel.query.filter_by(usuario_id=1).order_by(ProdutoModel.id).all()
+            return padrao.dumps([to_dict_antigo(p) for p in produtos])
+
+        def carga_linhas():
+            return rapido.dumps(linhas_para_dicts(ProdutoRepository.find_by_usuario_paginado(1)))
+
+        carga = {
+            'orm_to_dict_stdlib': resumo_ms(cronometrar(carga_orm, args.repeticoes)),
+            'linhas_rapido': resumo_ms(cronometrar(carga_linhas, args.repeticoes)),
+        }
+
+    print(json.dumps({
+        'produtos': args.produtos,
+        'encoder': 'orjson' if orjson is not None else 'json (stdlib)',
+        'serializacao': serializacao,
+        'carga_e_serializacao': carga,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Memória e latência por 10k linhas: consultas que hidratam objetos do ORM
+(find_by_usuario / listar_com_produtos + to_dict) x variantes somente leitura
+por coluna (find_by_usuario_leitura / listar_com_produtos_leitura).
+
+A memória é o pico do tracemalloc durante a consulta + conversão em dicts,
+com a sessão limpa antes de cada medida.
+
+Uso:
+    python benchmarks/bench_leitura.py [--url sqlite:///bench_leitura.db] [--produtos 10000] [--repeticoes 20]
+"""
+import argparse
+import json
+import tracemalloc
+
+from comum import criar_app_benchmark, cronometrar, resumo_ms
+
+from extensions import db
+from model.UserModel import UsuarioModel
+from model.CategoriaModel import CategoriaModel
+from model.ProdutoModel import ProdutoModel
+from repository.ProdutoRepository import ProdutoRepository
+from repository.CategoriaRepository import CategoriaRepository
+from serializacao import linhas_para_dicts
+
+
+def popular(produtos):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(UsuarioModel.__table__.insert(), [{'id': 1, 'nome': 'Bench', 'email': 'bench@bench.local'}])
+    db.session.execute(CategoriaModel.__table__.insert(), [
+        {'id': c, 'nome': f'Categoria {c}', 'usuario_id': 1} for c in range(1, 9)
+    ])
+    db.session.execute(ProdutoModel.__table__.insert(), [
+        {'nome': f'Produto {i}', 'preco': 1 + i % 97, 'disponivel': i % 3 != 0, 'quantidade': i % 50,
+         'descricao': f'Descrição do produto {i}', 'categoria_id': i % 8 + 1, 'usuario_id': 1}
+        for i in range(produtos)
+    ])
+    db.session.commit()
+
+
+def medir(funcao, repeticoes, por_linhas):
+    def limpa_e_executa():
+        db.session.expunge_all()
+        return funcao()
+
+    latencias = cronometrar(limpa_e_executa, repeticoes)
+    db.session.expunge_all()
+    tracemalloc.start()
+    resultado = funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    escala = 10000 / por_linhas
+    resumo = resumo_ms(latencias)
+    return {
+        'pico_memoria_kb_por_10k': round(pico / 1024 * escala, 1),
+        'p50_ms_por_10k': round(resumo['p50_ms'] * escala, 3),
+        **resumo,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='sqlite:///bench_leitura.db')
+    parser.add_argument('--produtos', type=int, default=10000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    app = criar_app_benchmark(args.url)
+    with app.app_context():
+        popular(args.produtos)
+        n = args.produtos
+        resultado = {
+            'produtos': n,
+            'listar_produtos': {
+                'orm': medir(lambda: [p.to_dict() for p in ProdutoRepository.find_by_usuario(1)], args.repeticoes, n),
+                'leitura': medir(lambda: linhas_para_dicts(ProdutoRepository.find_by_usuario_leitura(1)),
+                                 args.repeticoes, n),
+            },
+            'categorias_com_produtos': {
+                'orm': medir(lambda: [c.to_dict(incluir_produtos=True)
+                                      for c in CategoriaRepository.listar_com_produtos(1)], args.repeticoes, n),
+                'leitura': medir(lambda: CategoriaRepository.listar_com_produtos_leitura(1), args.repeticoes, n),
+            },
+        }
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Mede o tempo de boot de um worker: importar o Main e executar create_app(),
+cada amostra em um processo Python novo (como um worker do gunicorn).
+
+Uso:
+    python benchmarks/bench_startup.py [--url sqlite:///bench_startup.db] [--amostras 20]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from comum import BACKEND_DIR, resumo_ms
+
+SCRIPT_AMOSTRA = """
+import json, time
+inicio = time.perf_counter()
+from Main import create_app
+importado = time.perf_counter()
+create_app()
+fim = time.perf_counter()
+print(json.dumps({'import': importado - inicio, 'create_app': fim - importado, 'total': fim - inicio}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='sqlite:///bench_startup.db')
+    parser.add_argument('--amostras', type=int, default=20)
+    parser.add_argument('--json', help='arquivo para gravar o resultado em JSON')
+    args = parser.parse_args()
+
+    ambiente = dict(os.environ, DATABASE_URL=args.url, RENDER='true')
+    medicoes = {'import': [], 'create_app': [], 'total': []}
+    for _ in range(args.amostras):
+        saida = subprocess.run(
+            [sys.executable, '-c', SCRIPT_AMOSTRA],
+            cwd=BACKEND_DIR, env=ambiente, capture_output=True, text=True, check=True
+        )
+        amostra = json.loads(saida.stdout.strip().splitlines()[-1])
+        for etapa, duracao in amostra.items():
+            medicoes[etapa].append(duracao)
+
+    resultado = {etapa: resumo_ms(valores) for etapa, valores in medicoes.items()}
+    for etapa, resumo in resultado.items():
+        print(f"{etapa:<12} p50={resumo['p50_ms']:>9.2f} ms  p95={resumo['p95_ms']:>9.2f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Utilitários compartilhados pelos scripts de benchmark"""
+import os
+import statistics
+import sys
+import time
+
+# Permite importar os módulos da aplicação ao rodar `python benchmarks/<script>.py`
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def criar_app_benchmark(database_url):
+    """App Flask mínima ligada ao banco do benchmark, sem o check_database do Main"""
+    from flask import Flask
+    from extensions import db
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    k = (len(ordenados) - 1) * p / 100
+    i = int(k)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (k - i)
+
+
+def resumo_ms(latencias):
+    """Resumo das latências (em segundos) convertido para milissegundos"""
+    return {
+        'n': len(latencias),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 3),
+        'p95_ms': round(percentil(latencias, 95) * 1000, 3),
+        'p99_ms': round(percentil(latencias, 99) * 1000, 3),
+        'media_ms': round(statistics.fmean(latencias) * 1000, 3) if latencias else 0.0,
+    }
+
+
+def cronometrar(funcao, repeticoes):
+    latencias = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
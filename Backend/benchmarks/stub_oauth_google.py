@@ -0,0 +1,159 @@
+"""
+Servidor OAuth/OpenID local que imita os endpoints do Google usados pelo
+login (authorize, token, JWKS, userinfo), para testar o fluxo e medir o
+callback sem depender da rede.
+
+O /authorize não mostra tela: redireciona direto para o redirect_uri com
+um código. O id_token é assinado em RS256 com o nonce recebido.
+
+Uso:
+    python benchmarks/stub_oauth_google.py [--porta 8765] [--atraso 0.0]
+                                           [--email stub@exemplo.com] [--nome "Usuário Stub"]
+
+E no app (exemple.env):
+    GOOGLE_CLIENT_ID=stub  GOOGLE_CLIENT_SECRET=stub
+    GOOGLE_AUTHORIZE_URL=http://127.0.0.1:8765/authorize
+    GOOGLE_TOKEN_URL=http://127.0.0.1:8765/token
+    GOOGLE_JWKS_URI=http://127.0.0.1:8765/jwks
+    GOOGLE_USERINFO_URL=http://127.0.0.1:8765/userinfo
+
+POST /rotacionar troca a chave de assinatura (novo kid), para exercitar o
+refresh do cache de JWKS; GET /stats mostra quantas vezes cada rota foi chamada.
+"""
+import argparse
+import json
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from authlib.jose import JsonWebKey, jwt
+
+
+class EstadoStub:
+    def __init__(self, email, nome, atraso):
+        self.email = email
+        self.nome = nome
+        self.atraso = atraso
+        self.chamadas = Counter()
+        self.codigos = {}
+        self.lock = threading.Lock()
+        self.rotacionar()
+
+    def rotacionar(self):
+        chave = JsonWebKey.generate_key('RSA', 2048, is_private=True)
+        kid = secrets.token_hex(8)
+        with self.lock:
+            self.chave = chave
+            self.kid = kid
+
+    def jwks(self):
+        publica = self.chave.as_dict(is_private=False)
+        publica.update({'kid': self.kid, 'use': 'sig', 'alg': 'RS256'})
+        return {'keys': [publica]}
+
+    def id_token(self, client_id, nonce, emissor):
+        agora = int(time.time())
+        claims = {
+            'iss': emissor, 'aud': client_id, 'sub': 'stub-' + self.email,
+            'email': self.email, 'email_verified': True, 'name': self.nome,
+            'iat': agora, 'exp': agora + 3600, 'nonce': nonce,
+        }
+        return jwt.encode({'alg': 'RS256', 'kid': self.kid}, claims, self.chave).decode()
+
+
+def criar_handler(estado):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, para o pool de conexões do cliente ser reaproveitado
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, formato, *args):
+            pass
+
+        def _json(self, dados, status=200):
+            corpo = json.dumps(dados).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def _emissor(self):
+            return f'http://{self.headers.get("Host")}'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            estado.chamadas[url.path] += 1
+            if estado.atraso and url.path != '/stats':
+                time.sleep(estado.atraso)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == '/authorize':
+                codigo = secrets.token_urlsafe(16)
+                estado.codigos[codigo] = {'nonce': params.get('nonce'), 'client_id': params.get('client_id')}
+                destino = params['redirect_uri'] + '?' + urlencode({'code': codigo, 'state': params.get('state', '')})
+                self.send_response(302)
+                self.send_header('Location', destino)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            elif url.path == '/jwks':
+                self._json(estado.jwks())
+            elif url.path == '/userinfo':
+                self._json({'sub': 'stub-' + estado.email, 'email': estado.email, 'name': estado.nome})
+            elif url.path == '/stats':
+                self._json(dict(estado.chamadas))
+            else:
+                self._json({'error': 'not_found'}, 404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            estado.chamadas[url.path] += 1
+            if estado.atraso:
+                time.sleep(estado.atraso)
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            params = {k: v[0] for k, v in parse_qs(self.rfile.read(tamanho).decode()).items()}
+            if url.path == '/token':
+                dados = estado.codigos.pop(params.get('code'), None)
+                if dados is None:
+                    self._json({'error': 'invalid_grant'}, 400)
+                    return
+                self._json({
+                    'access_token': secrets.token_urlsafe(24), 'token_type': 'Bearer', 'expires_in': 3600,
+                    'scope': 'openid email profile',
+                    'id_token': estado.id_token(dados['client_id'] or params.get('client_id'), dados['nonce'],
+                                                self._emissor()),
+                })
+            elif url.path == '/rotacionar':
+                estado.rotacionar()
+                self._json({'kid': estado.kid})
+            else:
+                self._json({'error': 'not_found'}, 404)
+
+    return Handler
+
+
+def iniciar(porta=8765, email='stub@exemplo.com', nome='Usuário Stub', atraso=0.0):
+    """Sobe o stub numa thread e devolve (servidor, estado); use servidor.shutdown() para parar"""
+    estado = EstadoStub(email, nome, atraso)
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), criar_handler(estado))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, estado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--atraso', type=float, default=0.0, help='segundos de espera em cada resposta')
+    parser.add_argument('--email', default='stub@exemplo.com')
+    parser.add_argument('--nome', default='Usuário Stub')
+    args = parser.parse_args()
+
+    estado = EstadoStub(args.email, args.nome, args.atraso)
+    servidor = ThreadingHTTPServer(('127.0.0.1', args.porta), criar_handler(estado))
+    print(f"Stub OAuth em http://127.0.0.1:{args.porta} (kid {estado.kid})")
+    servidor.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
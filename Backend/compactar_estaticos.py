@@ -0,0 +1,53 @@
+"""
+Gera as variantes pré-comprimidas (.gz e, se o pacote brotli estiver
+instalado, .br) dos arquivos de static/. Roda no build do deploy; o
+estaticos.py serve essas variantes conforme o Accept-Encoding.
+
+Uso:
+    python compactar_estaticos.py
+"""
+import gzip
+import os
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PASTA_STATIC = Path(__file__).parent / "static"
+EXTENSOES = {'.css', '.js', '.svg', '.html', '.json', '.txt'}
+# Arquivos menores que isso não compensam o Content-Encoding
+TAMANHO_MINIMO = 512
+
+
+def _escrever(caminho, conteudo):
+    temporario = caminho.with_name(caminho.name + '.tmp')
+    temporario.write_bytes(conteudo)
+    os.replace(temporario, caminho)
+
+
+def compactar(pasta=PASTA_STATIC):
+    total = {'arquivos': 0, 'original': 0, 'gzip': 0, 'br': 0}
+    for arquivo in sorted(pasta.rglob('*')):
+        if not arquivo.is_file() or arquivo.suffix not in EXTENSOES:
+            continue
+        conteudo = arquivo.read_bytes()
+        if len(conteudo) < TAMANHO_MINIMO:
+            continue
+        comprimido = gzip.compress(conteudo, compresslevel=9, mtime=0)
+        _escrever(arquivo.with_name(arquivo.name + '.gz'), comprimido)
+        total['arquivos'] += 1
+        total['original'] += len(conteudo)
+        total['gzip'] += len(comprimido)
+        if brotli is not None:
+            comprimido_br = brotli.compress(conteudo, quality=11)
+            _escrever(arquivo.with_name(arquivo.name + '.br'), comprimido_br)
+            total['br'] += len(comprimido_br)
+    return total
+
+
+if __name__ == "__main__":
+    total = compactar()
+    print(f"✅ {total['arquivos']} arquivos: {total['original']} bytes -> gzip {total['gzip']}"
+          + (f", br {total['br']}" if brotli is not None else " (brotli não instalado)"))
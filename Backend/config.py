@@ -1,35 +1,130 @@
 import os
 from dotenv import load_dotenv
+from pool_metrics import QueuePoolInstrumentado
 
 # Carrega as variáveis do arquivo .env
 load_dotenv()
 
+def _env_bool(nome, padrao):
+    return os.getenv(nome, padrao).lower() in ("true", "1", "yes")
+
 class Config:
-    # Configurações do PostgreSQL
-    DATABASE_URL = os.getenv("DATABASE_URL")
-    DB_USERNAME = os.getenv("DB_USERNAME")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
-    DB_NAME = os.getenv("DB_NAME")
-    DB_HOST = os.getenv("DB_HOST")
-    DB_PORT = os.getenv("DB_PORT")
-    
-    # Configurações do SQLAlchemy
-    SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI")
-    SQLALCHEMY_TRACK_MODIFICATIONS = os.getenv("SQLALCHEMY_TRACK_MODIFICATIONS", "False") == "True"
-    SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "True") == "True"
-    
-    # Configurações de CORS
-    CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
-    CORS_SUPPORTS_CREDENTIALS = os.getenv("CORS_SUPPORTS_CREDENTIALS", "True") == "True"
-    
-    # Configurações do Flask
-    FLASK_DEBUG = os.getenv("FLASK_DEBUG", "True") == "True"
-    SECRET_KEY = os.getenv("SECRET_KEY", "less")
-    
+    """Configuração lida do ambiente no momento da criação (após o load_dotenv do create_app)"""
+
+    def __init__(self):
+        # Configurações do PostgreSQL
+        self.DATABASE_URL = os.getenv("DATABASE_URL")
+        self.DB_USERNAME = os.getenv("DB_USERNAME")
+        self.DB_PASSWORD = os.getenv("DB_PASSWORD")
+        self.DB_NAME = os.getenv("DB_NAME")
+        self.DB_HOST = os.getenv("DB_HOST")
+        self.DB_PORT = os.getenv("DB_PORT")
+
+        # Configurações do SQLAlchemy
+        database_url = self.DATABASE_URL or os.getenv("SQLALCHEMY_DATABASE_URI") or "sqlite:///database.db"
+        self.SQLALCHEMY_DATABASE_URI = database_url.replace("postgres://", "postgresql://", 1)
+        self.SQLALCHEMY_TRACK_MODIFICATIONS = _env_bool("SQLALCHEMY_TRACK_MODIFICATIONS", "False")
+        self.SQLALCHEMY_ECHO = _env_bool("SQLALCHEMY_ECHO", "False")
+
+        # Pool de conexões (ignorado no SQLite)
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+        self.DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+        self.DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))
+        # Recicla antes do timeout de conexões ociosas do Postgres do Render
+        self.DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 280))
+        self.DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", "True")
+        self.DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 15000))
+
+        # Réplicas de leitura (URLs separadas por vírgula) e por quantos segundos,
+        # depois de uma escrita, as leituras do tenant continuam no primário
+        self.DATABASE_REPLICA_URLS = [
+            url.strip().replace("postgres://", "postgresql://", 1)
+            for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+        ]
+        self.DB_REPLICA_JANELA_ESCRITA = float(os.getenv("DB_REPLICA_JANELA_ESCRITA", 5))
+
+        # Esquema gerenciado pelas migrations; True cria as tabelas no boot (só desenvolvimento)
+        self.DB_AUTO_CREATE = _env_bool("DB_AUTO_CREATE", "False")
+
+        # Contadores por usuário para o resumo do dashboard (tabela catalogo_contadores)
+        self.ESTATISTICAS_CONTADORES = _env_bool("ESTATISTICAS_CONTADORES", "False")
+
+        # Cache do cardápio (CARDAPIO_CACHE_URL=redis://... para compartilhar entre workers)
+        self.CARDAPIO_CACHE_URL = os.getenv("CARDAPIO_CACHE_URL")
+        self.CARDAPIO_CACHE_TTL = int(os.getenv("CARDAPIO_CACHE_TTL", 300))
+        self.CARDAPIO_CACHE_MAX_ITENS = int(os.getenv("CARDAPIO_CACHE_MAX_ITENS", 1024))
+
+        # Cache da identidade do usuário logado (user_loader)
+        self.USUARIO_CACHE_TTL = int(os.getenv("USUARIO_CACHE_TTL", 60))
+        self.USUARIO_CACHE_MAX_ITENS = int(os.getenv("USUARIO_CACHE_MAX_ITENS", 1024))
+
+        # Login com Google: endpoints (sobrescreva para apontar para o stub
+        # benchmarks/stub_oauth_google.py), timeout das chamadas e validade do cache de JWKS
+        self.GOOGLE_AUTHORIZE_URL = os.getenv("GOOGLE_AUTHORIZE_URL", "https://accounts.google.com/o/oauth2/auth")
+        self.GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+        self.GOOGLE_USERINFO_URL = os.getenv("GOOGLE_USERINFO_URL", "https://openidconnect.googleapis.com/v1/userinfo")
+        self.GOOGLE_JWKS_URI = os.getenv("GOOGLE_JWKS_URI", "https://www.googleapis.com/oauth2/v3/certs")
+        self.GOOGLE_HTTP_TIMEOUT = float(os.getenv("GOOGLE_HTTP_TIMEOUT", 5))
+        self.GOOGLE_JWKS_TTL = int(os.getenv("GOOGLE_JWKS_TTL", 3600))
+
+        # Logging: nível, formato (json|texto) e amostragem por nível, ex.: DEBUG=0.1,INFO=0.5
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+        self.LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+        self.LOG_AMOSTRAGEM = os.getenv("LOG_AMOSTRAGEM", "")
+
+        # Cardápio público pré-renderado (padrão: instance/cardapios)
+        self.CARDAPIO_PUBLICO_DIR = os.getenv("CARDAPIO_PUBLICO_DIR", "")
+        self.CARDAPIO_PUBLICO_MAX_AGE = int(os.getenv("CARDAPIO_PUBLICO_MAX_AGE", 60))
+
+        # Respostas JSON maiores que isso (bytes) vão em gzip se o cliente aceitar; 0 desliga
+        self.JSON_GZIP_MINIMO = int(os.getenv("JSON_GZIP_MINIMO", 1024))
+        self.JSON_GZIP_NIVEL = int(os.getenv("JSON_GZIP_NIVEL", 6))
+
+        # Instrumentação por requisição (Server-Timing, histogramas, detector de N+1)
+        self.INSTRUMENTACAO_ATIVA = _env_bool("INSTRUMENTACAO_ATIVA", "False")
+        self.INSTRUMENTACAO_LIMITE_REPETICOES = int(os.getenv("INSTRUMENTACAO_LIMITE_REPETICOES", 5))
+
+        # Usuários (ids, separados por vírgula) que podem ver /api/stats/*
+        self.ADMIN_USUARIO_IDS = {
+            int(id) for id in os.getenv("ADMIN_USUARIO_IDS", "").split(",") if id.strip()
+        }
+
+        # Configurações de CORS
+        self.CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
+        self.CORS_SUPPORTS_CREDENTIALS = _env_bool("CORS_SUPPORTS_CREDENTIALS", "True")
+
+        # Configurações do Flask
+        self.FLASK_DEBUG = _env_bool("FLASK_DEBUG", "False")
+        self.SECRET_KEY = os.getenv("SECRET_KEY", "chave-secreta-padrao-mude-isso")
+
     # Configuração adicional para SQLAlchemy Engine Options
     @property
     def SQLALCHEMY_ENGINE_OPTIONS(self):
-        return {"echo": self.SQLALCHEMY_ECHO}
+        return self._opcoes_engine(self.SQLALCHEMY_DATABASE_URI)
+
+    @property
+    def SQLALCHEMY_BINDS(self):
+        # O Flask-SQLAlchemy não aplica SQLALCHEMY_ENGINE_OPTIONS aos binds
+        return {
+            f"replica_{i}": {"url": url, **self._opcoes_engine(url)}
+            for i, url in enumerate(self.DATABASE_REPLICA_URLS, start=1)
+        }
+
+    def _opcoes_engine(self, uri):
+        opcoes = {"echo": self.SQLALCHEMY_ECHO, "pool_pre_ping": self.DB_POOL_PRE_PING}
+        if uri.startswith("sqlite"):
+            return opcoes
+
+        opcoes.update({
+            "poolclass": QueuePoolInstrumentado,
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+        })
+        if uri.startswith("postgresql"):
+            opcoes["connect_args"] = {"options": f"-c statement_timeout={self.DB_STATEMENT_TIMEOUT_MS}"}
+        return opcoes
 
 # Cria uma instância da configuração
-config = Config()
\ No newline at end of file
+config = Config()
@@ -1,18 +1,24 @@
 from flask import Blueprint, request, jsonify, abort
 from http import HTTPStatus
-from typing import List
 from flask_login import login_required, current_user
 from extensions import db
+from replicas import primario
 from model.CategoriaModel import CategoriaModel
 from repository.CategoriaRepository import CategoriaRepository
+from signals import notificar_alteracao_catalogo
+from serializacao import linhas_para_dicts
+from service.CatalogoVersaoService import get_condicional
 
 categoria_bp = Blueprint('categorias', __name__, url_prefix='/api/categorias')
 
 @categoria_bp.route('/', methods=['GET'])
 @login_required
+@get_condicional
 def listar_categorias():
-    categorias: List[CategoriaModel] = CategoriaRepository.listar_por_usuario(current_user.id)
-    return jsonify([categoria.to_dict() for categoria in categorias])
+    if request.args.get('include') == 'produtos':
+        return jsonify(CategoriaRepository.listar_com_produtos_leitura(current_user.id))
+
+    return jsonify(linhas_para_dicts(CategoriaRepository.listar_com_contagem(current_user.id)))
 
 @categoria_bp.route('/', methods=['POST'])
 @login_required
@@ -21,7 +27,10 @@ def criar_categoria():
     if not data or 'nome' not in data:
         abort(HTTPStatus.BAD_REQUEST, description="Nome da categoria é obrigatório")
 
-    if CategoriaRepository.existe_por_nome_e_usuario(data['nome'], current_user.id):
+    # Checagens antes de escrever: no primário, nunca numa réplica atrasada
+    with primario():
+        existe = CategoriaRepository.existe_por_nome_e_usuario(data['nome'], current_user.id)
+    if existe:
         abort(HTTPStatus.CONFLICT, description="Categoria já existe")
     
     categoria = CategoriaModel(
@@ -30,10 +39,12 @@ def criar_categoria():
         usuario_id=current_user.id
     )
     CategoriaRepository.salvar(categoria)
+    notificar_alteracao_catalogo(current_user.id)
     return jsonify(categoria.to_dict()), HTTPStatus.CREATED
 
 @categoria_bp.route('/<int:id>', methods=['GET'])
 @login_required
+@get_condicional
 def buscar_categoria(id: int):
     categoria = CategoriaRepository.buscar_por_id_e_usuario(id, current_user.id)
     if not categoria:
@@ -43,7 +54,8 @@ def buscar_categoria(id: int):
 @categoria_bp.route('/<int:id>', methods=['PUT'])
 @login_required
 def atualizar_categoria(id: int):
-    categoria = CategoriaRepository.buscar_por_id_e_usuario(id, current_user.id)
+    with primario():
+        categoria = CategoriaRepository.buscar_por_id_e_usuario(id, current_user.id)
     if not categoria:
         abort(HTTPStatus.NOT_FOUND)
     
@@ -51,12 +63,16 @@ def atualizar_categoria(id: int):
     if not data or 'nome' not in data:
         abort(HTTPStatus.BAD_REQUEST, description="Nome da categoria é obrigatório")
     
-    if data['nome'] != categoria.nome and CategoriaRepository.existe_por_nome_e_usuario(data['nome'], current_user.id):
+    with primario():
+        existe = (data['nome'] != categoria.nome
+                  and CategoriaRepository.existe_por_nome_e_usuario(data['nome'], current_user.id))
+    if existe:
         abort(HTTPStatus.CONFLICT, description="Categoria já existe")
     
     categoria.nome = data['nome']
     categoria.descricao = data.get('descricao', categoria.descricao)
     CategoriaRepository.salvar(categoria)
+    notificar_alteracao_catalogo(current_user.id)
     
     return jsonify(categoria.to_dict())
 
@@ -65,4 +81,5 @@ def atualizar_categoria(id: int):
 def deletar_categoria(id: int):
     if not CategoriaRepository.deletar_por_id_e_usuario(id, current_user.id):
         abort(HTTPStatus.NOT_FOUND)
+    notificar_alteracao_catalogo(current_user.id)
     return '', HTTPStatus.NO_CONTENT
\ No newline at end of file
@@ -1,54 +1,109 @@
-from flask import Blueprint, request, jsonify, abort
+from flask import Blueprint, g, request, jsonify, abort, Response, stream_with_context
 from http import HTTPStatus
+from werkzeug.exceptions import HTTPException
+from sqlalchemy.exc import OperationalError
 from decimal import Decimal
 from flask_login import login_required, current_user
 from model.ProdutoModel import ProdutoModel
 from extensions import db
+from replicas import primario
 from model.CategoriaModel import CategoriaModel
-from repository.ProdutoRepository import ProdutoRepository
+from repository.ProdutoRepository import ProdutoRepository, CAMPOS_LISTAGEM
+from service.CardapioService import CardapioService
+from service.EstatisticasService import EstatisticasService
+from service.ImportacaoService import ImportacaoService, FORMATOS
+from service.CatalogoVersaoService import get_condicional
+from signals import notificar_alteracao_catalogo
+from serializacao import linhas_para_dicts
 from datetime import datetime
+import io
+import logging
 
 produto_bp = Blueprint('produtos', __name__, url_prefix='/api/produtos')
 repo = ProdutoRepository()
+logger = logging.getLogger(__name__)
+
+LIMITE_MAXIMO_PAGINA = 500
+LIMITE_MAXIMO_BUSCA = 100
+
+def _int_arg(args, nome):
+    valor = args.get(nome)
+    if valor is None or valor == '':
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        abort(HTTPStatus.BAD_REQUEST, description=f"Parâmetro '{nome}' deve ser um número inteiro")
+
+def parse_listagem_args(args):
+    """Valida os parâmetros de paginação, filtro e projeção da listagem"""
+    after = _int_arg(args, 'after')
+    limit = _int_arg(args, 'limit')
+    categoria_id = _int_arg(args, 'categoria_id')
+
+    if limit is not None and not 1 <= limit <= LIMITE_MAXIMO_PAGINA:
+        abort(HTTPStatus.BAD_REQUEST, description=f"'limit' deve estar entre 1 e {LIMITE_MAXIMO_PAGINA}")
+
+    disponivel = args.get('disponivel')
+    if disponivel is not None:
+        if disponivel.lower() not in ('true', 'false', '1', '0'):
+            abort(HTTPStatus.BAD_REQUEST, description="'disponivel' deve ser true ou false")
+        disponivel = disponivel.lower() in ('true', '1')
+
+    campos = None
+    if args.get('fields'):
+        campos = [campo.strip() for campo in args['fields'].split(',') if campo.strip()]
+        invalidos = [campo for campo in campos if campo not in CAMPOS_LISTAGEM]
+        if invalidos:
+            abort(HTTPStatus.BAD_REQUEST, description=f"Campos inválidos: {', '.join(invalidos)}")
+
+    return {'after': after, 'limit': limit, 'categoria_id': categoria_id,
+            'disponivel': disponivel, 'campos': campos}
 
 @produto_bp.route('/', methods=['GET'])
 @login_required
+@get_condicional
 def listar_produtos():
+    filtros = parse_listagem_args(request.args)
     try:
-        print(f"🔍 Listando produtos para usuário: {current_user.id}")
+        linhas = repo.find_by_usuario_paginado(current_user.id, **filtros)
+        logger.debug("Produtos listados para usuário %s: %s", current_user.id, len(linhas))
         
-        produtos = repo.find_by_usuario(current_user.id)
-        print(f"📊 Produtos encontrados: {len(produtos)}")
-        
-        produtos_data = []
-        for produto in produtos:
-            try:
-                produto_dict = produto.to_dict()
-                produtos_data.append(produto_dict)
-            except Exception as e:
-                print(f"⚠️ Erro ao serializar produto {produto.id}: {str(e)}")
-                # Adiciona dados mínimos para evitar erro completo
-                produtos_data.append({
-                    'id': produto.id,
-                    'nome': produto.nome,
-                    'preco': float(produto.preco),
-                    'erro': 'Erro na serialização'
-                })
-        
-        return jsonify(produtos_data)
+        campos = filtros['campos']
+        # O id entra sempre na consulta (cursor), mas só sai se foi pedido
+        omitir = ('id',) if campos and 'id' not in campos else ()
+        response = jsonify(linhas_para_dicts(linhas, omitir))
+        # Página cheia: informa o cursor da próxima página
+        if filtros['limit'] and len(linhas) == filtros['limit']:
+            response.headers['X-Proximo-Cursor'] = str(linhas[-1].id)
+        return response
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ ERRO ao listar produtos: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao listar produtos")
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro interno do servidor: {str(e)}")
 
+@produto_bp.route('/search', methods=['GET'])
+@login_required
+@get_condicional
+def buscar_produtos():
+    termo = (request.args.get('q') or '').strip()
+    if not termo:
+        abort(HTTPStatus.BAD_REQUEST, description="Parâmetro 'q' é obrigatório")
+    limite = _int_arg(request.args, 'limit') or 20
+    if not 1 <= limite <= LIMITE_MAXIMO_BUSCA:
+        abort(HTTPStatus.BAD_REQUEST, description=f"'limit' deve estar entre 1 e {LIMITE_MAXIMO_BUSCA}")
+
+    linhas = repo.buscar(current_user.id, termo, limite)
+    return jsonify(linhas_para_dicts(linhas))
+
 @produto_bp.route('/', methods=['POST'])
 @login_required
 def criar_produto():
     try:
         data = request.get_json()
-        print(f"📦 Dados recebidos no POST: {data}")
+        logger.debug("Dados recebidos no POST: %s", data)
         
         if not data:
             abort(HTTPStatus.BAD_REQUEST, description="Nenhum dado fornecido")
@@ -73,7 +128,7 @@ def criar_produto():
         # Converte preço para Decimal
         try:
             preco_decimal = Decimal(str(data['preco']))
-        except (ValueError, TypeError):
+        except (ArithmeticError, ValueError, TypeError):
             abort(HTTPStatus.BAD_REQUEST, description="Preço deve ser um número válido")
         
         # Cria o produto
@@ -89,40 +144,206 @@ def criar_produto():
         
         db.session.add(produto)
         db.session.commit()
+        notificar_alteracao_catalogo(current_user.id)
         
-        print(f"✅ Produto criado com sucesso: {produto.to_dict()}")
+        produto_dict = produto.to_dict()
+        logger.info("Produto %s criado", produto.id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Produto criado: %s", produto_dict)
         
-        return jsonify(produto.to_dict()), HTTPStatus.CREATED
+        return jsonify(produto_dict), HTTPStatus.CREATED
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.session.rollback()
-        print(f"❌ ERRO ao criar produto: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao criar produto")
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro interno: {str(e)}")
 
+CAMPOS_LOTE = ('disponivel', 'preco', 'quantidade')
+
+def _validar_alteracao(alteracao):
+    """Converte uma alteração do lote em {campo: valor}; levanta ValueError se inválida"""
+    valores = {}
+    if 'disponivel' in alteracao:
+        if not isinstance(alteracao['disponivel'], bool):
+            raise ValueError("'disponivel' deve ser true ou false")
+        valores['disponivel'] = alteracao['disponivel']
+    if 'preco' in alteracao:
+        try:
+            preco = Decimal(str(alteracao['preco']))
+        except (ArithmeticError, ValueError, TypeError):
+            raise ValueError("Preço deve ser um número válido")
+        if not preco.is_finite() or preco < 0:
+            raise ValueError("Preço deve ser um número válido")
+        valores['preco'] = preco
+    if 'quantidade' in alteracao:
+        quantidade = alteracao['quantidade']
+        if isinstance(quantidade, bool) or not isinstance(quantidade, int) or quantidade < 0:
+            raise ValueError("'quantidade' deve ser um inteiro não negativo")
+        valores['quantidade'] = quantidade
+    if not valores:
+        raise ValueError(f"Informe ao menos um dos campos: {', '.join(CAMPOS_LOTE)}")
+    return valores
+
+@produto_bp.route('/', methods=['PATCH'])
+@login_required
+def atualizar_produtos_em_lote():
+    data = request.get_json(silent=True)
+    alteracoes = data.get('alteracoes') if isinstance(data, dict) else data
+    if not isinstance(alteracoes, list) or not alteracoes:
+        abort(HTTPStatus.BAD_REQUEST, description="Envie uma lista de alterações")
+
+    usuario_id = current_user.id
+    ordem = []
+    resultados = {}
+    validas = {}
+    for alteracao in alteracoes:
+        id = alteracao.get('id') if isinstance(alteracao, dict) else None
+        if isinstance(id, bool) or not isinstance(id, int):
+            abort(HTTPStatus.BAD_REQUEST, description="Cada alteração precisa de um 'id' inteiro")
+        ordem.append(id)
+        try:
+            validas.setdefault(id, {}).update(_validar_alteracao(alteracao))
+        except ValueError as e:
+            resultados[id] = {'id': id, 'status': 'invalido', 'erro': str(e)}
+    for id in resultados:
+        validas.pop(id, None)
+
+    try:
+        valores_por_campo = {campo: {} for campo in CAMPOS_LOTE}
+        for id, valores in validas.items():
+            for campo, valor in valores.items():
+                valores_por_campo[campo][id] = valor
+
+        # O resultado vem do próprio UPDATE (no primário), não de uma consulta à parte
+        alterados = repo.atualizar_em_lote(usuario_id, valores_por_campo)
+        db.session.commit()
+        for id in validas:
+            resultados[id] = {'id': id, 'status': 'atualizado' if id in alterados else 'nao_encontrado'}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Erro ao atualizar produtos em lote")
+        abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro interno: {str(e)}")
+
+    atualizados = sum(1 for resultado in resultados.values() if resultado['status'] == 'atualizado')
+    if atualizados:
+        notificar_alteracao_catalogo(usuario_id)
+    return jsonify({'atualizados': atualizados, 'resultados': [resultados[id] for id in dict.fromkeys(ordem)]})
+
+LIMITE_ITENS_RESERVA = 500
+TENTATIVAS_RESERVA = 3
+
+def _quantidades_reserva(itens, resultados):
+    """Soma as quantidades pedidas por id; itens inválidos vão direto para resultados"""
+    quantidades = {}
+    for item in itens:
+        id = item.get('id') if isinstance(item, dict) else None
+        if isinstance(id, bool) or not isinstance(id, int):
+            abort(HTTPStatus.BAD_REQUEST, description="Cada item precisa de um 'id' inteiro")
+        quantidade = item.get('quantidade', 1)
+        if isinstance(quantidade, bool) or not isinstance(quantidade, int) or quantidade < 1:
+            resultados[id] = {'id': id, 'status': 'invalido', 'erro': "'quantidade' deve ser um inteiro positivo"}
+            continue
+        quantidades[id] = quantidades.get(id, 0) + quantidade
+    for id in resultados:
+        quantidades.pop(id, None)
+    return quantidades
+
+def _conflito_transacao(erro):
+    """Deadlock ou falha de serialização no Postgres: a transação pode ser repetida"""
+    return getattr(erro.orig, 'pgcode', None) in ('40P01', '40001')
+
+@produto_bp.route('/reservar', methods=['POST'])
+@login_required
+def reservar_estoque():
+    """
+    Baixa o estoque de vários produtos de uma vez: {"itens": [{"id": 1, "quantidade": 2}, ...]}.
+    Cada item é reservado só se houver estoque; com "tudo_ou_nada": true qualquer
+    falha desfaz a reserva inteira. Responde 409 quando nada foi reservado.
+    """
+    data = request.get_json(silent=True)
+    itens = data.get('itens') if isinstance(data, dict) else data
+    if not isinstance(itens, list) or not itens:
+        abort(HTTPStatus.BAD_REQUEST, description="Envie uma lista de itens")
+    if len(itens) > LIMITE_ITENS_RESERVA:
+        abort(HTTPStatus.BAD_REQUEST, description=f"No máximo {LIMITE_ITENS_RESERVA} itens por reserva")
+    tudo_ou_nada = isinstance(data, dict) and data.get('tudo_ou_nada') is True
+
+    usuario_id = current_user.id
+    resultados = {}
+    quantidades = _quantidades_reserva(itens, resultados)
+    for tentativa in range(1, TENTATIVAS_RESERVA + 1):
+        try:
+            reservados = repo.reservar_estoque(usuario_id, quantidades) if quantidades else {}
+            recusados = [id for id in quantidades if id not in reservados]
+            estoque = repo.estoque_por_id(recusados, usuario_id) if recusados else {}
+            aplicada = not (tudo_ou_nada and (recusados or resultados))
+            if aplicada:
+                db.session.commit()
+            else:
+                db.session.rollback()
+            break
+        except OperationalError as e:
+            db.session.rollback()
+            if tentativa == TENTATIVAS_RESERVA or not _conflito_transacao(e):
+                logger.exception("Erro ao reservar estoque")
+                abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro interno: {str(e)}")
+            logger.warning("Conflito ao reservar estoque, tentativa %s", tentativa)
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Erro ao reservar estoque")
+            abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro interno: {str(e)}")
+
+    for id, pedida in quantidades.items():
+        if id in reservados and aplicada:
+            quantidade, disponivel = reservados[id]
+            resultados[id] = {'id': id, 'status': 'reservado', 'pedido': pedida,
+                              'quantidade': quantidade, 'disponivel': disponivel}
+        elif id in reservados:
+            # tudo_ou_nada: havia estoque, mas outro item falhou
+            resultados[id] = {'id': id, 'status': 'nao_reservado', 'pedido': pedida}
+        elif id in estoque:
+            resultados[id] = {'id': id, 'status': 'estoque_insuficiente', 'pedido': pedida, 'em_estoque': estoque[id]}
+        else:
+            resultados[id] = {'id': id, 'status': 'nao_encontrado'}
+
+    total = len(reservados) if aplicada else 0
+    if total:
+        notificar_alteracao_catalogo(usuario_id)
+    ordem = dict.fromkeys(item['id'] for item in itens)
+    status = HTTPStatus.OK if total else HTTPStatus.CONFLICT
+    return jsonify({'reservados': total, 'resultados': [resultados[id] for id in ordem]}), status
+
 @produto_bp.route('/<int:id>', methods=['GET'])
 @login_required
+@get_condicional
 def buscar_produto(id):
     try:
         produto = repo.find_by_id_e_usuario(id, current_user.id)
         if not produto:
             abort(HTTPStatus.NOT_FOUND, description="Produto não encontrado")
         return jsonify(produto.to_dict())
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Erro ao buscar produto {id}: {str(e)}")
+        logger.exception("Erro ao buscar produto %s", id)
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description="Erro interno do servidor")
 
 @produto_bp.route('/<int:id>', methods=['PUT'])
 @login_required
 def atualizar_produto(id):
     try:
-        produto = repo.find_by_id_e_usuario(id, current_user.id)
+        # A linha que vai ser alterada vem do primário, nunca de uma réplica atrasada
+        with primario():
+            produto = repo.find_by_id_e_usuario(id, current_user.id)
         if not produto:
             abort(HTTPStatus.NOT_FOUND, description="Produto não encontrado")
         
         data = request.get_json()
-        print(f"📦 Dados recebidos no PUT: {data}")
+        logger.debug("Dados recebidos no PUT: %s", data)
         
         # Atualiza campos
         if 'nome' in data:
@@ -130,7 +351,7 @@ def atualizar_produto(id):
         if 'preco' in data:
             try:
                 produto.preco = Decimal(str(data['preco']))
-            except (ValueError, TypeError):
+            except (ArithmeticError, ValueError, TypeError):
                 abort(HTTPStatus.BAD_REQUEST, description="Preço deve ser um número válido")
         if 'quantidade' in data:
             produto.quantidade = data['quantidade']
@@ -151,78 +372,130 @@ def atualizar_produto(id):
             produto.categoria_id = categoria_id
         
         db.session.commit()
+        notificar_alteracao_catalogo(current_user.id)
         
-        print(f"✅ Produto atualizado: {produto.to_dict()}")
-        return jsonify(produto.to_dict())
+        produto_dict = produto.to_dict()
+        logger.info("Produto %s atualizado", id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Produto atualizado: %s", produto_dict)
+        return jsonify(produto_dict)
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Erro ao atualizar produto {id}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao atualizar produto %s", id)
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro interno: {str(e)}")
 
 @produto_bp.route('/<int:id>', methods=['DELETE'])
 @login_required
 def deletar_produto(id):
     try:
-        produto = repo.find_by_id_e_usuario(id, current_user.id)
+        with primario():
+            produto = repo.find_by_id_e_usuario(id, current_user.id)
         if not produto:
             abort(HTTPStatus.NOT_FOUND, description="Produto não encontrado")
         
         db.session.delete(produto)
         db.session.commit()
+        notificar_alteracao_catalogo(current_user.id)
         
-        print(f"✅ Produto deletado: {id}")
+        logger.info("Produto %s deletado", id)
         return '', HTTPStatus.NO_CONTENT
         
+    except HTTPException:
+        raise
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Erro ao deletar produto {id}: {str(e)}")
+        logger.exception("Erro ao deletar produto %s", id)
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro interno: {str(e)}")
 
 @produto_bp.route('/cardapio', methods=['GET'])
 @login_required
+@get_condicional
 def get_cardapio():
     try:
-        produtos = repo.find_by_usuario(current_user.id)
-        categorias = {}
-        total_produtos = 0
-
-        for produto in produtos:
-            if produto.categoria:
-                nome_cat = produto.categoria.nome
-                if nome_cat not in categorias:
-                    categorias[nome_cat] = {'disponiveis': [], 'indisponiveis': []}
-
-                item = {
-                    'id': produto.id,
-                    'nome': produto.nome, 
-                    'preco': float(produto.preco),
-                    'quantidade': produto.quantidade,
-                    'descricao': produto.descricao
-                }
-                
-                if produto.disponivel:
-                    categorias[nome_cat]['disponiveis'].append(item)
-                else:
-                    categorias[nome_cat]['indisponiveis'].append(item)
-
-                total_produtos += 1
+        dados = CardapioService.obter_cardapio(current_user.id, g.catalogo_versao)
 
         return jsonify({
-            'atualizado_em': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-            'categorias': categorias,
-            'total_produtos': total_produtos,
+            'atualizado_em': dados['atualizado_em'],
+            'categorias': dados['categorias'],
+            'total_produtos': dados['total_produtos'],
             'usuario': current_user.nome
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Erro ao carregar cardápio: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao carregar cardápio")
         abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro ao carregar cardápio: {str(e)}")
 
+@produto_bp.route('/estatisticas', methods=['GET'])
+@login_required
+@get_condicional
+def estatisticas():
+    """Resumo do dashboard: totais, disponíveis, contagem por categoria e faixa de preço"""
+    try:
+        return jsonify(EstatisticasService.obter(current_user.id))
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Erro ao calcular estatísticas")
+        abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro ao calcular estatísticas: {str(e)}")
+
+def _formato_upload():
+    """Descobre o formato pelo ?formato=, pela extensão do arquivo ou pelo Content-Type"""
+    formato = request.args.get('formato')
+    if not formato:
+        arquivo = request.files.get('arquivo')
+        nome = (arquivo.filename if arquivo else '') or ''
+        tipo = (arquivo.mimetype if arquivo else request.mimetype) or ''
+        if nome.endswith('.csv') or tipo == 'text/csv':
+            formato = 'csv'
+        elif nome.endswith(('.ndjson', '.jsonl')) or tipo in ('application/x-ndjson', 'application/ndjson'):
+            formato = 'ndjson'
+    if formato not in FORMATOS:
+        abort(HTTPStatus.BAD_REQUEST, description="Formato deve ser 'csv' ou 'ndjson'")
+    return formato
+
+@produto_bp.route('/importar', methods=['POST'])
+@login_required
+def importar_produtos():
+    formato = _formato_upload()
+    arquivo = request.files.get('arquivo')
+    stream = arquivo.stream if arquivo else io.BufferedReader(request.stream)
+
+    try:
+        resumo = ImportacaoService.importar(current_user.id, ImportacaoService.ler_linhas(stream, formato))
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Erro ao importar produtos")
+        abort(HTTPStatus.INTERNAL_SERVER_ERROR, description=f"Erro interno: {str(e)}")
+
+    if resumo['importados']:
+        notificar_alteracao_catalogo(current_user.id)
+    logger.info("Importação: %s produtos, %s erros", resumo['importados'], len(resumo['erros']))
+    status = HTTPStatus.CREATED if resumo['importados'] else HTTPStatus.UNPROCESSABLE_ENTITY
+    return jsonify(resumo), status
+
+@produto_bp.route('/exportar', methods=['GET'])
+@login_required
+def exportar_produtos():
+    formato = request.args.get('formato', 'csv')
+    if formato not in FORMATOS:
+        abort(HTTPStatus.BAD_REQUEST, description="Formato deve ser 'csv' ou 'ndjson'")
+
+    mimetype = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    response = Response(
+        stream_with_context(ImportacaoService.exportar(current_user.id, formato)),
+        mimetype=mimetype
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename=produtos.{formato}'
+    return response
+
 @produto_bp.route('/health', methods=['GET'])
 def health_check():
     """Endpoint para verificar se a API está funcionando"""
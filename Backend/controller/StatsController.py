@@ -0,0 +1,55 @@
+from http import HTTPStatus
+from flask import Blueprint, abort, current_app, jsonify
+from flask_login import current_user, login_required
+from extensions import cardapio_cache, metricas_pool, usuario_cache, instrumentacao, cardapio_publico, roteador_replicas, contadores_catalogo
+
+stats_bp = Blueprint('stats', __name__, url_prefix='/api/stats')
+
+@stats_bp.before_request
+@login_required
+def exigir_admin():
+    """As métricas juntam todos os tenants: só os ids de ADMIN_USUARIO_IDS acessam"""
+    if current_user.id not in current_app.config.get("ADMIN_USUARIO_IDS", set()):
+        abort(HTTPStatus.FORBIDDEN)
+
+@stats_bp.route('/cache', methods=['GET'])
+@login_required
+def cache_stats():
+    """Contadores de hit/miss do cache do cardápio (por worker)"""
+    return jsonify(cardapio_cache.stats())
+
+@stats_bp.route('/cache/usuarios', methods=['GET'])
+@login_required
+def usuario_cache_stats():
+    """Contadores de hit/miss do cache de usuários do user_loader (por worker)"""
+    return jsonify(usuario_cache.stats())
+
+@stats_bp.route('/pool', methods=['GET'])
+@login_required
+def pool_stats():
+    """Uso do pool de conexões e tempo de espera por conexão (por worker)"""
+    return jsonify(metricas_pool.stats())
+
+@stats_bp.route('/endpoints', methods=['GET'])
+@login_required
+def endpoint_stats():
+    """Latência, queries por requisição e suspeitas de N+1 por endpoint (por worker)"""
+    return jsonify(instrumentacao.stats())
+
+@stats_bp.route('/cardapio-publico', methods=['GET'])
+@login_required
+def cardapio_publico_stats():
+    """Snapshots do cardápio público gerados por este worker"""
+    return jsonify(cardapio_publico.stats())
+
+@stats_bp.route('/replicas', methods=['GET'])
+@login_required
+def replicas_stats():
+    """Leituras enviadas às réplicas x mantidas no primário (por worker)"""
+    return jsonify(roteador_replicas.stats())
+
+@stats_bp.route('/contadores', methods=['GET'])
+@login_required
+def contadores_stats():
+    """Leituras do resumo do dashboard servidas pelos contadores x recontagens (por worker)"""
+    return jsonify(contadores_catalogo.stats())
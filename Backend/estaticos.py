@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from flask import current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+# Variantes pré-comprimidas geradas por compactar_estaticos.py, em ordem de preferência
+VARIANTES = (('br', '.br'), ('gzip', '.gz'))
+UM_ANO = 365 * 24 * 60 * 60
+
+class HashesEstaticos:
+    """Hash do conteúdo de cada arquivo estático, recalculado quando o mtime muda"""
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self._hashes = {}
+
+    def obter(self, filename):
+        caminho = safe_join(self.pasta, filename)
+        if caminho is None or not os.path.isfile(caminho):
+            return None
+        mtime = os.path.getmtime(caminho)
+        item = self._hashes.get(filename)
+        if item is None or item[0] != mtime:
+            with open(caminho, 'rb') as arquivo:
+                item = (mtime, hashlib.sha256(arquivo.read()).hexdigest()[:12])
+            self._hashes[filename] = item
+        return item[1]
+
+
+def _aceita(encoding):
+    return request.accept_encodings[encoding] > 0
+
+
+def _variante_atual(original, comprimido):
+    """
+    A variante .br/.gz só vale se foi gerada depois do original: um deploy que
+    altera o arquivo sem rodar compactar_estaticos.py deixaria o conteúdo antigo
+    preso por um ano (immutable) na URL do hash novo
+    """
+    try:
+        return os.path.getmtime(comprimido) >= os.path.getmtime(original)
+    except OSError:
+        return False
+
+
+def configurar_estaticos(app):
+    """
+    - url_for('static') ganha ?v=<hash do conteúdo>; com o hash certo a
+      resposta vai com Cache-Control de um ano e immutable
+    - serve .br/.gz pré-comprimidos quando existem, não são mais antigos que
+      o original e o cliente aceita
+    - comprime em gzip respostas JSON acima de JSON_GZIP_MINIMO bytes
+    """
+    hashes = HashesEstaticos(app.static_folder)
+
+    @app.url_defaults
+    def _versionar_estatico(endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            versao = hashes.obter(values['filename'])
+            if versao:
+                values['v'] = versao
+
+    def servir_estatico(filename):
+        versao = request.args.get('v')
+        max_age = UM_ANO if versao and versao == hashes.obter(filename) else None
+        original = safe_join(app.static_folder, filename)
+        for encoding, extensao in VARIANTES:
+            comprimido = safe_join(app.static_folder, filename + extensao)
+            if (_aceita(encoding) and original and comprimido and os.path.isfile(comprimido)
+                    and _variante_atual(original, comprimido)):
+                # O mimetype vem do arquivo original, não do .br/.gz
+                response = send_from_directory(app.static_folder, filename + extensao,
+                                               mimetype=mimetypes.guess_type(filename)[0], max_age=max_age)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(app.static_folder, filename, max_age=max_age)
+        response.vary.add('Accept-Encoding')
+        if max_age:
+            response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = servir_estatico
+
+    @app.after_request
+    def _comprimir_json(response):
+        minimo = current_app.config["JSON_GZIP_MINIMO"]
+        if (not minimo or response.mimetype != 'application/json' or response.direct_passthrough
+                or response.is_streamed or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        if not _aceita('gzip') or response.content_length is None or response.content_length < minimo:
+            return response
+
+        response.set_data(gzip.compress(response.get_data(), compresslevel=current_app.config["JSON_GZIP_NIVEL"]))
+        response.headers['Content-Encoding'] = 'gzip'
+        # A representação comprimida tem outros bytes: ETag passa a ser fraca,
+        # o que o get_condicional (contains_weak) continua aceitando
+        etag, _ = response.get_etag()
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
@@ -1,9 +1,25 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
-from authlib.integrations.flask_client import OAuth
+from flask_migrate import Migrate
+from service.CardapioCache import CardapioCache
+from service.UsuarioCache import UsuarioCache
+from service.CardapioPublico import CardapioPublico
+from service.ContadoresCatalogo import ContadoresCatalogo
+from service.GoogleOAuth import OAuthReutilizavel
+from pool_metrics import MetricasPool
+from instrumentacao import Instrumentacao
+from replicas import RoteadorReplicas, SessaoRoteada
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": SessaoRoteada})
 bcrypt = Bcrypt()
 login_manager = LoginManager()
-oauth = OAuth()
\ No newline at end of file
+oauth = OAuthReutilizavel()
+migrate = Migrate()
+cardapio_cache = CardapioCache()
+metricas_pool = MetricasPool()
+usuario_cache = UsuarioCache()
+instrumentacao = Instrumentacao()
+cardapio_publico = CardapioPublico()
+roteador_replicas = RoteadorReplicas()
+contadores_catalogo = ContadoresCatalogo()
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from pool_metrics import JanelaLatencias
+
+logger = logging.getLogger(__name__)
+
+class EstatisticasEndpoint:
+    """Histograma de latência e totais de SQL de um endpoint (por worker)"""
+
+    def __init__(self):
+        self.latencias = JanelaLatencias()
+        self.queries = 0
+        self.tempo_sql = 0.0
+        self.suspeitas_n_mais_1 = 0
+        self.mais_lenta = {'ms': 0.0, 'sql': None}
+
+    def resumo(self):
+        total = self.latencias.total
+        return {
+            'latencia': self.latencias.resumo_ms(),
+            'queries_media': round(self.queries / total, 2) if total else 0.0,
+            'sql_media_ms': round(self.tempo_sql / total * 1000, 3) if total else 0.0,
+            'suspeitas_n_mais_1': self.suspeitas_n_mais_1,
+            'query_mais_lenta': self.mais_lenta,
+        }
+
+
+class Instrumentacao:
+    """
+    Mede tempo de parede, número de queries e tempo de SQL por requisição,
+    informa em Server-Timing e acumula histogramas por endpoint.
+    Desligada por padrão (INSTRUMENTACAO_ATIVA); sem ela nenhum hook é registrado.
+    """
+
+    def __init__(self):
+        self.ativa = False
+        self.limite_repeticoes = 5
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        self.ativa = app.config["INSTRUMENTACAO_ATIVA"]
+        self.limite_repeticoes = max(2, app.config["INSTRUMENTACAO_LIMITE_REPETICOES"])
+        if not self.ativa:
+            return
+        with app.app_context():
+            # Primário e réplicas de leitura (SQLALCHEMY_BINDS)
+            engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._antes_query)
+            event.listen(engine, 'after_cursor_execute', self._depois_query)
+        app.before_request(self._iniciar)
+        app.after_request(self._server_timing)
+        app.teardown_request(self._finalizar)
+
+    # ---- SQL ----
+    @staticmethod
+    def _medicao_atual():
+        return g.get('_instrumentacao') if has_request_context() else None
+
+    def _antes_query(self, conn, cursor, statement, parameters, context, executemany):
+        if self._medicao_atual() is not None:
+            conn.info.setdefault('_instrumentacao_inicio', []).append(time.perf_counter())
+
+    def _depois_query(self, conn, cursor, statement, parameters, context, executemany):
+        medicao = self._medicao_atual()
+        inicios = conn.info.get('_instrumentacao_inicio')
+        if medicao is None or not inicios:
+            return
+        duracao = time.perf_counter() - inicios.pop()
+        medicao['queries'] += 1
+        medicao['tempo_sql'] += duracao
+        # O texto é parametrizado: a mesma query com ids diferentes conta como repetição
+        medicao['repeticoes'][statement] += 1
+        if duracao > medicao['mais_lenta'][0]:
+            medicao['mais_lenta'] = (duracao, statement)
+
+    # ---- Requisição ----
+    def _iniciar(self):
+        g._instrumentacao = {
+            'inicio': time.perf_counter(),
+            'queries': 0,
+            'tempo_sql': 0.0,
+            'mais_lenta': (0.0, None),
+            'repeticoes': Counter(),
+        }
+
+    def _server_timing(self, response):
+        medicao = g.get('_instrumentacao')
+        if medicao is None:
+            return response
+        total_ms = (time.perf_counter() - medicao['inicio']) * 1000
+        response.headers.add('Server-Timing', f'app;dur={total_ms:.2f}')
+        response.headers.add(
+            'Server-Timing', f'db;dur={medicao["tempo_sql"] * 1000:.2f};desc="{medicao["queries"]} queries"'
+        )
+        if medicao['mais_lenta'][1]:
+            response.headers.add('Server-Timing', f'db-max;dur={medicao["mais_lenta"][0] * 1000:.2f}')
+        return response
+
+    def _finalizar(self, exc=None):
+        medicao = g.pop('_instrumentacao', None)
+        if medicao is None:
+            return
+        duracao = time.perf_counter() - medicao['inicio']
+        endpoint = request.endpoint or 'desconhecido'
+        repetidas = [
+            (statement, vezes) for statement, vezes in medicao['repeticoes'].items()
+            if vezes >= self.limite_repeticoes
+        ]
+        for statement, vezes in repetidas:
+            logger.warning(
+                "Possível N+1 em %s: query repetida %s vezes: %s", endpoint, vezes, statement[:300]
+            )
+
+        with self._lock:
+            estatisticas = self._endpoints.get(endpoint)
+            if estatisticas is None:
+                estatisticas = self._endpoints[endpoint] = EstatisticasEndpoint()
+            estatisticas.queries += medicao['queries']
+            estatisticas.tempo_sql += medicao['tempo_sql']
+            estatisticas.suspeitas_n_mais_1 += bool(repetidas)
+            lenta_duracao, lenta_sql = medicao['mais_lenta']
+            if lenta_sql and lenta_duracao * 1000 > estatisticas.mais_lenta['ms']:
+                estatisticas.mais_lenta = {'ms': round(lenta_duracao * 1000, 3), 'sql': lenta_sql[:500]}
+        estatisticas.latencias.registrar(duracao)
+
+    def stats(self):
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        return {
+            'ativa': self.ativa,
+            'limite_repeticoes': self.limite_repeticoes,
+            'endpoints': {nome: estatisticas.resumo() for nome, estatisticas in sorted(endpoints.items())},
+        }
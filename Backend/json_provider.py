@@ -0,0 +1,55 @@
+import decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Com até 15 dígitos significativos o float tem a mesma representação decimal
+# (ex.: Numeric(10, 2)); acima disso o valor vai como string para não perder precisão
+DIGITOS_EXATOS_FLOAT = 15
+
+def decimal_para_json(valor):
+    if valor.is_finite() and len(valor.as_tuple().digits) <= DIGITOS_EXATOS_FLOAT:
+        return float(valor)
+    return str(valor)
+
+
+class JSONProviderRapido(DefaultJSONProvider):
+    """
+    Provider JSON do app: usa orjson quando instalado e o json da stdlib como
+    fallback. Decimal sai como número (o provider padrão do Flask usa string).
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, decimal.Decimal):
+            return decimal_para_json(o)
+        return DefaultJSONProvider.default(o)
+
+    def _opcoes_orjson(self):
+        # Datas seguem o formato HTTP do provider padrão, via default()
+        opcoes = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        return opcoes
+
+    def dumps(self, obj, **kwargs):
+        # Argumentos extras (indent, separators...) só o json da stdlib entende
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._opcoes_orjson()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        legivel = self.compact is False or (self.compact is None and self._app.debug)
+        if orjson is None or legivel:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        corpo = orjson.dumps(obj, default=self.default, option=self._opcoes_orjson() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(corpo, mimetype=self.mimetype)
@@ -0,0 +1,146 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+# Um único QueueListener por processo: cada create_app() troca o anterior
+_listener = None
+
+
+class FiltroRequestId(logging.Filter):
+    """Anexa o id da requisição atual ao registro (roda na thread da requisição)"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id', '-')
+        elif not hasattr(record, 'request_id'):
+            # Fora do Flask (asgi.py) o id vem no extra do log
+            record.request_id = '-'
+        return True
+
+
+class FiltroAmostragem(logging.Filter):
+    """Mantém só uma fração dos registros de cada nível; níveis sem taxa passam sempre"""
+
+    def __init__(self, taxas):
+        super().__init__()
+        self.taxas = taxas
+
+    def filter(self, record):
+        taxa = self.taxas.get(record.levelno, 1.0)
+        return taxa >= 1.0 or random.random() < taxa
+
+
+class FormatadorJSON(logging.Formatter):
+
+    def format(self, record):
+        dados = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'request_id': getattr(record, 'request_id', '-'),
+            'msg': record.getMessage(),
+        }
+        if getattr(record, 'dados', None):
+            dados.update(record.dados)
+        if record.exc_text:
+            dados['exc'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class HandlerFila(QueueHandler):
+    """
+    Enfileira o registro já resolvido (mensagem e traceback em texto) para que
+    a formatação e a escrita no stdout aconteçam na thread do QueueListener.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _parse_amostragem(valor):
+    """'DEBUG=0.1,INFO=0.5' -> {10: 0.1, 20: 0.5}"""
+    taxas = {}
+    for item in filter(None, (parte.strip() for parte in (valor or '').split(','))):
+        nivel, _, taxa = item.partition('=')
+        taxas[logging.getLevelName(nivel.strip().upper())] = float(taxa)
+    return taxas
+
+
+def _parar_listener():
+    """Esvazia a fila e encerra a thread do listener atual, se houver"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_parar_listener)
+
+
+def configurar_logging(app):
+    """Logging estruturado com escrita fora da thread da requisição e ids de requisição"""
+    if app.config["LOG_FORMAT"] == "json":
+        formatador = FormatadorJSON()
+    else:
+        formatador = logging.Formatter('%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s')
+    saida = logging.StreamHandler(sys.stdout)
+    saida.setFormatter(formatador)
+
+    fila = queue.SimpleQueue()
+    handler_fila = HandlerFila(fila)
+    handler_fila.addFilter(FiltroRequestId())
+    handler_fila.addFilter(FiltroAmostragem(_parse_amostragem(app.config["LOG_AMOSTRAGEM"])))
+
+    global _listener
+    listener = QueueListener(fila, saida, respect_handler_level=True)
+    listener.start()
+
+    # O handler novo entra antes de o antigo sair para não perder registros;
+    # depois o listener anterior escreve o que ficou na fila dele e para
+    raiz = logging.getLogger()
+    raiz.addHandler(handler_fila)
+    for handler in list(raiz.handlers):
+        if isinstance(handler, HandlerFila) and handler is not handler_fila:
+            raiz.removeHandler(handler)
+    raiz.setLevel(app.config["LOG_LEVEL"].upper())
+    _parar_listener()
+    _listener = listener
+
+    # O app.logger do Flask passa a usar o handler da raiz
+    from flask.logging import default_handler
+    app.logger.removeHandler(default_handler)
+
+    log_requisicao = logging.getLogger('requisicao')
+
+    @app.before_request
+    def _iniciar_requisicao():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.inicio_requisicao = time.perf_counter()
+
+    @app.after_request
+    def _finalizar_requisicao(response):
+        response.headers['X-Request-ID'] = g.get('request_id', '')
+        if log_requisicao.isEnabledFor(logging.INFO):
+            duracao = time.perf_counter() - g.get('inicio_requisicao', time.perf_counter())
+            log_requisicao.info(
+                "%s %s %s", request.method, request.path, response.status_code,
+                extra={'dados': {'metodo': request.method, 'rota': request.path,
+                                 'status': response.status_code, 'duracao_ms': round(duracao * 1000, 2)}}
+            )
+        return response
+
+    return listener
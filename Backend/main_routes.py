@@ -1,45 +1,34 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, session, current_app, request
+from flask import Blueprint, render_template, redirect, url_for, flash, session, current_app, request, abort, send_file
 from flask_login import login_user, login_required, logout_user, current_user
 from sqlalchemy import inspect, text
 from datetime import datetime
+import logging
 import secrets
 
-from extensions import db
+from extensions import db, usuario_cache, cardapio_publico
 from model.ProdutoModel import ProdutoModel
 from model.CategoriaModel import CategoriaModel
-from model.UserModel import UsuarioModel
 from repository.CategoriaRepository import CategoriaRepository
+from repository.UsuarioRepository import UsuarioRepository
+from service.CardapioService import CardapioService
+from signals import notificar_alteracao_catalogo
+from serializacao import linhas_para_dicts
 
 main_bp = Blueprint('main', __name__)
+logger = logging.getLogger(__name__)
 
 # ========== FUNÇÕES AUXILIARES ==========
 def get_cardapio_data():
     try:
-        produtos = ProdutoModel.query.filter_by(usuario_id=current_user.id).all()
-        categorias = {}
-        for produto in produtos:
-            if produto.categoria:
-                nome_cat = produto.categoria.nome
-                if nome_cat not in categorias:
-                    categorias[nome_cat] = {'disponiveis': [], 'indisponiveis': []}
-                item = {
-                    'id': produto.id,
-                    'nome': produto.nome,
-                    'preco': float(produto.preco),
-                    'descricao': produto.descricao
-                }
-                if produto.disponivel:
-                    categorias[nome_cat]['disponiveis'].append(item)
-                else:
-                    categorias[nome_cat]['indisponiveis'].append(item)
+        dados = CardapioService.obter_cardapio(current_user.id)
         return {
-            'atualizado_em': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-            'categorias': categorias,
-            'total_produtos': len(produtos),
+            'atualizado_em': dados['atualizado_em'],
+            'categorias': dados['categorias'],
+            'total_produtos': dados['total_produtos'],
             'usuario': current_user.nome
         }
-    except Exception as e:
-        print(f"❌ Erro ao carregar cardápio: {str(e)}")
+    except Exception:
+        logger.exception("Erro ao carregar cardápio")
         return {'erro': 'Erro ao carregar cardápio'}
 
 # ========== ROTAS DE AUTENTICAÇÃO ==========
@@ -61,13 +50,11 @@ def login_google():
 @main_bp.route("/login/google/callback")
 def callback_google():
     try:
+        # Troca o código pelo token; com o nonce salvo no state o authlib já
+        # valida o id_token (JWKS em cache, ver service/GoogleOAuth.py)
         token = current_app.google.authorize_access_token()
-        
-        # Recuperar o nonce da sessão
         nonce = session.pop('google_auth_nonce', None)
-        
-        # Usar parse_id_token com nonce
-        user_info = current_app.google.parse_id_token(token, nonce=nonce)
+        user_info = token.get('userinfo') or current_app.google.parse_id_token(token, nonce=nonce)
         
         email = user_info.get("email")
         name = user_info.get("name")
@@ -77,33 +64,16 @@ def callback_google():
             flash("Não foi possível obter email do Google.", "danger")
             return redirect(url_for("main.login"))
 
-        user = UsuarioModel.query.filter_by(email=email).first()
-        if not user:
-            user = UsuarioModel(
-                nome=name,
-                email=email,
-                senha="",  # Senha vazia para usuários Google
-                google_login=True,
-                google_id=google_id
-            )
-            db.session.add(user)
-            db.session.commit()
-        else:
-            # Atualizar dados se necessário
-            if user.nome != name:
-                user.nome = name
-            if not user.google_login:
-                user.google_login = True
-            if not user.google_id and google_id:
-                user.google_id = google_id
-            db.session.commit()
+        user = UsuarioRepository.upsert_google(name or email.split("@")[0], email, google_id)
+        usuario_cache.invalidar(user.id)
 
         login_user(user)
         flash("Login realizado com sucesso!", "success")
         return redirect(url_for("main.dashboard"))
 
-    except Exception as e:
-        print("Erro login Google:", e)
+    except Exception:
+        db.session.rollback()
+        logger.exception("Erro no login com Google")
         flash("Erro ao realizar login com Google.", "danger")
         return redirect(url_for("main.login"))
 
@@ -119,7 +89,7 @@ def logout():
 @main_bp.route("/dashboard")
 @login_required
 def dashboard():
-    categorias = CategoriaModel.query.filter_by(usuario_id=current_user.id).all()
+    categorias = linhas_para_dicts(CategoriaRepository.listar_com_contagem(current_user.id))
     return render_template("dashboard.html", usuario=current_user, categorias=categorias)
 
 # Rotas para categorias no blueprint principal
@@ -140,6 +110,7 @@ def create_categoria():
             )
             db.session.add(nova_categoria)
             db.session.commit()
+            notificar_alteracao_catalogo(current_user.id)
             
             flash("Categoria criada com sucesso!", "success")
             return redirect(url_for("main.categorias_page"))
@@ -171,6 +142,7 @@ def edit_categoria(id):
             categoria.nome = nome
             categoria.descricao = descricao
             db.session.commit()
+            notificar_alteracao_catalogo(current_user.id)
             
             flash("Categoria atualizada com sucesso!", "success")
             return redirect(url_for("main.categorias_page"))
@@ -192,15 +164,15 @@ def delete_categoria(id):
         flash("Acesso não autorizado.", "danger")
         return redirect(url_for("main.categorias_page"))
     
-    db.session.delete(categoria)
-    db.session.commit()
+    CategoriaRepository.deletar_por_id_e_usuario(id, current_user.id)
+    notificar_alteracao_catalogo(current_user.id)
     flash("Categoria excluída com sucesso!", "success")
     return redirect(url_for("main.categorias_page"))
 
 @main_bp.route("/create_product")
 @login_required
 def create_product():
-    categorias = CategoriaModel.query.filter_by(usuario_id=current_user.id).all()
+    categorias = CategoriaRepository.listar_por_usuario_leitura(current_user.id)
     return render_template("create_product.html", categorias=categorias)
 
 @main_bp.route("/cardapio")
@@ -208,14 +180,55 @@ def create_product():
 def cardapio_html():
     try:
         dados = get_cardapio_data()
-        return render_template("cardapio.html", dados=dados, usuario=current_user)
-    except Exception as e:
-        print(f"❌ Erro ao carregar cardápio: {str(e)}")
+        publicado, slug = UsuarioRepository.publicacao_cardapio(current_user.id)
+        return render_template("cardapio.html", dados=dados, usuario=current_user,
+                               publicado=publicado, slug=slug)
+    except Exception:
+        logger.exception("Erro ao carregar cardápio")
         flash("Erro ao carregar cardápio", "error")
         return redirect(url_for("main.dashboard"))
 
+@main_bp.route("/cardapio/publicar", methods=["POST"])
+@login_required
+def publicar_cardapio():
+    UsuarioRepository.publicar_cardapio(current_user.id, True)
+    usuario_cache.invalidar(current_user.id)
+    cardapio_publico.agendar(current_user.id)
+    flash("Cardápio publicado! O link público fica disponível em instantes.", "success")
+    return redirect(url_for("main.cardapio_html"))
+
+@main_bp.route("/cardapio/despublicar", methods=["POST"])
+@login_required
+def despublicar_cardapio():
+    slug = UsuarioRepository.publicar_cardapio(current_user.id, False)
+    usuario_cache.invalidar(current_user.id)
+    if slug:
+        cardapio_publico.remover(slug)
+    # A thread confere de novo e apaga o snapshot que outro worker regravou no meio
+    cardapio_publico.agendar(current_user.id)
+    flash("O cardápio deixou de ser público.", "info")
+    return redirect(url_for("main.cardapio_html"))
+
+@main_bp.route("/cardapio/<slug>")
+def cardapio_publico_html(slug):
+    """
+    Cardápio público (QR code): serve o snapshot pré-renderado, sem consultar
+    o banco. Só existe para quem publicou o cardápio; o slug não é adivinhável
+    """
+    comprimido = request.accept_encodings['gzip'] > 0
+    caminho = cardapio_publico.arquivo(slug, comprimido)
+    if caminho is None:
+        abort(404)
+
+    response = send_file(caminho, mimetype='text/html', conditional=True,
+                         max_age=current_app.config["CARDAPIO_PUBLICO_MAX_AGE"])
+    if comprimido:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 @main_bp.route('/categorias')
 @login_required
 def categorias_page():
-    categorias = CategoriaRepository.listar_por_usuario(current_user.id)
+    categorias = linhas_para_dicts(CategoriaRepository.listar_com_contagem(current_user.id))
     return render_template("categorias.html", categorias=categorias)
\ No newline at end of file
@@ -1,10 +1,16 @@
-from flask_migrate import Migrate
-from extensions import db
-from Main import app
+"""
+Aplica as migrations do banco (Flask-Migrate/Alembic, pasta migrations/).
 
-migrate = Migrate(app, db)
+Uso:
+    python migrations.py            # atualiza para a última versão
+    python migrations.py <revisão>  # atualiza/volta para uma revisão específica
+"""
+import sys
+from flask_migrate import upgrade
+from Main import create_app
 
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
-        migrate.init_app(app, db)
-        print("✅ Migrations inicializadas!")
\ No newline at end of file
+        upgrade(revision=sys.argv[1] if len(sys.argv) > 1 else 'head')
+        print("✅ Migrations aplicadas!")
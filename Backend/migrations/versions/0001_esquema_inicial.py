@@ -0,0 +1,73 @@
+"""esquema inicial (usuarios, categorias, produtos)
+
+Substitui o check_database que rodava a cada boot. Bancos já existentes
+são aproveitados: só cria o que estiver faltando.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tabelas = inspector.get_table_names()
+
+    if 'usuarios' not in tabelas:
+        op.create_table(
+            'usuarios',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('nome', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False, unique=True),
+            sa.Column('senha', sa.String(length=200), nullable=True),
+            sa.Column('google_login', sa.Boolean(), nullable=True, server_default=sa.false()),
+            sa.Column('google_id', sa.String(length=100), nullable=True),
+        )
+    else:
+        # Colunas adicionadas depois da primeira versão do sistema
+        colunas = {coluna['name']: coluna for coluna in inspector.get_columns('usuarios')}
+        if 'google_login' not in colunas:
+            op.add_column('usuarios', sa.Column('google_login', sa.Boolean(), nullable=True, server_default=sa.false()))
+        if 'google_id' not in colunas:
+            op.add_column('usuarios', sa.Column('google_id', sa.String(length=100), nullable=True))
+        # Usuários do Google não têm senha; o SQLite não altera NOT NULL sem recriar a tabela
+        if not colunas['senha']['nullable'] and op.get_bind().dialect.name != 'sqlite':
+            op.alter_column('usuarios', 'senha', existing_type=sa.String(length=200), nullable=True)
+
+    if 'categorias' not in tabelas:
+        op.create_table(
+            'categorias',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('nome', sa.String(length=100), nullable=False),
+            sa.Column('descricao', sa.Text(), nullable=True),
+            sa.Column('usuario_id', sa.Integer(), sa.ForeignKey('usuarios.id'), nullable=False),
+        )
+
+    if 'produtos' not in tabelas:
+        op.create_table(
+            'produtos',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column('nome', sa.String(length=150), nullable=False),
+            sa.Column('preco', sa.Numeric(10, 2), nullable=False),
+            sa.Column('disponivel', sa.Boolean(), nullable=False),
+            sa.Column('descricao', sa.String(length=500), nullable=True),
+            sa.Column('quantidade', sa.Integer(), nullable=False),
+            sa.Column('categoria_id', sa.Integer(), sa.ForeignKey('categorias.id'), nullable=True),
+            sa.Column('usuario_id', sa.Integer(), sa.ForeignKey('usuarios.id'), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table('produtos')
+    op.drop_table('categorias')
+    op.drop_table('usuarios')
@@ -0,0 +1,30 @@
+"""índices compostos por usuário em produtos e categorias
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_produtos_usuario_categoria', 'produtos', ['usuario_id', 'categoria_id'], if_not_exists=True)
+    op.create_index('ix_produtos_usuario_disponivel', 'produtos', ['usuario_id', 'disponivel'], if_not_exists=True)
+    op.create_index('ix_produtos_usuario_nome_lower', 'produtos', ['usuario_id', sa.text('lower(nome)')], if_not_exists=True)
+    op.create_index('ix_categorias_usuario_nome', 'categorias', ['usuario_id', 'nome'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_categorias_usuario_nome', table_name='categorias')
+    op.drop_index('ix_produtos_usuario_nome_lower', table_name='produtos')
+    op.drop_index('ix_produtos_usuario_disponivel', table_name='produtos')
+    op.drop_index('ix_produtos_usuario_categoria', table_name='produtos')
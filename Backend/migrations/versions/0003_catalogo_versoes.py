@@ -0,0 +1,29 @@
+"""versão do catálogo por usuário (ETag / GET condicional)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:02
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'catalogo_versoes',
+        sa.Column('usuario_id', sa.Integer(), sa.ForeignKey('usuarios.id'), primary_key=True),
+        sa.Column('versao', sa.Integer(), nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('catalogo_versoes')
@@ -0,0 +1,97 @@
+"""colunas normalizadas e índices da busca de produtos
+
+PostgreSQL: extensão pg_trgm e índices GIN de trigramas.
+SQLite: tabela FTS5 (tokenizer trigram) sincronizada por triggers.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:03
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+TRIGGERS_SQLITE = {
+    'produtos_busca_ai': (
+        "AFTER INSERT ON produtos BEGIN "
+        "INSERT INTO produtos_busca(rowid, busca_nome, busca_descricao) VALUES (new.id, new.busca_nome, new.busca_descricao); END"
+    ),
+    'produtos_busca_ad': (
+        "AFTER DELETE ON produtos BEGIN "
+        "INSERT INTO produtos_busca(produtos_busca, rowid, busca_nome, busca_descricao) "
+        "VALUES ('delete', old.id, old.busca_nome, old.busca_descricao); END"
+    ),
+    'produtos_busca_au': (
+        "AFTER UPDATE OF busca_nome, busca_descricao ON produtos BEGIN "
+        "INSERT INTO produtos_busca(produtos_busca, rowid, busca_nome, busca_descricao) "
+        "VALUES ('delete', old.id, old.busca_nome, old.busca_descricao); "
+        "INSERT INTO produtos_busca(rowid, busca_nome, busca_descricao) VALUES (new.id, new.busca_nome, new.busca_descricao); END"
+    ),
+}
+
+
+def _normalizar(texto):
+    # Cópia de model.ProdutoModel.normalizar_busca no momento desta revisão
+    if not texto:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def upgrade():
+    bind = op.get_bind()
+    colunas = {coluna['name'] for coluna in sa.inspect(bind).get_columns('produtos')}
+    if 'busca_nome' not in colunas:
+        op.add_column('produtos', sa.Column('busca_nome', sa.String(150), nullable=True))
+    if 'busca_descricao' not in colunas:
+        op.add_column('produtos', sa.Column('busca_descricao', sa.String(500), nullable=True))
+
+    produtos = sa.table('produtos', sa.column('id'), sa.column('nome'), sa.column('descricao'),
+                        sa.column('busca_nome'), sa.column('busca_descricao'))
+    valores = [
+        {'b_id': id, 'b_nome': _normalizar(nome), 'b_descricao': _normalizar(descricao)}
+        for id, nome, descricao in bind.execute(sa.select(produtos.c.id, produtos.c.nome, produtos.c.descricao))
+    ]
+    if valores:
+        bind.execute(
+            produtos.update().where(produtos.c.id == sa.bindparam('b_id')).values(
+                busca_nome=sa.bindparam('b_nome'), busca_descricao=sa.bindparam('b_descricao')
+            ),
+            valores
+        )
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_produtos_busca_nome_trgm ON produtos USING gin (busca_nome gin_trgm_ops)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_produtos_busca_descricao_trgm ON produtos USING gin (busca_descricao gin_trgm_ops)")
+    elif bind.dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS produtos_busca USING fts5("
+            "busca_nome, busca_descricao, content='produtos', content_rowid='id', tokenize='trigram')"
+        )
+        for nome, corpo in TRIGGERS_SQLITE.items():
+            op.execute(f"CREATE TRIGGER IF NOT EXISTS {nome} {corpo}")
+        op.execute("INSERT INTO produtos_busca(produtos_busca) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_produtos_busca_descricao_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_produtos_busca_nome_trgm")
+    elif bind.dialect.name == 'sqlite':
+        for nome in TRIGGERS_SQLITE:
+            op.execute(f"DROP TRIGGER IF EXISTS {nome}")
+        op.execute("DROP TABLE IF EXISTS produtos_busca")
+    op.drop_column('produtos', 'busca_descricao')
+    op.drop_column('produtos', 'busca_nome')
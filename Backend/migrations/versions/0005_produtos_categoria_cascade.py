@@ -0,0 +1,42 @@
+"""ON DELETE CASCADE em produtos.categoria_id
+
+Apagar uma categoria não carrega mais os produtos no ORM (passive_deletes).
+No SQLite as chaves estrangeiras não são aplicadas e recriar a tabela
+derrubaria os triggers da busca, então lá o repositório apaga os produtos
+por DELETE em lote e esta revisão não faz nada.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:04
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def _recriar_fk(ondelete):
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        return
+    for fk in sa.inspect(bind).get_foreign_keys('produtos'):
+        if fk['referred_table'] == 'categorias' and fk['constrained_columns'] == ['categoria_id']:
+            op.drop_constraint(fk['name'], 'produtos', type_='foreignkey')
+    op.create_foreign_key(
+        'produtos_categoria_id_fkey', 'produtos', 'categorias',
+        ['categoria_id'], ['id'], ondelete=ondelete,
+    )
+
+
+def upgrade():
+    _recriar_fk('CASCADE')
+
+
+def downgrade():
+    _recriar_fk(None)
@@ -0,0 +1,37 @@
+"""contadores do catálogo por usuário e categoria (resumo do dashboard)
+
+Só são usados com ESTATISTICAS_CONTADORES=True; a tabela começa vazia e
+cada usuário é contado na primeira leitura.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:05
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'catalogo_contadores',
+        sa.Column('usuario_id', sa.Integer(), sa.ForeignKey('usuarios.id'), primary_key=True),
+        sa.Column('categoria_id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('produtos', sa.Integer(), nullable=False),
+        sa.Column('disponiveis', sa.Integer(), nullable=False),
+        sa.Column('soma_precos', sa.Numeric(14, 2), nullable=False),
+        sa.Column('preco_min', sa.Numeric(10, 2), nullable=True),
+        sa.Column('preco_max', sa.Numeric(10, 2), nullable=True),
+        sa.Column('valido', sa.Boolean(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('catalogo_contadores')
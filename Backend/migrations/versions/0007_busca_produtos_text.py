@@ -0,0 +1,38 @@
+"""colunas normalizadas da busca como Text
+
+A normalização (NFKD + casefold) pode deixar o texto maior que o original
+('ß' vira 'ss', ligaduras se expandem), e um nome no limite de 150
+caracteres estourava busca_nome. O SQLite não aplica o tamanho do VARCHAR,
+então lá não há o que mudar.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:06
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    op.alter_column('produtos', 'busca_nome', existing_type=sa.String(length=150), type_=sa.Text())
+    op.alter_column('produtos', 'busca_descricao', existing_type=sa.String(length=500), type_=sa.Text())
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    # Valores expandidos além do limite são cortados ao voltar para VARCHAR
+    op.alter_column('produtos', 'busca_nome', existing_type=sa.Text(), type_=sa.String(length=150),
+                    postgresql_using='left(busca_nome, 150)')
+    op.alter_column('produtos', 'busca_descricao', existing_type=sa.Text(), type_=sa.String(length=500),
+                    postgresql_using='left(busca_descricao, 500)')
@@ -0,0 +1,33 @@
+"""cardápio público opt-in, em /cardapio/<slug>
+
+Até aqui todo cardápio era público em /cardapio/<usuario_id>; agora começa
+desligado e cada usuário publica o seu, recebendo um slug não sequencial.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:07
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('usuarios') as batch:
+        batch.add_column(sa.Column('cardapio_publico', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch.add_column(sa.Column('cardapio_slug', sa.String(length=32), nullable=True))
+        batch.create_unique_constraint('uq_usuarios_cardapio_slug', ['cardapio_slug'])
+
+
+def downgrade():
+    with op.batch_alter_table('usuarios') as batch:
+        batch.drop_constraint('uq_usuarios_cardapio_slug', type_='unique')
+        batch.drop_column('cardapio_slug')
+        batch.drop_column('cardapio_publico')
@@ -0,0 +1,29 @@
+"""índice de categorias por (usuario_id, nome) sem unicidade
+
+Uma versão anterior da 0002 criava o índice único uq_categorias_usuario_nome
+(fundindo antes as categorias repetidas). Os bancos que passaram por ela
+trocam o índice único pelo comum; os dados já fundidos não voltam.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:08
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('uq_categorias_usuario_nome', table_name='categorias', if_exists=True)
+    op.create_index('ix_categorias_usuario_nome', 'categorias', ['usuario_id', 'nome'], if_not_exists=True)
+
+
+def downgrade():
+    # A 0002 atual já cria o índice comum; não há unicidade a restaurar
+    pass
@@ -0,0 +1,21 @@
+from extensions import db
+
+class CatalogoContadorModel(db.Model):
+    """
+    Contadores do catálogo por usuário e categoria (categoria_id 0 = produtos
+    sem categoria; a linha 0 existe sempre que o usuário foi contado)
+    """
+    __tablename__ = 'catalogo_contadores'
+
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), primary_key=True)
+    categoria_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    produtos = db.Column(db.Integer, nullable=False, default=0)
+    disponiveis = db.Column(db.Integer, nullable=False, default=0)
+    soma_precos = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    preco_min = db.Column(db.Numeric(10, 2))
+    preco_max = db.Column(db.Numeric(10, 2))
+    # False quando a faixa de preço não pôde ser ajustada por diferença
+    valido = db.Column(db.Boolean, nullable=False, default=True)
+
+    def __repr__(self):
+        return f'<CatalogoContador usuario={self.usuario_id} categoria={self.categoria_id}>'
@@ -0,0 +1,13 @@
+from datetime import datetime
+from extensions import db
+
+class CatalogoVersaoModel(db.Model):
+    """Versão do catálogo (produtos + categorias) de cada usuário, usada nos ETags"""
+    __tablename__ = 'catalogo_versoes'
+
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    atualizado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CatalogoVersao usuario={self.usuario_id} v{self.versao}>'
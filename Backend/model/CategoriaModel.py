@@ -3,6 +3,10 @@ from sqlalchemy.orm import relationship
 
 class CategoriaModel(db.Model):
     __tablename__ = 'categorias'
+    __table_args__ = (
+        # Checagem de nome repetido (existe_por_nome_e_usuario) e listagens por usuário
+        db.Index('ix_categorias_usuario_nome', 'usuario_id', 'nome'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
@@ -12,16 +16,25 @@ class CategoriaModel(db.Model):
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
     
     # Relacionamento com produtos - CORRIGIDO
-    produtos = relationship('ProdutoModel', back_populates='categoria', lazy=True, cascade='all, delete-orphan')
+    # passive_deletes: ao apagar a categoria os produtos não são carregados; quem
+    # apaga é o ON DELETE CASCADE do banco (ou o DELETE em lote do repositório)
+    produtos = relationship('ProdutoModel', back_populates='categoria', lazy=True,
+                            cascade='all, delete-orphan', passive_deletes=True)
     
-    def to_dict(self):
-        return {
+    def to_dict(self, quantidade_produtos=None, incluir_produtos=False):
+        # Sem a contagem pronta (ver CategoriaRepository.listar_com_contagem) carrega os produtos
+        if quantidade_produtos is None:
+            quantidade_produtos = len(self.produtos)
+        dados = {
             'id': self.id,
             'nome': self.nome,
             'descricao': self.descricao,
             'usuario_id': self.usuario_id,
-            'quantidade_produtos': len(self.produtos)
+            'quantidade_produtos': quantidade_produtos
         }
+        if incluir_produtos:
+            dados['produtos'] = [produto.to_dict() for produto in self.produtos]
+        return dados
     
     def __repr__(self):
         return f'<Categoria {self.nome}>'
\ No newline at end of file
@@ -1,10 +1,16 @@
+import unicodedata
 from decimal import Decimal
 from extensions import db
-from sqlalchemy import Numeric
+from sqlalchemy import DDL, Numeric, event
 from sqlalchemy.orm import relationship
 
 class ProdutoModel(db.Model):
     __tablename__ = 'produtos'
+    __table_args__ = (
+        # Índices para os filtros por usuário usados no ProdutoRepository
+        db.Index('ix_produtos_usuario_categoria', 'usuario_id', 'categoria_id'),
+        db.Index('ix_produtos_usuario_disponivel', 'usuario_id', 'disponivel'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     nome = db.Column(db.String(150), nullable=False)
@@ -13,8 +19,13 @@ class ProdutoModel(db.Model):
     descricao = db.Column(db.String(500), nullable=True)
     quantidade = db.Column(db.Integer, default=0, nullable=False)  # Adicionado campo quantidade
     
+    # Nome e descrição normalizados (minúsculas, sem acentos) para a busca; mantidos pelos eventos abaixo.
+    # Text: a normalização pode alongar o texto ('ß' -> 'ss', ligaduras), então o limite do original não serve
+    busca_nome = db.Column(db.Text, nullable=True)
+    busca_descricao = db.Column(db.Text, nullable=True)
+    
     # Chaves estrangeiras
-    categoria_id = db.Column(db.Integer, db.ForeignKey('categorias.id'))
+    categoria_id = db.Column(db.Integer, db.ForeignKey('categorias.id', ondelete='CASCADE'))
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
     
     # Relacionamento com categoria
@@ -24,7 +35,7 @@ class ProdutoModel(db.Model):
         return {
             'id': self.id,
             'nome': self.nome,
-            'preco': float(self.preco),
+            'preco': self.preco,  # Decimal: o provider JSON do app serializa como número
             'quantidade': self.quantidade,
             'disponivel': self.disponivel,
             'descricao': self.descricao,
@@ -34,4 +45,47 @@ class ProdutoModel(db.Model):
         }
     
     def __repr__(self):
-        return f'<Produto {self.nome} (R${self.preco})>'
\ No newline at end of file
+        return f'<Produto {self.nome} (R${self.preco})>'
+
+# Índice funcional para as buscas por nome sem diferenciar maiúsculas
+db.Index('ix_produtos_usuario_nome_lower', ProdutoModel.usuario_id, db.func.lower(ProdutoModel.nome))
+
+
+def normalizar_busca(texto):
+    """Minúsculas e sem acentos, para que 'Pão' e 'pao' se encontrem"""
+    if not texto:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+@event.listens_for(ProdutoModel, 'before_insert')
+@event.listens_for(ProdutoModel, 'before_update')
+def _atualizar_colunas_busca(mapper, connection, produto):
+    produto.busca_nome = normalizar_busca(produto.nome)
+    produto.busca_descricao = normalizar_busca(produto.descricao)
+
+# Índices de busca por substring, criados no create_all de desenvolvimento
+# (em produção vêm da migration 0004):
+# - PostgreSQL: índices GIN de trigramas (pg_trgm), usados por LIKE '%termo%'
+# - SQLite: tabela FTS5 com tokenizer trigram, sincronizada por triggers
+for _ddl in (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_produtos_busca_nome_trgm ON produtos USING gin (busca_nome gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_produtos_busca_descricao_trgm ON produtos USING gin (busca_descricao gin_trgm_ops)",
+):
+    event.listen(ProdutoModel.__table__, 'after_create', DDL(_ddl).execute_if(dialect='postgresql'))
+
+for _ddl in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS produtos_busca USING fts5("
+    "busca_nome, busca_descricao, content='produtos', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS produtos_busca_ai AFTER INSERT ON produtos BEGIN "
+    "INSERT INTO produtos_busca(rowid, busca_nome, busca_descricao) VALUES (new.id, new.busca_nome, new.busca_descricao); END",
+    "CREATE TRIGGER IF NOT EXISTS produtos_busca_ad AFTER DELETE ON produtos BEGIN "
+    "INSERT INTO produtos_busca(produtos_busca, rowid, busca_nome, busca_descricao) "
+    "VALUES ('delete', old.id, old.busca_nome, old.busca_descricao); END",
+    "CREATE TRIGGER IF NOT EXISTS produtos_busca_au AFTER UPDATE OF busca_nome, busca_descricao ON produtos BEGIN "
+    "INSERT INTO produtos_busca(produtos_busca, rowid, busca_nome, busca_descricao) "
+    "VALUES ('delete', old.id, old.busca_nome, old.busca_descricao); "
+    "INSERT INTO produtos_busca(rowid, busca_nome, busca_descricao) VALUES (new.id, new.busca_nome, new.busca_descricao); END",
+):
+    event.listen(ProdutoModel.__table__, 'after_create', DDL(_ddl).execute_if(dialect='sqlite'))
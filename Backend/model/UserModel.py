@@ -3,6 +3,9 @@ from flask_login import UserMixin
 
 class UsuarioModel(db.Model, UserMixin):
     __tablename__ = 'usuarios'
+    __table_args__ = (
+        db.UniqueConstraint('cardapio_slug', name='uq_usuarios_cardapio_slug'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
@@ -10,6 +13,9 @@ class UsuarioModel(db.Model, UserMixin):
     senha = db.Column(db.String(200), nullable=True)  # Alterado para nullable=True
     google_login = db.Column(db.Boolean, default=False)
     google_id = db.Column(db.String(100), nullable=True)
+    # Cardápio público (opt-in): servido em /cardapio/<cardapio_slug>, um token não sequencial
+    cardapio_publico = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    cardapio_slug = db.Column(db.String(32), nullable=True)
     # ... outras colunas
     
     def __init__(self, nome, email, senha=None, google_login=False, google_id=None):
@@ -17,4 +23,18 @@ class UsuarioModel(db.Model, UserMixin):
         self.email = email
         self.senha = senha  # Pode ser None
         self.google_login = google_login
-        self.google_id = google_id
\ No newline at end of file
+        self.google_id = google_id
+
+class UsuarioAutenticado(UserMixin):
+    """Cópia leve do usuário logado, independente da sessão do SQLAlchemy (ver UsuarioCache)"""
+
+    def __init__(self, id, nome, email, google_login=False, google_id=None):
+        self.id = id
+        self.nome = nome
+        self.email = email
+        self.google_login = google_login
+        self.google_id = google_id
+
+    @classmethod
+    def de_modelo(cls, usuario):
+        return cls(usuario.id, usuario.nome, usuario.email, usuario.google_login, usuario.google_id)
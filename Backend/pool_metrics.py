@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+class JanelaLatencias:
+    """Janela deslizante de latências (segundos) com totais acumulados"""
+
+    def __init__(self, tamanho=1000):
+        self._amostras = deque(maxlen=tamanho)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+
+    def registrar(self, duracao):
+        with self._lock:
+            self._amostras.append(duracao)
+            self.total += 1
+            self.soma += duracao
+            if duracao > self.maximo:
+                self.maximo = duracao
+
+    def percentil(self, p):
+        with self._lock:
+            ordenadas = sorted(self._amostras)
+        if not ordenadas:
+            return 0.0
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+    def resumo_ms(self):
+        return {
+            'total': self.total,
+            'media_ms': round(self.soma / self.total * 1000, 3) if self.total else 0.0,
+            'p50_ms': round(self.percentil(50) * 1000, 3),
+            'p99_ms': round(self.percentil(99) * 1000, 3),
+            'max_ms': round(self.maximo * 1000, 3),
+        }
+
+
+# Compartilhada pelas instâncias do pool (engine.dispose() recria o pool)
+ESPERAS_CHECKOUT = JanelaLatencias()
+TIMEOUTS_CHECKOUT = {'total': 0}
+
+class QueuePoolInstrumentado(QueuePool):
+    """QueuePool que mede o tempo de espera por uma conexão livre"""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            TIMEOUTS_CHECKOUT['total'] += 1
+            raise
+        finally:
+            ESPERAS_CHECKOUT.registrar(time.perf_counter() - inicio)
+
+
+class MetricasPool:
+    """Contadores de eventos do pool de conexões da engine do Flask-SQLAlchemy"""
+
+    def __init__(self):
+        self.contadores = {'connect': 0, 'checkout': 0, 'checkin': 0, 'invalidate': 0}
+        self._engine = None
+
+    def init_app(self, app, db):
+        with app.app_context():
+            self._engine = db.engine
+        for nome in self.contadores:
+            event.listen(self._engine, nome, self._contador(nome))
+
+    def _contador(self, nome):
+        def registrar(*args):
+            self.contadores[nome] += 1
+        return registrar
+
+    def stats(self):
+        pool = self._engine.pool if self._engine else None
+        dados = {
+            'pool': type(pool).__name__ if pool else None,
+            'eventos': dict(self.contadores),
+            'espera_checkout': ESPERAS_CHECKOUT.resumo_ms(),
+            'timeouts_checkout': TIMEOUTS_CHECKOUT['total'],
+        }
+        if isinstance(pool, QueuePool):
+            dados.update({
+                'tamanho': pool.size(),
+                'em_uso': pool.checkedout(),
+                'livres': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'max_overflow': pool._max_overflow,
+                'status': pool.status(),
+            })
+        return dados
@@ -0,0 +1,184 @@
+"""
+Roteamento de leituras para réplicas (DATABASE_REPLICA_URLS).
+
+Os finders/contadores dos repositórios são marcados com @leitura e rodam numa
+réplica do pool; tudo o mais (flush, save/delete/atualizar, lazy loads,
+consultas fora dos repositórios) continua no primário. Uma leitura volta ao
+primário quando:
+
+- a transação atual já escreveu (flush ou UPDATE/DELETE/INSERT em lote);
+- o tenant escreveu há menos de DB_REPLICA_JANELA_ESCRITA segundos
+  (read-your-writes). O horário da escrita vai no cookie de sessão, que
+  acompanha o usuário em qualquer worker, e no mesmo backend do cache do
+  cardápio (em memória por worker, ou no Redis de CARDAPIO_CACHE_URL), que
+  cobre a thread do cardápio público e os workers entre si;
+- o código está dentro de `with primario():`. Tudo o que vai para um cache
+  (cardápio, snapshot público) é montado assim: lido de uma réplica atrasada,
+  ficaria guardado sob a versão nova até a próxima alteração.
+
+Sem réplicas configuradas o decorador não faz nada. O roteador é o
+roteador_replicas do extensions.py.
+"""
+import contextvars
+import inspect
+import itertools
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_request_context, session as sessao_flask
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from service.CardapioCache import MemoriaCacheBackend, RedisCacheBackend
+from signals import catalogo_alterado
+
+logger = logging.getLogger(__name__)
+
+# (usuario_id,) enquanto um finder marcado com @leitura está rodando
+_leitura_atual = contextvars.ContextVar('leitura_replica', default=None)
+_forcar_primario = contextvars.ContextVar('forcar_primario', default=False)
+
+# Chave do cookie de sessão com o horário (time.time()) da última escrita do usuário
+CHAVE_ESCRITA = 'escrita_em'
+
+
+class SessaoRoteada(Session):
+    """Sessão do Flask-SQLAlchemy que pergunta ao roteador onde ler"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            leitura = _leitura_atual.get()
+            if leitura is not None:
+                # Import tardio: o extensions.py importa esta sessão
+                from extensions import roteador_replicas
+                engine = roteador_replicas.engine_leitura(self, *leitura)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(SessaoRoteada, 'after_flush')
+def _marcar_escrita_flush(session, contexto):
+    session.info['escreveu'] = True
+
+
+@event.listens_for(SessaoRoteada, 'do_orm_execute')
+def _marcar_escrita_em_lote(estado):
+    if estado.is_update or estado.is_delete or estado.is_insert:
+        estado.session.info['escreveu'] = True
+
+
+@event.listens_for(SessaoRoteada, 'after_transaction_end')
+def _limpar_escrita(session, transacao):
+    if transacao.parent is None:
+        session.info.pop('escreveu', None)
+
+
+def leitura(funcao):
+    """Marca um finder somente leitura para rodar numa réplica (ver docstring do módulo)"""
+    assinatura = inspect.signature(funcao)
+    tem_usuario = 'usuario_id' in assinatura.parameters
+
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        from extensions import roteador_replicas
+        if not roteador_replicas.engines or _forcar_primario.get():
+            return funcao(*args, **kwargs)
+        usuario_id = assinatura.bind_partial(*args, **kwargs).arguments.get('usuario_id') if tem_usuario else None
+        token = _leitura_atual.set((usuario_id,))
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            _leitura_atual.reset(token)
+    return wrapper
+
+
+@contextmanager
+def primario():
+    """Dentro do bloco os finders marcados com @leitura leem do primário"""
+    token = _forcar_primario.set(True)
+    try:
+        yield
+    finally:
+        _forcar_primario.reset(token)
+
+
+class RoteadorReplicas:
+    """Escolhe a réplica (round-robin) e guarda quando cada tenant escreveu por último"""
+
+    def __init__(self):
+        self.engines = []
+        self.janela = 0
+        self.escritas = MemoriaCacheBackend()
+        self.contadores = {'replica': 0, 'primario_transacao': 0, 'primario_janela': 0}
+        self._proxima = itertools.count()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        chaves = sorted(chave for chave in app.config.get("SQLALCHEMY_BINDS", {}) if chave.startswith('replica_'))
+        with app.app_context():
+            self.engines = [db.engines[chave] for chave in chaves]
+        self.janela = float(app.config.get("DB_REPLICA_JANELA_ESCRITA", 5))
+        url = app.config.get("CARDAPIO_CACHE_URL")
+        # O TTL do backend é a própria janela: a chave some quando ela fecha
+        if url:
+            self.escritas = RedisCacheBackend(url, ttl=max(1, math.ceil(self.janela)), prefixo='escrita:')
+        else:
+            max_itens = int(app.config.get("CARDAPIO_CACHE_MAX_ITENS", 1024))
+            self.escritas = MemoriaCacheBackend(max_itens=max_itens, ttl=self.janela)
+        if self.engines and self.janela > 0:
+            catalogo_alterado.connect(self._ao_alterar_catalogo)
+            if not url:
+                logger.warning("DATABASE_REPLICA_URLS sem CARDAPIO_CACHE_URL: fora do cookie de sessão, "
+                               "a janela de leitura das próprias escritas vale só no worker que escreveu")
+
+    def _ao_alterar_catalogo(self, sender, usuario_id, **extra):
+        self.registrar_escrita(usuario_id)
+
+    def registrar_escrita(self, usuario_id):
+        if usuario_id is None:
+            return
+        self.escritas.set(usuario_id, 1)
+        if has_request_context():
+            sessao_flask[CHAVE_ESCRITA] = time.time()
+
+    def engine_leitura(self, session, usuario_id=None):
+        """Engine de uma réplica, ou None para ficar no primário"""
+        if not self.engines:
+            return None
+        if (session.info.get('escreveu') or session.new or session.deleted
+                or session.identity_map.check_modified()):
+            self._contar('primario_transacao')
+            return None
+        if usuario_id is None and has_request_context():
+            # Finders sem usuario_id: usa o usuário logado, se já foi carregado
+            usuario = g.get('_login_user')
+            usuario_id = getattr(usuario, 'id', None)
+        if self.janela > 0 and (self._escreveu_nesta_sessao() or (
+                usuario_id is not None and self.escritas.get(usuario_id) is not None)):
+            self._contar('primario_janela')
+            return None
+        self._contar('replica')
+        return self.engines[next(self._proxima) % len(self.engines)]
+
+    def _escreveu_nesta_sessao(self):
+        if not has_request_context():
+            return False
+        escrita_em = sessao_flask.get(CHAVE_ESCRITA)
+        return escrita_em is not None and time.time() - escrita_em < self.janela
+
+    def _contar(self, chave):
+        with self._lock:
+            self.contadores[chave] += 1
+
+    def stats(self):
+        return {
+            'replicas': [engine.url.render_as_string(hide_password=True) for engine in self.engines],
+            'janela_escrita_s': self.janela,
+            'leituras': dict(self.contadores),
+        }
+
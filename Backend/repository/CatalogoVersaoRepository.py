@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from replicas import leitura
+from model.CatalogoVersaoModel import CatalogoVersaoModel
+
+# Chave do session.info com os usuários cujo catálogo a transação alterou
+CATALOGOS_ALTERADOS = 'catalogos_alterados'
+
+# Dialetos com INSERT ... ON CONFLICT
+_INSERTS_UPSERT = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+class CatalogoVersaoRepository:
+
+    @staticmethod
+    @leitura
+    def buscar(usuario_id: int) -> Tuple[int, Optional[datetime]]:
+        """(versão, última alteração) do catálogo; (0, None) se nunca foi alterado"""
+        return CatalogoVersaoRepository.versao_da_linha(
+            db.session.execute(CatalogoVersaoRepository.consulta(usuario_id)).first()
+        )
+
+    @staticmethod
+    def consulta(usuario_id: int):
+        return db.select(
+            CatalogoVersaoModel.versao, CatalogoVersaoModel.atualizado_em
+        ).filter_by(usuario_id=usuario_id)
+
+    @staticmethod
+    def versao_da_linha(linha) -> Tuple[int, Optional[datetime]]:
+        return (linha.versao, linha.atualizado_em) if linha else (0, None)
+
+    @staticmethod
+    def marcar_alteracao(usuario_id) -> None:
+        """
+        Registra na transação atual que o catálogo do usuário mudou; a versão
+        sobe no commit dela (ver CatalogoVersaoService). Escritas do ORM em
+        produtos e categorias são marcadas no flush; as em lote chamam isto.
+        """
+        if usuario_id is not None:
+            db.session.info.setdefault(CATALOGOS_ALTERADOS, set()).add(usuario_id)
+
+    @staticmethod
+    def incrementar(usuario_id: int) -> None:
+        CatalogoVersaoRepository.incrementar_na_transacao(db.session, usuario_id)
+        db.session.commit()
+
+    @staticmethod
+    def incrementar_na_transacao(sessao, usuario_id: int) -> None:
+        """Sobe a versão sem commit, na transação da escrita que alterou o catálogo"""
+        agora = datetime.utcnow()
+        tabela = CatalogoVersaoModel.__table__
+        insert = _INSERTS_UPSERT.get(sessao.get_bind().dialect.name)
+        if insert is not None:
+            # Um único comando: sem corrida com outro worker criando a linha
+            comando = insert(tabela).values(usuario_id=usuario_id, versao=1, atualizado_em=agora)
+            sessao.execute(comando.on_conflict_do_update(
+                index_elements=[tabela.c.usuario_id],
+                set_={'versao': tabela.c.versao + 1, 'atualizado_em': agora}
+            ))
+            return
+
+        atualizacao = db.update(CatalogoVersaoModel).where(
+            CatalogoVersaoModel.usuario_id == usuario_id
+        ).values(versao=CatalogoVersaoModel.versao + 1, atualizado_em=agora)
+        if sessao.execute(atualizacao).rowcount == 0:
+            sessao.execute(db.insert(CatalogoVersaoModel).values(
+                usuario_id=usuario_id, versao=1, atualizado_em=agora
+            ))
@@ -1,6 +1,15 @@
 from model.CategoriaModel import CategoriaModel
-from extensions import db
-from typing import List, Optional
+from model.ProdutoModel import ProdutoModel
+from repository.ProdutoRepository import ProdutoRepository
+from repository.CatalogoVersaoRepository import CatalogoVersaoRepository
+from extensions import db, contadores_catalogo
+from replicas import leitura
+from sqlalchemy.orm import selectinload
+from typing import Dict, List, Optional
+from serializacao import linhas_para_dicts
+
+# Colunas do to_dict(), para as consultas somente leitura
+COLUNAS_CATEGORIA = (CategoriaModel.id, CategoriaModel.nome, CategoriaModel.descricao, CategoriaModel.usuario_id)
 
 class CategoriaRepository:
     
@@ -11,44 +20,129 @@ class CategoriaRepository:
         return categoria
     
     @staticmethod
+    @leitura
     def buscar_por_id(id):
         return CategoriaModel.query.get(id)
     
     @staticmethod
+    @leitura
     def buscar_por_id_e_usuario(id, usuario_id):
         return CategoriaModel.query.filter_by(id=id, usuario_id=usuario_id).first()
     
     @staticmethod
+    @leitura
     def listar_todos():
         return CategoriaModel.query.all()
     
     @staticmethod
+    @leitura
     def listar_por_usuario(usuario_id):
         return CategoriaModel.query.filter_by(usuario_id=usuario_id).all()
     
+    @staticmethod
+    @leitura
+    def listar_por_usuario_leitura(usuario_id) -> list:
+        """Somente leitura: linhas (id, nome, descricao, usuario_id), sem objetos do ORM"""
+        return db.session.execute(CategoriaRepository.consulta_leitura(usuario_id)).all()
+    
+    @staticmethod
+    def consulta_leitura(usuario_id):
+        """SELECT por coluna das categorias do usuário, ordenadas por id"""
+        return db.select(*COLUNAS_CATEGORIA).filter(
+            CategoriaModel.usuario_id == usuario_id
+        ).order_by(CategoriaModel.id)
+    
+    @staticmethod
+    @leitura
+    def listar_com_contagem(usuario_id) -> list:
+        """
+        Categorias do usuário com a quantidade de produtos, em um único GROUP BY.
+        Devolve linhas por coluna (mesmos campos do to_dict), não objetos do ORM.
+        """
+        return db.session.execute(CategoriaRepository.consulta_com_contagem(usuario_id)).all()
+    
+    @staticmethod
+    def consulta_com_contagem(usuario_id):
+        """O GROUP BY de listar_com_contagem, sem executar"""
+        return db.select(
+            *COLUNAS_CATEGORIA,
+            db.func.count(ProdutoModel.id).label('quantidade_produtos')
+        ).outerjoin(
+            ProdutoModel, ProdutoModel.categoria_id == CategoriaModel.id
+        ).filter(
+            CategoriaModel.usuario_id == usuario_id
+        ).group_by(CategoriaModel.id).order_by(CategoriaModel.id)
+    
+    @staticmethod
+    @leitura
+    def listar_com_produtos(usuario_id) -> List[CategoriaModel]:
+        """Categorias do usuário com os produtos carregados em uma consulta extra"""
+        return CategoriaModel.query.options(
+            selectinload(CategoriaModel.produtos)
+        ).filter_by(usuario_id=usuario_id).order_by(CategoriaModel.id).all()
+    
+    @staticmethod
+    @leitura
+    def listar_com_produtos_leitura(usuario_id) -> List[Dict]:
+        """
+        Somente leitura: mesmo formato de to_dict(incluir_produtos=True), montado
+        com duas consultas por coluna (categorias e produtos) em vez de objetos do ORM.
+        """
+        return CategoriaRepository.agrupar_produtos(
+            CategoriaRepository.listar_por_usuario_leitura(usuario_id),
+            ProdutoRepository.find_by_usuario_leitura(usuario_id)
+        )
+    
+    @staticmethod
+    def agrupar_produtos(linhas_categorias, linhas_produtos) -> List[Dict]:
+        """Encaixa as linhas de produtos nas categorias (formato de to_dict(incluir_produtos=True))"""
+        categorias = linhas_para_dicts(linhas_categorias)
+        por_id = {}
+        for categoria in categorias:
+            categoria['quantidade_produtos'] = 0
+            categoria['produtos'] = []
+            por_id[categoria['id']] = categoria
+        for produto in linhas_para_dicts(linhas_produtos):
+            categoria = por_id.get(produto['categoria_id'])
+            if categoria is not None:
+                categoria['produtos'].append(produto)
+                categoria['quantidade_produtos'] += 1
+        return categorias
+    
     @staticmethod
     def deletar_por_id(id):
-        categoria = CategoriaModel.query.get(id)
-        if categoria:
-            db.session.delete(categoria)
-            db.session.commit()
-            return True
-        return False
+        usuario_id = db.session.execute(db.select(CategoriaModel.usuario_id).filter_by(id=id)).scalar()
+        return CategoriaRepository._deletar(usuario_id, CategoriaModel.id == id)
     
     @staticmethod
     def deletar_por_id_e_usuario(id, usuario_id):
-        categoria = CategoriaModel.query.filter_by(id=id, usuario_id=usuario_id).first()
-        if categoria:
-            db.session.delete(categoria)
-            db.session.commit()
-            return True
-        return False
+        return CategoriaRepository._deletar(usuario_id, CategoriaModel.id == id, CategoriaModel.usuario_id == usuario_id)
+    
+    @staticmethod
+    def _deletar(usuario_id, *filtros):
+        """Apaga a categoria e os produtos dela com dois DELETEs, sem carregar nada na sessão"""
+        # O SQLite não aplica o ON DELETE CASCADE (foreign_keys fica desligado),
+        # então os produtos saem por DELETE explícito; no Postgres ele é redundante
+        categorias = db.select(CategoriaModel.id).where(*filtros).scalar_subquery()
+        opcoes = {'synchronize_session': False}
+        contadores_catalogo.invalidar(db.select(CategoriaModel.usuario_id).where(*filtros).scalar_subquery())
+        db.session.execute(
+            db.delete(ProdutoModel).where(ProdutoModel.categoria_id.in_(categorias)),
+            execution_options=opcoes,
+        )
+        apagadas = db.session.execute(db.delete(CategoriaModel).where(*filtros), execution_options=opcoes).rowcount
+        if apagadas:
+            CatalogoVersaoRepository.marcar_alteracao(usuario_id)
+        db.session.commit()
+        return apagadas > 0
     
     @staticmethod
+    @leitura
     def existe_por_nome(nome):
         return CategoriaModel.query.filter_by(nome=nome).first() is not None
 
     @staticmethod
+    @leitura
     def existe_por_nome_e_usuario(nome, usuario_id):
         return CategoriaModel.query.filter_by(nome=nome, usuario_id=usuario_id).first() is not None
 
@@ -58,5 +152,6 @@ class CategoriaRepository:
         return categoria
     
     @staticmethod
+    @leitura
     def count_por_usuario(usuario_id):
         return CategoriaModel.query.filter_by(usuario_id=usuario_id).count()
\ No newline at end of file
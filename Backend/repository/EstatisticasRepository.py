@@ -0,0 +1,167 @@
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from replicas import leitura
+from model.CategoriaModel import CategoriaModel
+from model.UserModel import UsuarioModel
+from model.ProdutoModel import ProdutoModel
+from model.CatalogoContadorModel import CatalogoContadorModel
+
+class EstatisticasRepository:
+
+    @staticmethod
+    def consulta_agregada(usuario_id: int):
+        """
+        Uma linha por categoria (com as vazias) e uma para os produtos sem
+        categoria (categoria_id 0): contagens e faixa de preço em um só SELECT
+        """
+        def agregados():
+            return [
+                db.func.count(ProdutoModel.id).label('produtos'),
+                db.func.coalesce(db.func.sum(db.case((ProdutoModel.disponivel, 1), else_=0)), 0).label('disponiveis'),
+                db.func.coalesce(db.func.sum(ProdutoModel.preco), 0).label('soma_precos'),
+                db.func.min(ProdutoModel.preco).label('preco_min'),
+                db.func.max(ProdutoModel.preco).label('preco_max'),
+            ]
+
+        por_categoria = db.select(
+            CategoriaModel.id.label('categoria_id'), CategoriaModel.nome.label('nome'), *agregados()
+        ).select_from(CategoriaModel).outerjoin(ProdutoModel, db.and_(
+            ProdutoModel.categoria_id == CategoriaModel.id, ProdutoModel.usuario_id == usuario_id
+        )).where(CategoriaModel.usuario_id == usuario_id).group_by(CategoriaModel.id, CategoriaModel.nome)
+
+        sem_categoria = db.select(
+            db.literal(0).label('categoria_id'), db.null().label('nome'), *agregados()
+        ).where(ProdutoModel.usuario_id == usuario_id, ProdutoModel.categoria_id.is_(None))
+
+        return db.union_all(por_categoria, sem_categoria).order_by('categoria_id')
+
+    @staticmethod
+    @leitura
+    def agregar(usuario_id: int) -> list:
+        return db.session.execute(EstatisticasRepository.consulta_agregada(usuario_id)).all()
+
+    @staticmethod
+    def buscar_contadores(usuario_id: int) -> list:
+        """
+        Linhas de catalogo_contadores no mesmo formato da consulta agregada, mais
+        o valido. Lidas do primário, onde a recontagem e a invalidação escrevem:
+        numa réplica atrasada voltariam vazias (recontando a cada leitura) ou
+        válidas depois de invalidadas
+        """
+        contador = CatalogoContadorModel
+        return db.session.execute(db.select(
+            contador.categoria_id, CategoriaModel.nome, contador.produtos, contador.disponiveis,
+            contador.soma_precos, contador.preco_min, contador.preco_max, contador.valido
+        ).outerjoin(CategoriaModel, CategoriaModel.id == contador.categoria_id).where(
+            contador.usuario_id == usuario_id
+        ).order_by(contador.categoria_id)).all()
+
+    @staticmethod
+    def recontar(usuario_id: int) -> list:
+        """
+        Refaz os contadores do usuário a partir da consulta agregada (no primário)
+        e faz commit. A agregação só roda depois de travar o usuário (ver
+        travar_usuarios): as escritas em andamento já terminaram e as novas
+        esperam a recontagem para aplicar a sua diferença
+        """
+        EstatisticasRepository.travar_usuarios(db.session.connection(), [usuario_id], exclusiva=True)
+        linhas = db.session.execute(EstatisticasRepository.consulta_agregada(usuario_id)).all()
+        db.session.execute(db.delete(CatalogoContadorModel).where(CatalogoContadorModel.usuario_id == usuario_id))
+        try:
+            db.session.execute(db.insert(CatalogoContadorModel), [
+                {'usuario_id': usuario_id, 'categoria_id': linha.categoria_id, 'produtos': linha.produtos,
+                 'disponiveis': linha.disponiveis, 'soma_precos': linha.soma_precos,
+                 'preco_min': linha.preco_min, 'preco_max': linha.preco_max, 'valido': True}
+                for linha in linhas
+            ])
+            db.session.commit()
+        except IntegrityError:
+            # Sem a trava (SQLite): outra leitura recontou ao mesmo tempo e já gravou
+            db.session.rollback()
+        return linhas
+
+    @staticmethod
+    def travar_usuarios(conexao, usuario_ids: Iterable, exclusiva: bool = False) -> None:
+        """
+        No Postgres, trava a linha dos usuários até o fim da transação: FOR UPDATE
+        na recontagem e FOR KEY SHARE nas escritas que mexem nos contadores, que
+        só conflita com a primeira (nem entre escritas, nem com UPDATEs comuns
+        do usuário). Outros bancos serializam as escritas por conta própria.
+        """
+        if conexao.dialect.name != 'postgresql':
+            return
+        ids = sorted(usuario_id for usuario_id in usuario_ids if usuario_id is not None)
+        if not ids:
+            return
+        consulta = db.select(UsuarioModel.id).where(UsuarioModel.id.in_(ids)).order_by(UsuarioModel.id)
+        conexao.execute(consulta.with_for_update() if exclusiva
+                        else consulta.with_for_update(read=True, key_share=True))
+
+    @staticmethod
+    def invalidar(usuario_id=None) -> None:
+        """
+        Apaga os contadores do usuário (ou de todos, com None) para a próxima
+        leitura recontar. Aceita uma subconsulta escalar no lugar do id.
+        Não faz commit: vale na transação da escrita que invalidou.
+        """
+        comando = db.delete(CatalogoContadorModel)
+        if usuario_id is not None:
+            if db.session.get_bind().dialect.name == 'postgresql':
+                # Uma recontagem em andamento termina antes; a próxima vê esta escrita
+                db.session.execute(db.select(UsuarioModel.id).where(
+                    UsuarioModel.id == usuario_id
+                ).with_for_update(read=True, key_share=True))
+            comando = comando.where(CatalogoContadorModel.usuario_id == usuario_id)
+        db.session.execute(comando, execution_options={'synchronize_session': False})
+
+    @staticmethod
+    def aplicar_no_flush(conexao, novas_categorias: Iterable[Tuple[int, int]], deltas: Dict, invalidar: set) -> None:
+        """
+        Ajusta os contadores por diferença dentro do flush (conexão da sessão).
+        Usuários ainda não contados são ignorados: a primeira leitura conta.
+        """
+        tabela = CatalogoContadorModel.__table__
+        c = tabela.c
+        EstatisticasRepository.travar_usuarios(conexao, {usuario_id for usuario_id, _ in novas_categorias}
+                                               | {usuario_id for usuario_id, _ in deltas} | invalidar)
+
+        for usuario_id, categoria_id in novas_categorias:
+            contado = conexao.execute(db.select(c.usuario_id).where(
+                c.usuario_id == usuario_id, c.categoria_id == 0
+            )).first()
+            if contado:
+                conexao.execute(tabela.insert().values(
+                    usuario_id=usuario_id, categoria_id=categoria_id, produtos=0, disponiveis=0,
+                    soma_precos=Decimal('0'), valido=True
+                ))
+
+        for (usuario_id, categoria_id), delta in deltas.items():
+            valores = {
+                'produtos': c.produtos + delta['produtos'],
+                'disponiveis': c.disponiveis + delta['disponiveis'],
+                'soma_precos': c.soma_precos + delta['soma_precos'],
+            }
+            if delta['novo_min'] is not None:
+                valores['preco_min'] = db.case(
+                    (db.or_(c.preco_min.is_(None), c.preco_min > delta['novo_min']), delta['novo_min']),
+                    else_=c.preco_min)
+                valores['preco_max'] = db.case(
+                    (db.or_(c.preco_max.is_(None), c.preco_max < delta['novo_max']), delta['novo_max']),
+                    else_=c.preco_max)
+            if delta['removido_min'] is not None:
+                # Saiu um preço na ponta da faixa: o novo mínimo/máximo só recontando
+                valores['valido'] = db.case(
+                    (db.or_(c.preco_min >= delta['removido_min'], c.preco_max <= delta['removido_max']), db.false()),
+                    else_=c.valido)
+            resultado = conexao.execute(tabela.update().where(
+                c.usuario_id == usuario_id, c.categoria_id == categoria_id
+            ).values(valores))
+            if resultado.rowcount == 0:
+                invalidar.add(usuario_id)
+
+        if None in invalidar:
+            conexao.execute(tabela.delete())
+        elif invalidar:
+            conexao.execute(tabela.delete().where(c.usuario_id.in_(sorted(invalidar))))
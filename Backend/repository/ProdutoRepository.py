@@ -1,40 +1,70 @@
-from typing import List, Optional
-from extensions import db
-from model.ProdutoModel import ProdutoModel
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from extensions import db, contadores_catalogo
+from replicas import leitura
+from model.ProdutoModel import ProdutoModel, normalizar_busca
+from model.CategoriaModel import CategoriaModel
+from repository.CatalogoVersaoRepository import CatalogoVersaoRepository
+
+# Colunas que podem ser projetadas na listagem (?fields=), na ordem do to_dict()
+CAMPOS_LISTAGEM = {
+    'id': ProdutoModel.id,
+    'nome': ProdutoModel.nome,
+    'preco': ProdutoModel.preco,
+    'quantidade': ProdutoModel.quantidade,
+    'disponivel': ProdutoModel.disponivel,
+    'descricao': ProdutoModel.descricao,
+    'categoria_id': ProdutoModel.categoria_id,
+    'categoria_nome': db.func.coalesce(CategoriaModel.nome, 'Sem categoria'),
+    'usuario_id': ProdutoModel.usuario_id,
+}
+
+# Tabela FTS5 da busca no SQLite (ver model/ProdutoModel.py)
+_PRODUTOS_BUSCA = db.table('produtos_busca', db.column('rowid'), db.column('rank'))
+
+def _escapar_like(termo: str) -> str:
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
 
 class ProdutoRepository:
 
     @staticmethod
+    @leitura
     def find_by_categoria_id(categoria_id: int) -> List[ProdutoModel]:
         return ProdutoModel.query.filter_by(categoria_id=categoria_id).all()
     
     @staticmethod
+    @leitura
     def find_by_categoria_id_e_usuario(categoria_id: int, usuario_id: int) -> List[ProdutoModel]:
         return ProdutoModel.query.filter_by(categoria_id=categoria_id, usuario_id=usuario_id).all()
 
     @staticmethod
+    @leitura
     def find_by_disponivel_true() -> List[ProdutoModel]:
         return ProdutoModel.query.filter_by(disponivel=True).all()
     
     @staticmethod
+    @leitura
     def find_by_disponivel_true_e_usuario(usuario_id: int) -> List[ProdutoModel]:
         return ProdutoModel.query.filter_by(disponivel=True, usuario_id=usuario_id).all()
 
     @staticmethod
+    @leitura
     def find_by_nome(nome: str) -> Optional[ProdutoModel]:
         return ProdutoModel.query.filter_by(nome=nome).first()
     
     @staticmethod
+    @leitura
     def find_by_nome_e_usuario(nome: str, usuario_id: int) -> Optional[ProdutoModel]:
         return ProdutoModel.query.filter_by(nome=nome, usuario_id=usuario_id).first()
 
     @staticmethod
+    @leitura
     def find_by_nome_ignore_case(nome: str) -> Optional[ProdutoModel]:
         return ProdutoModel.query.filter(
             db.func.lower(ProdutoModel.nome) == db.func.lower(nome)
         ).first()
     
     @staticmethod
+    @leitura
     def find_by_nome_ignore_case_e_usuario(nome: str, usuario_id: int) -> Optional[ProdutoModel]:
         return ProdutoModel.query.filter(
             db.func.lower(ProdutoModel.nome) == db.func.lower(nome),
@@ -49,10 +79,12 @@ class ProdutoRepository:
         return produto
 
     @staticmethod
+    @leitura
     def find_by_id(id: int) -> Optional[ProdutoModel]:
         return ProdutoModel.query.get(id)
     
     @staticmethod
+    @leitura
     def find_by_id_e_usuario(id: int, usuario_id: int) -> Optional[ProdutoModel]:
         return ProdutoModel.query.filter_by(id=id, usuario_id=usuario_id).first()
 
@@ -75,21 +107,248 @@ class ProdutoRepository:
         return False
 
     @staticmethod
+    @leitura
     def find_all() -> List[ProdutoModel]:
         return ProdutoModel.query.all()
     
     @staticmethod
+    @leitura
     def find_by_usuario(usuario_id: int) -> List[ProdutoModel]:
         return ProdutoModel.query.filter_by(usuario_id=usuario_id).all()
     
     @staticmethod
+    @leitura
+    def find_by_usuario_leitura(usuario_id: int, campos: Optional[Sequence[str]] = None) -> list:
+        """
+        Somente leitura: linhas só com as colunas pedidas (padrão: as do to_dict),
+        sem instanciar objetos do ORM nem ocupar o identity map da sessão.
+        """
+        return db.session.execute(ProdutoRepository.consulta_leitura(usuario_id, campos)).all()
+
+    @staticmethod
+    def consulta_leitura(usuario_id: int, campos: Optional[Sequence[str]] = None):
+        """SELECT de find_by_usuario_leitura; o asgi.py o executa na sessão assíncrona"""
+        return ProdutoRepository._consulta_colunas(campos).filter(
+            ProdutoModel.usuario_id == usuario_id
+        ).order_by(ProdutoModel.id)
+
+    @staticmethod
+    @leitura
     def count_by_usuario(usuario_id: int) -> int:
         return ProdutoModel.query.filter_by(usuario_id=usuario_id).count()
     
     @staticmethod
+    @leitura
     def count_disponiveis_by_usuario(usuario_id: int) -> int:
         return ProdutoModel.query.filter_by(usuario_id=usuario_id, disponivel=True).count()
     
     @staticmethod
+    @leitura
     def count_por_categoria_e_usuario(categoria_id: int, usuario_id: int) -> int:
-        return ProdutoModel.query.filter_by(categoria_id=categoria_id, usuario_id=usuario_id).count()
\ No newline at end of file
+        return ProdutoModel.query.filter_by(categoria_id=categoria_id, usuario_id=usuario_id).count()
+
+    @staticmethod
+    def _consulta_colunas(campos: Optional[Sequence[str]] = None):
+        """SELECT das colunas de CAMPOS_LISTAGEM pedidas, com o join de categoria se preciso"""
+        campos = list(campos or CAMPOS_LISTAGEM)
+        query = db.select(*[CAMPOS_LISTAGEM[campo].label(campo) for campo in campos])
+        if 'categoria_nome' in campos:
+            query = query.outerjoin(CategoriaModel, ProdutoModel.categoria_id == CategoriaModel.id)
+        return query
+
+    @staticmethod
+    @leitura
+    def find_by_usuario_paginado(usuario_id: int, after: Optional[int] = None, limit: Optional[int] = None,
+                                 categoria_id: Optional[int] = None, disponivel: Optional[bool] = None,
+                                 campos: Optional[Sequence[str]] = None) -> list:
+        """
+        Listagem por keyset (id > after) com filtros opcionais de categoria e
+        disponibilidade. Seleciona apenas as colunas pedidas e devolve linhas,
+        não instâncias do ORM.
+        """
+        return db.session.execute(ProdutoRepository.consulta_paginada(
+            usuario_id, after, limit, categoria_id, disponivel, campos
+        )).all()
+
+    @staticmethod
+    def consulta_paginada(usuario_id: int, after: Optional[int] = None, limit: Optional[int] = None,
+                          categoria_id: Optional[int] = None, disponivel: Optional[bool] = None,
+                          campos: Optional[Sequence[str]] = None):
+        """Monta o SELECT da listagem paginada sem executá-lo"""
+        campos = list(campos or CAMPOS_LISTAGEM)
+        if 'id' not in campos:
+            # O id é sempre necessário para montar o próximo cursor
+            campos.insert(0, 'id')
+
+        query = ProdutoRepository._consulta_colunas(campos).filter(ProdutoModel.usuario_id == usuario_id)
+        if categoria_id is not None:
+            query = query.filter(ProdutoModel.categoria_id == categoria_id)
+        if disponivel is not None:
+            query = query.filter(ProdutoModel.disponivel == disponivel)
+        if after is not None:
+            query = query.filter(ProdutoModel.id > after)
+
+        query = query.order_by(ProdutoModel.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    @staticmethod
+    @leitura
+    def buscar(usuario_id: int, termo: str, limite: int = 20) -> list:
+        """
+        Busca por prefixo/substring em nome e descrição, sem diferenciar
+        maiúsculas nem acentos. Ordena começando pelo nome, depois nome que
+        contém o termo, depois descrição; no PostgreSQL desempata pela
+        similaridade de trigramas e no SQLite pelo rank do FTS5.
+        """
+        termo = normalizar_busca(termo)
+        contem = f"%{_escapar_like(termo)}%"
+        comeca = f"{_escapar_like(termo)}%"
+        relevancia = db.case(
+            (ProdutoModel.busca_nome.like(comeca, escape='\\'), 0),
+            (ProdutoModel.busca_nome.like(contem, escape='\\'), 1),
+            else_=2
+        )
+
+        query = ProdutoRepository._consulta_colunas().filter(ProdutoModel.usuario_id == usuario_id)
+
+        dialeto = db.session.get_bind().dialect.name
+        ordem = [relevancia]
+        if dialeto == 'sqlite' and len(termo) >= 3:
+            # O tokenizer trigram só indexa termos com 3 ou mais caracteres
+            frase = '"' + termo.replace('"', '""') + '"'
+            query = query.join(_PRODUTOS_BUSCA, _PRODUTOS_BUSCA.c.rowid == ProdutoModel.id).filter(
+                db.text("produtos_busca MATCH :frase").bindparams(frase=frase)
+            )
+            ordem.append(_PRODUTOS_BUSCA.c.rank)
+        else:
+            query = query.filter(db.or_(
+                ProdutoModel.busca_nome.like(contem, escape='\\'),
+                ProdutoModel.busca_descricao.like(contem, escape='\\')
+            ))
+            if dialeto == 'postgresql':
+                ordem.append(db.func.similarity(ProdutoModel.busca_nome, termo).desc())
+
+        return db.session.execute(query.order_by(*ordem, ProdutoModel.nome, ProdutoModel.id).limit(limite)).all()
+
+    @staticmethod
+    @leitura
+    def iter_by_usuario(usuario_id: int, campos: Optional[Sequence[str]] = None, tamanho_lote: int = 1000) -> Iterator:
+        """Percorre os produtos do usuário em lotes (cursor no servidor quando suportado)"""
+        return db.session.execute(
+            ProdutoRepository.consulta_leitura(usuario_id, campos).execution_options(yield_per=tamanho_lote)
+        )
+
+    @staticmethod
+    def find_ids_existentes(ids: Iterable[int], usuario_id: int) -> Set[int]:
+        """Ids do usuário que existem, lidos no primário (usado antes de escrever)"""
+        return {
+            id for (id,) in db.session.query(ProdutoModel.id).filter(
+                ProdutoModel.usuario_id == usuario_id,
+                ProdutoModel.id.in_(list(ids))
+            )
+        }
+
+    @staticmethod
+    def atualizar_em_lote(usuario_id: int, valores_por_campo: Dict[str, Dict[int, object]]) -> Set[int]:
+        """
+        Aplica um UPDATE por campo (SET campo = CASE id WHEN ... END) restrito ao
+        usuário e devolve os ids alterados (UPDATE ... RETURNING). Não faz
+        commit: o chamador controla a transação.
+        """
+        retorna = db.session.get_bind().dialect.update_returning
+        alterados = set()
+        for campo, valores in valores_por_campo.items():
+            if not valores:
+                continue
+            coluna = getattr(ProdutoModel, campo)
+            comando = db.update(ProdutoModel).where(
+                ProdutoModel.usuario_id == usuario_id,
+                ProdutoModel.id.in_(list(valores))
+            ).values({coluna: db.case(valores, value=ProdutoModel.id)}).execution_options(synchronize_session=False)
+            if retorna:
+                alterados.update(db.session.execute(comando.returning(ProdutoModel.id)).scalars())
+            else:
+                db.session.execute(comando)
+                alterados.update(ProdutoRepository.find_ids_existentes(valores, usuario_id))
+        if alterados:
+            CatalogoVersaoRepository.marcar_alteracao(usuario_id)
+            if any(valores_por_campo.get(campo) for campo in ('preco', 'disponivel', 'categoria_id')):
+                contadores_catalogo.invalidar(usuario_id)
+        return alterados
+
+    @staticmethod
+    def reservar_estoque(usuario_id: int, quantidades: Dict[int, int]) -> Dict[int, Tuple[int, bool]]:
+        """
+        Baixa o estoque de vários produtos em um único UPDATE condicional
+        (WHERE quantidade >= pedida), desligando disponivel quando chega a zero.
+        O banco reavalia a condição na linha travada, então pedidos simultâneos
+        não vendem além do estoque. Devolve {id: (quantidade, disponivel)} dos
+        produtos baixados. Não faz commit: o chamador controla a transação.
+        """
+        pedida = db.case(quantidades, value=ProdutoModel.id)
+        restante = ProdutoModel.quantidade - pedida
+        comando = db.update(ProdutoModel).where(
+            ProdutoModel.usuario_id == usuario_id,
+            ProdutoModel.id.in_(sorted(quantidades)),
+            ProdutoModel.quantidade >= pedida
+        ).values(
+            quantidade=restante,
+            disponivel=db.case((restante > 0, ProdutoModel.disponivel), else_=False)
+        ).execution_options(synchronize_session=False)
+
+        dialeto = db.session.get_bind().dialect
+        if dialeto.name == 'postgresql' and len(quantidades) > 1:
+            # O UPDATE trava as linhas na ordem do plano; travar antes em ordem
+            # de id evita deadlock entre pedidos com os mesmos produtos
+            db.session.execute(db.select(ProdutoModel.id).where(
+                ProdutoModel.usuario_id == usuario_id,
+                ProdutoModel.id.in_(sorted(quantidades))
+            ).order_by(ProdutoModel.id).with_for_update())
+        if not dialeto.update_returning:
+            reservados = ProdutoRepository._reservar_um_a_um(usuario_id, quantidades)
+        else:
+            reservados = {id: (quantidade, disponivel) for id, quantidade, disponivel in db.session.execute(
+                comando.returning(ProdutoModel.id, ProdutoModel.quantidade, ProdutoModel.disponivel)
+            )}
+        if reservados:
+            CatalogoVersaoRepository.marcar_alteracao(usuario_id)
+        # Só o estoque zerado muda disponivel, que entra nos contadores do dashboard
+        if any(quantidade <= 0 for quantidade, _ in reservados.values()):
+            contadores_catalogo.invalidar(usuario_id)
+        return reservados
+
+    @staticmethod
+    def _reservar_um_a_um(usuario_id: int, quantidades: Dict[int, int]) -> Dict[int, Tuple[int, bool]]:
+        """Fallback para bancos sem UPDATE ... RETURNING: um UPDATE condicional por produto"""
+        reservados = []
+        for id, quantidade in sorted(quantidades.items()):
+            resultado = db.session.execute(db.update(ProdutoModel).where(
+                ProdutoModel.id == id,
+                ProdutoModel.usuario_id == usuario_id,
+                ProdutoModel.quantidade >= quantidade
+            ).values(
+                quantidade=ProdutoModel.quantidade - quantidade,
+                disponivel=db.case((ProdutoModel.quantidade > quantidade, ProdutoModel.disponivel), else_=False)
+            ).execution_options(synchronize_session=False))
+            if resultado.rowcount:
+                reservados.append(id)
+        if not reservados:
+            return {}
+        return {
+            id: (quantidade, disponivel) for id, quantidade, disponivel in db.session.execute(
+                db.select(ProdutoModel.id, ProdutoModel.quantidade, ProdutoModel.disponivel)
+                .where(ProdutoModel.id.in_(reservados))
+            )
+        }
+
+    @staticmethod
+    def estoque_por_id(ids: Iterable[int], usuario_id: int) -> Dict[int, int]:
+        """{id: quantidade} dos produtos do usuário (para explicar reservas recusadas)"""
+        return dict(db.session.execute(
+            db.select(ProdutoModel.id, ProdutoModel.quantidade).where(
+                ProdutoModel.usuario_id == usuario_id,
+                ProdutoModel.id.in_(list(ids))
+            )
+        ).all())
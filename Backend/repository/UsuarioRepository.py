@@ -0,0 +1,78 @@
+import secrets
+from typing import Optional, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from model.UserModel import UsuarioModel, UsuarioAutenticado
+
+# Dialetos com INSERT ... ON CONFLICT ... RETURNING
+_INSERTS_UPSERT = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+class UsuarioRepository:
+
+    @staticmethod
+    def buscar_por_email(email: str) -> Optional[UsuarioModel]:
+        return UsuarioModel.query.filter_by(email=email).first()
+
+    @staticmethod
+    def upsert_google(nome: str, email: str, google_id: Optional[str]) -> UsuarioAutenticado:
+        """
+        Cria ou atualiza o usuário do login com Google em um único
+        INSERT ... ON CONFLICT (email) DO UPDATE ... RETURNING, e faz commit.
+        Mantém o google_id já gravado, como o fluxo anterior.
+        """
+        insert = _INSERTS_UPSERT.get(db.session.get_bind().dialect.name)
+        if insert is None:
+            return UsuarioRepository._upsert_google_orm(nome, email, google_id)
+
+        tabela = UsuarioModel.__table__
+        comando = insert(tabela).values(
+            nome=nome, email=email, senha="", google_login=True, google_id=google_id
+        )
+        comando = comando.on_conflict_do_update(
+            index_elements=[tabela.c.email],
+            set_={
+                'nome': comando.excluded.nome,
+                'google_login': True,
+                'google_id': db.func.coalesce(tabela.c.google_id, comando.excluded.google_id),
+            }
+        ).returning(tabela.c.id, tabela.c.nome, tabela.c.email, tabela.c.google_login, tabela.c.google_id)
+
+        linha = db.session.execute(comando).one()
+        db.session.commit()
+        return UsuarioAutenticado(*linha)
+
+    @staticmethod
+    def _upsert_google_orm(nome, email, google_id) -> UsuarioAutenticado:
+        """Fallback para bancos sem ON CONFLICT: SELECT + INSERT/UPDATE"""
+        usuario = UsuarioRepository.buscar_por_email(email)
+        if usuario is None:
+            usuario = UsuarioModel(nome=nome, email=email, senha="", google_login=True, google_id=google_id)
+            db.session.add(usuario)
+        else:
+            usuario.nome = nome
+            usuario.google_login = True
+            usuario.google_id = usuario.google_id or google_id
+        db.session.commit()
+        return UsuarioAutenticado.de_modelo(usuario)
+
+    @staticmethod
+    def publicacao_cardapio(usuario_id: int) -> Tuple[bool, Optional[str]]:
+        """(cardápio público?, slug) do usuário"""
+        linha = db.session.execute(db.select(
+            UsuarioModel.cardapio_publico, UsuarioModel.cardapio_slug
+        ).filter_by(id=usuario_id)).first()
+        return (bool(linha.cardapio_publico), linha.cardapio_slug) if linha else (False, None)
+
+    @staticmethod
+    def publicar_cardapio(usuario_id: int, publico: bool) -> Optional[str]:
+        """Liga/desliga o cardápio público e faz commit; o slug é gerado na primeira publicação"""
+        usuario = db.session.get(UsuarioModel, usuario_id)
+        usuario.cardapio_publico = publico
+        if publico and not usuario.cardapio_slug:
+            usuario.cardapio_slug = secrets.token_urlsafe(16)
+        db.session.commit()
+        return usuario.cardapio_slug
+
+    @staticmethod
+    def buscar_publico_por_slug(slug: str) -> Optional[UsuarioModel]:
+        return UsuarioModel.query.filter_by(cardapio_slug=slug, cardapio_publico=True).first()
@@ -0,0 +1,17 @@
+from typing import Dict, Iterable, List, Sequence
+
+def linhas_para_dicts(linhas: Sequence, omitir: Iterable[str] = ()) -> List[Dict]:
+    """
+    Converte linhas de consultas por coluna (Row / tupla nomeada) em dicts,
+    sem instanciar objetos do ORM. Os nomes vêm dos labels da consulta e
+    Decimal é mantido (o provider JSON do app o serializa como número).
+    """
+    if not linhas:
+        return []
+    campos = linhas[0]._fields
+    omitir = set(omitir)
+    if not omitir:
+        return [dict(zip(campos, linha)) for linha in linhas]
+    indices = [i for i, campo in enumerate(campos) if campo not in omitir]
+    campos = [campos[i] for i in indices]
+    return [dict(zip(campos, [linha[i] for i in indices])) for linha in linhas]
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from signals import catalogo_alterado
+
+class MemoriaCacheBackend:
+    """Cache em memória do processo, com TTL e despejo LRU"""
+
+    def __init__(self, max_itens=1024, ttl=300):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def delete(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def __len__(self):
+        return len(self._itens)
+
+
+class RedisCacheBackend:
+    """Cache compartilhado entre workers do gunicorn (requer o pacote redis)"""
+
+    def __init__(self, url, ttl=300, prefixo='cardapio:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("O pacote 'redis' é necessário para usar CARDAPIO_CACHE_URL") from e
+        self.ttl = ttl
+        self.prefixo = prefixo
+        self._cliente = redis.Redis.from_url(url)
+
+    def get(self, chave):
+        valor = self._cliente.get(self.prefixo + str(chave))
+        return json.loads(valor) if valor is not None else None
+
+    def set(self, chave, valor):
+        # O Redis cuida do LRU via maxmemory-policy=allkeys-lru
+        self._cliente.set(self.prefixo + str(chave), json.dumps(valor), ex=self.ttl)
+
+    def delete(self, chave):
+        self._cliente.delete(self.prefixo + str(chave))
+
+    def __len__(self):
+        return sum(1 for _ in self._cliente.scan_iter(self.prefixo + '*'))
+
+
+class CacheContado:
+    """Cache chave -> valor com contadores de hit/miss; o backend é plugável"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoriaCacheBackend()
+        self.hits = 0
+        self.misses = 0
+
+    def obter(self, chave, construtor, versao=None):
+        """Com versao, o valor guardado só serve para ela; outra versão reconstrói"""
+        valor = self._ler(chave, versao)
+        if valor is not None:
+            self.hits += 1
+            return valor
+        self.misses += 1
+        valor = construtor()
+        if valor is not None:
+            self._gravar(chave, valor, versao)
+        return valor
+
+    async def obter_async(self, chave, construtor, versao=None):
+        """
+        Como obter(), com construtor assíncrono (leituras do asgi.py). As
+        chamadas a um backend de rede (Redis) rodam em thread, fora do event loop
+        """
+        valor = await self._no_backend(self._ler, chave, versao)
+        if valor is not None:
+            self.hits += 1
+            return valor
+        self.misses += 1
+        valor = await construtor()
+        if valor is not None:
+            await self._no_backend(self._gravar, chave, valor, versao)
+        return valor
+
+    async def _no_backend(self, funcao, *args):
+        # O backend em memória só disputa um lock: a troca de thread custaria mais que a chamada
+        if isinstance(self.backend, MemoriaCacheBackend):
+            return funcao(*args)
+        return await asyncio.to_thread(funcao, *args)
+
+    def _ler(self, chave, versao):
+        item = self.backend.get(chave)
+        if versao is None or item is None:
+            return item
+        return item['valor'] if item['versao'] == versao else None
+
+    def _gravar(self, chave, valor, versao):
+        self.backend.set(chave, valor if versao is None else {'versao': versao, 'valor': valor})
+
+    def invalidar(self, chave):
+        self.backend.delete(chave)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'itens': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class CardapioCache(CacheContado):
+    """
+    Cache do cardápio montado, por usuario_id, guardado com a versão do
+    catálogo (CatalogoVersaoRepository). A versão fica no banco: um worker
+    que não recebeu o sinal da escrita reconstrói em vez de servir o
+    cardápio antigo sob o ETag novo.
+    """
+
+    def init_app(self, app):
+        ttl = int(app.config.get("CARDAPIO_CACHE_TTL", 300))
+        url = app.config.get("CARDAPIO_CACHE_URL")
+        if url:
+            self.backend = RedisCacheBackend(url, ttl=ttl)
+        else:
+            max_itens = int(app.config.get("CARDAPIO_CACHE_MAX_ITENS", 1024))
+            self.backend = MemoriaCacheBackend(max_itens=max_itens, ttl=ttl)
+
+        catalogo_alterado.connect(self._ao_alterar_catalogo)
+
+    def _ao_alterar_catalogo(self, sender, usuario_id, **extra):
+        self.invalidar(usuario_id)
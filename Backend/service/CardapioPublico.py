@@ -0,0 +1,156 @@
+import gzip
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from flask import render_template
+from service.CardapioCache import MemoriaCacheBackend
+from signals import catalogo_alterado
+
+logger = logging.getLogger(__name__)
+
+# Slug gerado por secrets.token_urlsafe(16) (ver UsuarioRepository.publicar_cardapio)
+SLUG_VALIDO = re.compile(r'[A-Za-z0-9_-]{22}')
+
+class CardapioPublico:
+    """
+    Snapshots em disco do cardápio público dos usuários que o publicaram
+    (HTML e .html.gz, nomeados pelo slug). São regenerados por uma thread em
+    segundo plano quando o catálogo muda, então a leitura só serve arquivos,
+    sem consultar o banco. Os arquivos são compartilhados entre os workers
+    do gunicorn da mesma máquina.
+    """
+
+    def __init__(self):
+        self.diretorio = None
+        self.geracoes = 0
+        self._app = None
+        self._pendentes = set()
+        # Slugs sem arquivo já enviados à thread: um slug desconhecido gera no máximo uma consulta por minuto
+        self._slugs_agendados = MemoriaCacheBackend(max_itens=4096, ttl=60)
+        self._condicao = threading.Condition()
+        self._thread = None
+
+    def init_app(self, app):
+        self._app = app
+        self.diretorio = Path(app.config["CARDAPIO_PUBLICO_DIR"] or Path(app.instance_path) / 'cardapios')
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        catalogo_alterado.connect(self._ao_alterar_catalogo)
+
+    def _ao_alterar_catalogo(self, sender, usuario_id, **extra):
+        self.agendar(usuario_id)
+
+    def caminho(self, slug, comprimido=False):
+        return self.diretorio / (f'{slug}.html.gz' if comprimido else f'{slug}.html')
+
+    def arquivo(self, slug, comprimido=False):
+        """
+        Caminho do snapshot, ou None (404). Nunca consulta o banco: um slug
+        válido sem arquivo (disco novo, por exemplo) é gerado pela thread
+        """
+        if not SLUG_VALIDO.fullmatch(slug):
+            return None
+        caminho = self.caminho(slug, comprimido)
+        if caminho.exists():
+            return caminho
+        if self._slugs_agendados.get(slug) is None:
+            self._slugs_agendados.set(slug, True)
+            self.agendar(slug)
+        return None
+
+    def agendar(self, usuario_id_ou_slug):
+        with self._condicao:
+            self._pendentes.add(usuario_id_ou_slug)
+            # A thread nasce no primeiro uso, depois do fork dos workers do gunicorn
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._trabalhar, name='cardapio-publico', daemon=True)
+                self._thread.start()
+            self._condicao.notify()
+
+    def _trabalhar(self):
+        while True:
+            with self._condicao:
+                while not self._pendentes:
+                    self._condicao.wait()
+                pendente = self._pendentes.pop()
+            try:
+                if isinstance(pendente, str):
+                    self.gerar_por_slug(pendente)
+                else:
+                    self.gerar(pendente)
+            except Exception:
+                logger.exception("Erro ao gerar o cardápio público %s", pendente)
+
+    def gerar_por_slug(self, slug):
+        from repository.UsuarioRepository import UsuarioRepository
+
+        with self._app.app_context():
+            usuario = UsuarioRepository.buscar_publico_por_slug(slug)
+            usuario_id = usuario.id if usuario else None
+        if usuario_id is not None:
+            self.gerar(usuario_id)
+
+    def gerar(self, usuario_id):
+        """
+        Gera o snapshot de quem publicou e apaga o de quem despublicou. Vários
+        workers compartilham a pasta, então a publicação é conferida de novo
+        depois de gravar: uma despublicação que chegou no meio apaga o arquivo
+        """
+        from extensions import db
+        from model.UserModel import UsuarioModel
+        from service.CardapioService import CardapioService
+
+        # Contexto de requisição fictício: o template usa url_for
+        with self._app.test_request_context('/'):
+            usuario = db.session.get(UsuarioModel, usuario_id)
+            if usuario is None or not usuario.cardapio_slug:
+                return
+            slug = usuario.cardapio_slug
+            if not usuario.cardapio_publico:
+                self.remover(slug)
+                return
+            dados = CardapioService.montar_cardapio_primario(usuario_id)
+            html = render_template('cardapio.html', dados=dados, usuario=usuario, publico=True).encode('utf-8')
+
+        self._escrever(self.caminho(slug), html)
+        self._escrever(self.caminho(slug, comprimido=True), gzip.compress(html, compresslevel=9, mtime=0))
+        if not self._publicado(usuario_id):
+            self.remover(slug)
+            return
+        # Slug (re)publicado: se o arquivo sumir de novo, a próxima leitura volta a agendá-lo
+        self._slugs_agendados.delete(slug)
+        self.geracoes += 1
+        logger.info("Cardápio público do usuário %s gerado (%s bytes)", usuario_id, len(html))
+
+    def _publicado(self, usuario_id):
+        from repository.UsuarioRepository import UsuarioRepository
+
+        # Sessão nova, no primário (o UsuarioRepository não usa réplicas)
+        with self._app.app_context():
+            publicado, _ = UsuarioRepository.publicacao_cardapio(usuario_id)
+        return publicado
+
+    def remover(self, slug):
+        """Apaga o snapshot (cardápio despublicado)"""
+        for comprimido in (False, True):
+            self.caminho(slug, comprimido).unlink(missing_ok=True)
+
+    def _escrever(self, caminho, conteudo):
+        # Troca atômica: um worker lendo nunca vê o arquivo pela metade
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, prefix='.tmp-')
+        try:
+            with os.fdopen(descritor, 'wb') as arquivo:
+                arquivo.write(conteudo)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+    def stats(self):
+        return {
+            'diretorio': str(self.diretorio),
+            'geracoes': self.geracoes,
+            'pendentes': len(self._pendentes),
+        }
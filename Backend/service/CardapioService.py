@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import Dict, Optional
+from extensions import db, cardapio_cache
+from replicas import leitura, primario
+from repository.CatalogoVersaoRepository import CatalogoVersaoRepository
+from model.ProdutoModel import ProdutoModel
+from model.CategoriaModel import CategoriaModel
+
+class CardapioService:
+
+    @staticmethod
+    def obter_cardapio(usuario_id: int, versao: Optional[int] = None) -> Dict:
+        """
+        Retorna o cardápio do cache, montando-o apenas em caso de miss ou de
+        versão do catálogo diferente (consultada se não vier do get_condicional)
+        """
+        if versao is None:
+            versao, _ = CatalogoVersaoRepository.buscar(usuario_id)
+        return cardapio_cache.obter(usuario_id, lambda: CardapioService.montar_cardapio_primario(usuario_id), versao)
+
+    @staticmethod
+    def montar_cardapio_primario(usuario_id: int) -> Dict:
+        """Para o cache: lido de uma réplica atrasada, ficaria guardado sob a versão nova"""
+        with primario():
+            return CardapioService.montar_cardapio(usuario_id)
+
+    @staticmethod
+    @leitura
+    def montar_cardapio(usuario_id: int) -> Dict:
+        """Monta o cardápio do usuário com uma única consulta (produtos + categorias)"""
+        return CardapioService.agrupar(db.session.execute(CardapioService.consulta(usuario_id)).all())
+
+    @staticmethod
+    def consulta(usuario_id: int):
+        """Produtos do usuário com o nome da categoria, na ordem do cardápio"""
+        return db.select(
+            ProdutoModel.id,
+            ProdutoModel.nome,
+            ProdutoModel.preco,
+            ProdutoModel.quantidade,
+            ProdutoModel.descricao,
+            ProdutoModel.disponivel,
+            CategoriaModel.nome.label('categoria_nome')
+        ).join(
+            CategoriaModel, ProdutoModel.categoria_id == CategoriaModel.id
+        ).filter(
+            ProdutoModel.usuario_id == usuario_id
+        ).order_by(ProdutoModel.id)
+
+    @staticmethod
+    def agrupar(linhas) -> Dict:
+        """Agrupa as linhas por categoria, separando disponíveis e indisponíveis"""
+        categorias = {}
+        for linha in linhas:
+            grupo = categorias.get(linha.categoria_nome)
+            if grupo is None:
+                grupo = categorias[linha.categoria_nome] = {'disponiveis': [], 'indisponiveis': []}
+
+            item = {
+                'id': linha.id,
+                'nome': linha.nome,
+                'preco': float(linha.preco),
+                'quantidade': linha.quantidade,
+                'descricao': linha.descricao
+            }
+            if linha.disponivel:
+                grupo['disponiveis'].append(item)
+            else:
+                grupo['indisponiveis'].append(item)
+
+        return {
+            'atualizado_em': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            'categorias': categorias,
+            'total_produtos': len(linhas)
+        }
@@ -0,0 +1,75 @@
+import zlib
+from functools import wraps
+from itertools import chain
+from flask import g, request, make_response
+from flask_login import current_user
+from sqlalchemy import event, inspect
+from model.CategoriaModel import CategoriaModel
+from model.ProdutoModel import ProdutoModel
+from replicas import SessaoRoteada
+from repository.CatalogoVersaoRepository import CatalogoVersaoRepository, CATALOGOS_ALTERADOS
+
+# A versão do catálogo sobe na mesma transação dos dados: os dois são
+# gravados ou desfeitos juntos, e um 304 nunca devolve o ETag de antes de um
+# commit. O sinal catalogo_alterado, emitido depois, cuida só dos caches.
+
+@event.listens_for(SessaoRoteada, 'after_flush')
+def _marcar_catalogo_alterado(session, contexto):
+    for objeto in chain(session.new, session.dirty, session.deleted):
+        if isinstance(objeto, (ProdutoModel, CategoriaModel)) and (
+                objeto not in session.dirty or session.is_modified(objeto)):
+            session.info.setdefault(CATALOGOS_ALTERADOS, set()).add(inspect(objeto).dict.get('usuario_id'))
+
+@event.listens_for(SessaoRoteada, 'before_commit')
+def _incrementar_versoes(session):
+    # O commit só faz o último flush depois deste evento
+    session.flush()
+    for usuario_id in sorted(u for u in session.info.pop(CATALOGOS_ALTERADOS, ()) if u is not None):
+        CatalogoVersaoRepository.incrementar_na_transacao(session, usuario_id)
+
+@event.listens_for(SessaoRoteada, 'after_transaction_end')
+def _descartar_marcas(session, transacao):
+    if transacao.parent is None:
+        session.info.pop(CATALOGOS_ALTERADOS, None)
+
+def avaliar_condicional(usuario_id, versao, atualizado_em, full_path, if_none_match, if_modified_since):
+    """(etag, atualizado_em, nao_modificado) da representação pedida; usado também pelo asgi.py"""
+    # A URL completa entra no ETag: filtros e paginação geram representações diferentes
+    etag = f"{usuario_id}-{versao}-{zlib.crc32(full_path.encode()):08x}"
+    if atualizado_em is not None:
+        atualizado_em = atualizado_em.replace(microsecond=0)
+
+    if if_none_match:
+        nao_modificado = if_none_match.contains_weak(etag)
+    else:
+        nao_modificado = (atualizado_em is not None and if_modified_since is not None
+                          and atualizado_em <= if_modified_since.replace(tzinfo=None))
+    return etag, atualizado_em, nao_modificado
+
+def get_condicional(view):
+    """
+    GET condicional pela versão do catálogo do usuário: responde 304 a
+    If-None-Match/If-Modified-Since sem consultar produtos nem categorias.
+    A versão lida fica em g.catalogo_versao para a view (cache do cardápio).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        versao, atualizado_em = CatalogoVersaoRepository.buscar(current_user.id)
+        g.catalogo_versao = versao
+        etag, atualizado_em, nao_modificado = avaliar_condicional(
+            current_user.id, versao, atualizado_em, request.full_path,
+            request.if_none_match, request.if_modified_since
+        )
+
+        if nao_modificado:
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+        if response.status_code in (200, 304):
+            response.set_etag(etag)
+            if atualizado_em is not None:
+                response.last_modified = atualizado_em
+            # O navegador sempre revalida, mas pode reaproveitar o corpo com 304
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,126 @@
+import threading
+from decimal import Decimal
+from sqlalchemy import event, inspect
+
+# Colunas do produto que entram nos contadores
+_CAMPOS = ('usuario_id', 'categoria_id', 'disponivel', 'preco')
+
+class ContadoresCatalogo:
+    """
+    Contadores por usuário e categoria (tabela catalogo_contadores) para o
+    resumo do dashboard ser uma leitura de poucas linhas em vez de varrer os
+    produtos. Com ESTATISTICAS_CONTADORES=True são ajustados no mesmo flush
+    das escritas do ORM; escritas em lote (UPDATE/DELETE dos repositórios),
+    exclusão de categoria e remoções na ponta da faixa de preço invalidam o
+    usuário, que é recontado pela consulta agregada na próxima leitura.
+
+    Ao religar depois de um período desligado, apague a tabela: as linhas
+    antigas não viram as escritas feitas nesse meio tempo.
+    """
+
+    def __init__(self):
+        self.ativo = False
+        self.contadores = {'leituras': 0, 'recontagens': 0}
+        self._lock = threading.Lock()
+        self._registrado = False
+
+    def init_app(self, app, db):
+        self.ativo = app.config.get("ESTATISTICAS_CONTADORES", False)
+        if self.ativo and not self._registrado:
+            event.listen(db.session, 'after_flush', self._ao_flush)
+            self._registrado = True
+
+    def linhas(self, usuario_id: int) -> list:
+        """Linhas dos contadores do usuário, recontando se faltarem ou estiverem inválidas"""
+        # Import tardio: este módulo é carregado pelo extensions.py
+        from repository.EstatisticasRepository import EstatisticasRepository
+
+        linhas = EstatisticasRepository.buscar_contadores(usuario_id)
+        # Categoria sem nome no join: foi apagada sem passar pela invalidação
+        if linhas and linhas[0].categoria_id == 0 and all(
+            linha.valido and (linha.categoria_id == 0 or linha.nome is not None) for linha in linhas
+        ):
+            self._contar('leituras')
+            return linhas
+        self._contar('recontagens')
+        return EstatisticasRepository.recontar(usuario_id)
+
+    def invalidar(self, usuario_id) -> None:
+        """Para escritas em lote: o usuário é recontado na próxima leitura"""
+        if self.ativo:
+            from repository.EstatisticasRepository import EstatisticasRepository
+            EstatisticasRepository.invalidar(usuario_id)
+
+    def _ao_flush(self, session, contexto):
+        if not self.ativo:
+            return
+        from model.CategoriaModel import CategoriaModel
+        from model.ProdutoModel import ProdutoModel
+        from repository.EstatisticasRepository import EstatisticasRepository
+
+        novas_categorias, deltas, invalidar = [], {}, set()
+        for objeto in session.new:
+            if isinstance(objeto, CategoriaModel):
+                novas_categorias.append((objeto.usuario_id, objeto.id))
+            elif isinstance(objeto, ProdutoModel):
+                self._somar(deltas, invalidar, inspect(objeto).dict, 1)
+        for objeto in session.deleted:
+            if isinstance(objeto, CategoriaModel):
+                # Os produtos saem pelo ON DELETE CASCADE, sem passar pelo ORM
+                invalidar.add(inspect(objeto).dict.get('usuario_id'))
+            elif isinstance(objeto, ProdutoModel):
+                self._somar(deltas, invalidar, inspect(objeto).dict, -1)
+        for objeto in session.dirty:
+            if isinstance(objeto, ProdutoModel) and session.is_modified(objeto):
+                self._alterar(deltas, invalidar, inspect(objeto))
+
+        if novas_categorias or deltas or invalidar:
+            EstatisticasRepository.aplicar_no_flush(session.connection(), novas_categorias, deltas, invalidar)
+
+    @staticmethod
+    def _somar(deltas, invalidar, valores, sinal):
+        if any(campo not in valores for campo in _CAMPOS):
+            # Atributo expirado: sem o valor gravado não dá para ajustar
+            invalidar.add(valores.get('usuario_id'))
+            return
+        chave = (valores['usuario_id'], valores['categoria_id'] or 0)
+        delta = deltas.setdefault(chave, {
+            'produtos': 0, 'disponiveis': 0, 'soma_precos': Decimal('0'),
+            'novo_min': None, 'novo_max': None, 'removido_min': None, 'removido_max': None,
+        })
+        preco = Decimal(str(valores['preco']))
+        delta['produtos'] += sinal
+        delta['disponiveis'] += sinal if valores['disponivel'] else 0
+        delta['soma_precos'] += sinal * preco
+        minimo, maximo = ('novo_min', 'novo_max') if sinal > 0 else ('removido_min', 'removido_max')
+        delta[minimo] = preco if delta[minimo] is None else min(delta[minimo], preco)
+        delta[maximo] = preco if delta[maximo] is None else max(delta[maximo], preco)
+
+    @staticmethod
+    def _alterar(deltas, invalidar, estado):
+        anteriores, atuais = {}, {}
+        for campo in _CAMPOS:
+            historico = estado.attrs[campo].history
+            if historico.has_changes():
+                if not historico.deleted:
+                    invalidar.add(estado.dict.get('usuario_id'))
+                    return
+                anteriores[campo] = historico.deleted[0]
+            elif campo in estado.dict:
+                anteriores[campo] = estado.dict[campo]
+            if campo in estado.dict:
+                atuais[campo] = estado.dict[campo]
+        if anteriores == atuais:
+            return
+        if anteriores.get('usuario_id') != atuais.get('usuario_id'):
+            invalidar.update((anteriores.get('usuario_id'), atuais.get('usuario_id')))
+            return
+        ContadoresCatalogo._somar(deltas, invalidar, anteriores, -1)
+        ContadoresCatalogo._somar(deltas, invalidar, atuais, 1)
+
+    def _contar(self, chave):
+        with self._lock:
+            self.contadores[chave] += 1
+
+    def stats(self):
+        return {'ativo': self.ativo, **self.contadores}
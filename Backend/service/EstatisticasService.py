@@ -0,0 +1,41 @@
+from decimal import Decimal
+from typing import Dict
+from extensions import contadores_catalogo
+from repository.EstatisticasRepository import EstatisticasRepository
+
+CENTAVOS = Decimal('0.01')
+
+class EstatisticasService:
+
+    @staticmethod
+    def obter(usuario_id: int) -> Dict:
+        """Resumo do catálogo do dashboard: dos contadores, se ligados, ou da consulta agregada"""
+        if contadores_catalogo.ativo:
+            return EstatisticasService.montar(contadores_catalogo.linhas(usuario_id), 'contadores')
+        return EstatisticasService.montar(EstatisticasRepository.agregar(usuario_id), 'agregacao')
+
+    @staticmethod
+    def montar(linhas, fonte: str) -> Dict:
+        """Totais a partir das linhas por categoria (categoria_id 0 = sem categoria)"""
+        total = sum(linha.produtos for linha in linhas)
+        disponiveis = sum(linha.disponiveis for linha in linhas)
+        soma = sum((Decimal(linha.soma_precos) for linha in linhas), Decimal('0'))
+        com_produtos = [linha for linha in linhas if linha.produtos]
+        categorias = sorted((linha for linha in linhas if linha.categoria_id), key=lambda linha: linha.nome)
+
+        return {
+            'total_produtos': total,
+            'disponiveis': disponiveis,
+            'indisponiveis': total - disponiveis,
+            'total_categorias': len(categorias),
+            'produtos_sem_categoria': sum(linha.produtos for linha in linhas if not linha.categoria_id),
+            'preco_minimo': min(linha.preco_min for linha in com_produtos) if com_produtos else None,
+            'preco_medio': (soma / total).quantize(CENTAVOS) if total else None,
+            'preco_maximo': max(linha.preco_max for linha in com_produtos) if com_produtos else None,
+            'por_categoria': [
+                {'id': linha.categoria_id, 'nome': linha.nome,
+                 'total_produtos': linha.produtos, 'disponiveis': linha.disponiveis}
+                for linha in categorias
+            ],
+            'fonte': fonte,
+        }
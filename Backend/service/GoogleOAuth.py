@@ -0,0 +1,58 @@
+import threading
+import time
+from authlib.integrations.flask_client import FlaskOAuth2App, OAuth
+from authlib.integrations.requests_client import OAuth2Session
+from requests.adapters import HTTPAdapter
+
+# Pool de conexões HTTP compartilhado pelas sessões OAuth do processo (o
+# urllib3 é thread-safe): token, JWKS e userinfo reaproveitam o keep-alive
+ADAPTADOR_COMPARTILHADO = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+
+class SessaoOAuthReutilizavel(OAuth2Session):
+    """OAuth2Session que usa o adaptador compartilhado e não o fecha no close()"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mount('https://', ADAPTADOR_COMPARTILHADO)
+        self.mount('http://', ADAPTADOR_COMPARTILHADO)
+
+    def close(self):
+        for prefixo in [p for p, adaptador in self.adapters.items() if adaptador is ADAPTADOR_COMPARTILHADO]:
+            del self.adapters[prefixo]
+        super().close()
+
+
+class GoogleOAuth2App(FlaskOAuth2App):
+    """
+    Cliente OAuth com cache das chaves JWKS em memória: as chaves valem por
+    jwks_ttl segundos e um kid desconhecido força uma nova busca, no máximo
+    uma a cada jwks_intervalo_minimo segundos (evita uma busca por token forjado).
+    """
+    client_cls = SessaoOAuthReutilizavel
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jwks_ttl = 3600
+        self.jwks_intervalo_minimo = 30
+        self._jwks_buscado_em = None
+        self._jwks_forcado_em = None
+        self._jwks_lock = threading.Lock()
+
+    def fetch_jwk_set(self, force=False):
+        with self._jwks_lock:
+            agora = time.monotonic()
+            jwks = self.server_metadata.get('jwks')
+            expirado = jwks is None or self._jwks_buscado_em is None or agora - self._jwks_buscado_em >= self.jwks_ttl
+            if force and self._jwks_forcado_em is not None and agora - self._jwks_forcado_em < self.jwks_intervalo_minimo:
+                force = False
+            if not (expirado or force):
+                return jwks
+            jwks = super().fetch_jwk_set(force=True)
+            self._jwks_buscado_em = agora
+            if force:
+                self._jwks_forcado_em = agora
+            return jwks
+
+
+class OAuthReutilizavel(OAuth):
+    oauth2_client_cls = GoogleOAuth2App
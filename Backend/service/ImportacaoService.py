@@ -0,0 +1,194 @@
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, Tuple
+from extensions import db
+from model.ProdutoModel import ProdutoModel
+from model.CategoriaModel import CategoriaModel
+from repository.ProdutoRepository import ProdutoRepository
+
+FORMATOS = ('csv', 'ndjson')
+CAMPOS_EXPORTACAO = ['id', 'nome', 'preco', 'quantidade', 'disponivel', 'descricao', 'categoria_id', 'categoria_nome']
+VALORES_VERDADEIROS = ('1', 'true', 'sim', 's', 'yes', 'y')
+
+class LinhaInvalida(ValueError):
+    pass
+
+class ImportacaoService:
+
+    @staticmethod
+    def ler_linhas(stream, formato: str) -> Iterator[Tuple[int, Dict]]:
+        """Lê o upload sob demanda, devolvendo (número da linha, dados) ou (número, LinhaInvalida)"""
+        if formato == 'csv':
+            texto = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+            leitor = csv.DictReader(texto)
+            for registro in leitor:
+                yield leitor.line_num, registro
+        else:
+            for numero, linha in enumerate(stream, start=1):
+                try:
+                    linha = linha.decode('utf-8').strip()
+                except UnicodeDecodeError:
+                    yield numero, LinhaInvalida("Linha não está codificada em UTF-8")
+                    continue
+                if not linha:
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except ValueError as e:
+                    yield numero, LinhaInvalida(f"JSON inválido: {e}")
+                    continue
+                if not isinstance(registro, dict):
+                    yield numero, LinhaInvalida("Cada linha deve ser um objeto JSON")
+                    continue
+                yield numero, registro
+
+    @staticmethod
+    def _carregar_categorias(usuario_id: int) -> Tuple[set, Dict[str, int]]:
+        """Pré-carrega ids e nomes das categorias do usuário em uma única consulta"""
+        linhas = db.session.query(CategoriaModel.id, CategoriaModel.nome).filter_by(usuario_id=usuario_id).all()
+        return {linha.id for linha in linhas}, {linha.nome.strip().lower(): linha.id for linha in linhas}
+
+    @staticmethod
+    def _texto(registro: Dict, *campos: str) -> str:
+        """Primeiro campo de texto preenchido; no NDJSON o valor pode vir com outro tipo"""
+        for campo in campos:
+            valor = registro.get(campo)
+            if valor is None:
+                continue
+            if not isinstance(valor, str):
+                raise LinhaInvalida(f"Campo '{campo}' deve ser texto")
+            if valor.strip():
+                return valor.strip()
+        return ''
+
+    @staticmethod
+    def _montar_produto(registro: Dict, usuario_id: int, ids_categorias: set, nomes_categorias: Dict[str, int]) -> ProdutoModel:
+        nome = ImportacaoService._texto(registro, 'nome')
+        if not nome:
+            raise LinhaInvalida("Campo 'nome' é obrigatório")
+
+        try:
+            preco = Decimal(str(registro.get('preco')).strip().replace(',', '.'))
+            if not preco.is_finite():
+                raise InvalidOperation
+        except (InvalidOperation, ValueError):
+            raise LinhaInvalida("Preço deve ser um número válido")
+
+        categoria_id = registro.get('categoria_id')
+        if categoria_id not in (None, ''):
+            try:
+                categoria_id = int(categoria_id)
+            except (TypeError, ValueError):
+                raise LinhaInvalida("'categoria_id' deve ser um número inteiro")
+            if categoria_id not in ids_categorias:
+                raise LinhaInvalida(f"Categoria com ID {categoria_id} não encontrada")
+        else:
+            nome_categoria = ImportacaoService._texto(registro, 'categoria', 'categoria_nome')
+            if not nome_categoria:
+                raise LinhaInvalida("Informe 'categoria_id' ou 'categoria'")
+            categoria_id = nomes_categorias.get(nome_categoria.lower())
+            if categoria_id is None:
+                raise LinhaInvalida(f"Categoria '{nome_categoria}' não encontrada")
+
+        quantidade = registro.get('quantidade')
+        try:
+            quantidade = int(quantidade) if quantidade not in (None, '') else 0
+        except (TypeError, ValueError):
+            raise LinhaInvalida("'quantidade' deve ser um número inteiro")
+
+        disponivel = registro.get('disponivel', True)
+        if isinstance(disponivel, str):
+            disponivel = disponivel.strip().lower() in VALORES_VERDADEIROS if disponivel.strip() else True
+
+        return ProdutoModel(
+            nome=nome,
+            preco=preco,
+            quantidade=quantidade,
+            disponivel=bool(disponivel),
+            descricao=ImportacaoService._texto(registro, 'descricao'),
+            categoria_id=categoria_id,
+            usuario_id=usuario_id
+        )
+
+    @staticmethod
+    def importar(usuario_id: int, linhas: Iterable[Tuple[int, Dict]], tamanho_lote: int = 500) -> Dict:
+        """Insere os produtos em transações de até `tamanho_lote` linhas, reportando erros por linha"""
+        ids_categorias, nomes_categorias = ImportacaoService._carregar_categorias(usuario_id)
+        importados = 0
+        erros = []
+        lote = []
+
+        def gravar_lote():
+            nonlocal importados
+            try:
+                db.session.add_all([produto for _, produto in lote])
+                db.session.commit()
+                importados += len(lote)
+            except Exception:
+                # Refaz o lote linha a linha para descobrir quais linhas falharam
+                db.session.rollback()
+                for numero, produto in lote:
+                    try:
+                        db.session.add(produto)
+                        db.session.commit()
+                        importados += 1
+                    except Exception as e:
+                        db.session.rollback()
+                        erros.append({'linha': numero, 'erro': str(e.__cause__ or e)})
+            # Tira os produtos gravados do identity map para manter a memória constante
+            for _, produto in lote:
+                if produto in db.session:
+                    db.session.expunge(produto)
+            lote.clear()
+
+        try:
+            for numero, registro in linhas:
+                if isinstance(registro, LinhaInvalida):
+                    erros.append({'linha': numero, 'erro': str(registro)})
+                    continue
+                try:
+                    produto = ImportacaoService._montar_produto(registro, usuario_id, ids_categorias, nomes_categorias)
+                except LinhaInvalida as e:
+                    erros.append({'linha': numero, 'erro': str(e)})
+                    continue
+                lote.append((numero, produto))
+                if len(lote) >= tamanho_lote:
+                    gravar_lote()
+        except (UnicodeDecodeError, csv.Error) as e:
+            # O CSV não pode continuar após um erro de leitura; grava o que já foi lido
+            erros.append({'linha': None, 'erro': f"Falha ao ler o arquivo: {e}"})
+
+        if lote:
+            gravar_lote()
+
+        return {'importados': importados, 'erros': erros}
+
+    @staticmethod
+    def exportar(usuario_id: int, formato: str) -> Iterator[str]:
+        """Gera o catálogo do usuário em blocos, sem montar tudo em memória"""
+        linhas = ProdutoRepository.iter_by_usuario(usuario_id, campos=CAMPOS_EXPORTACAO)
+
+        if formato == 'csv':
+            buffer = io.StringIO()
+            escritor = csv.writer(buffer)
+            escritor.writerow(CAMPOS_EXPORTACAO)
+            for i, linha in enumerate(linhas, start=1):
+                escritor.writerow(linha)
+                if i % 500 == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            bloco = []
+            for linha in linhas:
+                registro = linha._asdict()
+                registro['preco'] = float(registro['preco'])
+                bloco.append(json.dumps(registro, ensure_ascii=False))
+                if len(bloco) == 500:
+                    yield '\n'.join(bloco) + '\n'
+                    bloco = []
+            if bloco:
+                yield '\n'.join(bloco) + '\n'
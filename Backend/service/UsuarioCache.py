@@ -0,0 +1,26 @@
+from service.CardapioCache import CacheContado, MemoriaCacheBackend
+
+class UsuarioCache(CacheContado):
+    """
+    Identidade do usuário logado por id, para o user_loader não consultar o
+    banco a cada requisição. Fica em memória do worker: o TTL curto limita o
+    tempo em que outros workers veem dados antigos após uma alteração.
+    """
+
+    def init_app(self, app):
+        self.backend = MemoriaCacheBackend(
+            max_itens=int(app.config.get("USUARIO_CACHE_MAX_ITENS", 1024)),
+            ttl=int(app.config.get("USUARIO_CACHE_TTL", 60))
+        )
+
+    def carregar(self, usuario_id: int):
+        return self.obter(usuario_id, lambda: UsuarioCache._buscar(usuario_id))
+
+    @staticmethod
+    def _buscar(usuario_id: int):
+        # Import tardio: este módulo é carregado pelo extensions.py
+        from extensions import db
+        from model.UserModel import UsuarioModel, UsuarioAutenticado
+
+        usuario = db.session.get(UsuarioModel, usuario_id)
+        return UsuarioAutenticado.de_modelo(usuario) if usuario else None
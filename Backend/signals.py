@@ -0,0 +1,10 @@
+from blinker import Namespace
+from flask import current_app
+
+_sinais = Namespace()
+
+# Emitido sempre que produtos ou categorias de um usuário são alterados
+catalogo_alterado = _sinais.signal('catalogo-alterado')
+
+def notificar_alteracao_catalogo(usuario_id):
+    catalogo_alterado.send(current_app._get_current_object(), usuario_id=usuario_id)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+# Permite importar os módulos da aplicação ao rodar `python -m pytest tests` no Backend
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """App em um SQLite temporário com o usuário 1, 3 categorias e 30 produtos"""
+    pasta = tmp_path_factory.mktemp('app')
+    mp = pytest.MonkeyPatch()
+    mp.setenv('DATABASE_URL', f'sqlite:///{pasta}/teste.db')
+    mp.setenv('CARDAPIO_PUBLICO_DIR', str(pasta / 'cardapios'))
+    mp.setenv('LOG_LEVEL', 'ERROR')
+    mp.delenv('CARDAPIO_CACHE_URL', raising=False)
+    mp.delenv('DATABASE_REPLICA_URLS', raising=False)
+
+    from Main import create_app
+    from extensions import db
+    from model.UserModel import UsuarioModel
+    from model.CategoriaModel import CategoriaModel
+    from model.ProdutoModel import ProdutoModel
+    from model.CatalogoVersaoModel import CatalogoVersaoModel  # noqa: F401 (tabela usada pelo ETag)
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(UsuarioModel.__table__.insert(), [{'id': 1, 'nome': 'Teste', 'email': 'teste@teste.local'}])
+        db.session.execute(CategoriaModel.__table__.insert(), [
+            {'id': c, 'nome': f'Categoria {c}', 'usuario_id': 1} for c in range(1, 4)
+        ])
+        db.session.execute(ProdutoModel.__table__.insert(), [
+            {'nome': f'Produto {i}', 'preco': 10, 'quantidade': i, 'disponivel': i % 2 == 0,
+             'categoria_id': i % 3 + 1, 'usuario_id': 1}
+            for i in range(30)
+        ])
+        db.session.commit()
+    yield app
+    mp.undo()
+
+
+@pytest.fixture
+def cliente(app):
+    """Test client logado como o usuário 1"""
+    cliente = app.test_client()
+    with cliente.session_transaction() as sessao:
+        sessao['_user_id'] = '1'
+        sessao['_fresh'] = True
+    return cliente
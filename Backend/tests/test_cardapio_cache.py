@@ -0,0 +1,80 @@
+"""
+Cache do cardápio em memória com vários workers: uma escrita feita em outro
+worker não limpa o cache deste, mas muda a versão do catálogo no banco, e o
+cardápio guardado com a versão antiga não pode sair sob o ETag novo.
+"""
+import asyncio
+import threading
+
+
+def _escrita_em_outro_worker(app, produto_id, nome):
+    """Altera o banco e a versão sem emitir catalogo_alterado neste processo"""
+    from extensions import db
+    from model.ProdutoModel import ProdutoModel
+    from repository.CatalogoVersaoRepository import CatalogoVersaoRepository
+
+    with app.app_context():
+        db.session.execute(db.update(ProdutoModel).where(ProdutoModel.id == produto_id).values(nome=nome))
+        db.session.commit()
+        CatalogoVersaoRepository.incrementar(1)
+
+
+def _nomes(cardapio):
+    return {produto['nome'] for categoria in cardapio['categorias'].values()
+            for lista in categoria.values() for produto in lista}
+
+
+def test_cardapio_nao_e_servido_do_cache_com_versao_antiga(app, cliente):
+    antes = cliente.get('/api/produtos/cardapio')
+    _escrita_em_outro_worker(app, 1, 'Renomeado em outro worker')
+
+    depois = cliente.get('/api/produtos/cardapio', headers={'If-None-Match': antes.headers['ETag']})
+
+    assert depois.status_code == 200
+    assert depois.headers['ETag'] != antes.headers['ETag']
+    assert 'Renomeado em outro worker' in _nomes(depois.get_json())
+
+
+def test_pagina_do_cardapio_reconstroi_com_versao_nova(app, cliente):
+    cliente.get('/cardapio')
+    _escrita_em_outro_worker(app, 2, 'Página atualizada')
+
+    assert 'Página atualizada' in cliente.get('/cardapio').get_data(as_text=True)
+
+
+class _BackendDeRede:
+    """Backend que, como o Redis, bloqueia: guarda a thread de cada chamada"""
+
+    def __init__(self):
+        self.itens = {}
+        self.threads = []
+
+    def get(self, chave):
+        self.threads.append(threading.get_ident())
+        return self.itens.get(chave)
+
+    def set(self, chave, valor):
+        self.threads.append(threading.get_ident())
+        self.itens[chave] = valor
+
+
+def test_obter_async_nao_bloqueia_o_event_loop():
+    from service.CardapioCache import CacheContado
+
+    backend = _BackendDeRede()
+    cache = CacheContado(backend)
+
+    async def construtor():
+        return {'ok': True}
+
+    async def duas_leituras():
+        loop = threading.get_ident()
+        primeira = await cache.obter_async(1, construtor, versao=3)
+        segunda = await cache.obter_async(1, construtor, versao=3)
+        return loop, primeira, segunda
+
+    loop, primeira, segunda = asyncio.run(duas_leituras())
+
+    assert primeira == segunda == {'ok': True}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(backend.threads) == 3 and loop not in backend.threads
@@ -0,0 +1,115 @@
+"""
+Cardápio público: só existe para quem publicou, é endereçado por um slug não
+adivinhável e a rota pública só serve o snapshot em disco, sem consultar o
+banco (a geração fica com a thread de CardapioPublico).
+
+    python -m pytest tests
+"""
+import time
+
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def consultas(app):
+    """Todo SQL emitido durante o teste"""
+    from extensions import db
+
+    emitidas = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        emitidas.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', contar)
+    yield emitidas
+    event.remove(engine, 'before_cursor_execute', contar)
+
+
+@pytest.fixture
+def slug_publicado(app, cliente):
+    """Publica o cardápio do usuário 1 e espera o snapshot; despublica no fim"""
+    from extensions import cardapio_publico
+    from repository.UsuarioRepository import UsuarioRepository
+
+    cliente.post('/cardapio/publicar')
+    with app.app_context():
+        _, slug = UsuarioRepository.publicacao_cardapio(1)
+    assert _esperar(lambda: cardapio_publico.caminho(slug).exists())
+    yield slug
+    cliente.post('/cardapio/despublicar')
+
+
+def _esperar(condicao, segundos=5):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        if condicao():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.mark.parametrize('slug', ['1', 'A' * 22, '..%2F..%2Fetc'])
+def test_slug_desconhecido_404_sem_consultar_o_banco(app, consultas, slug):
+    resposta = app.test_client().get(f'/cardapio/{slug}')
+
+    assert resposta.status_code == 404
+    assert consultas == []
+
+
+def test_cardapio_publicado(app, slug_publicado, consultas):
+    resposta = app.test_client().get(f'/cardapio/{slug_publicado}', headers={'Accept-Encoding': 'gzip'})
+
+    assert resposta.status_code == 200
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert consultas == []
+
+
+def test_despublicar_tira_o_cardapio_do_ar(app, cliente, slug_publicado):
+    cliente.post('/cardapio/despublicar')
+
+    assert app.test_client().get(f'/cardapio/{slug_publicado}').status_code == 404
+
+
+def test_snapshot_ausente_e_gerado_em_segundo_plano(app, slug_publicado):
+    from extensions import cardapio_publico
+
+    cardapio_publico.remover(slug_publicado)
+
+    assert app.test_client().get(f'/cardapio/{slug_publicado}').status_code == 404
+    assert _esperar(lambda: cardapio_publico.caminho(slug_publicado).exists())
+    assert app.test_client().get(f'/cardapio/{slug_publicado}').status_code == 200
+
+
+def test_despublicar_no_meio_da_geracao_nao_deixa_o_snapshot(app, slug_publicado, monkeypatch):
+    from extensions import cardapio_publico
+    from repository.UsuarioRepository import UsuarioRepository
+    from service.CardapioService import CardapioService
+
+    montar = CardapioService.montar_cardapio_primario
+
+    def despublicar_no_meio(usuario_id):
+        # Outro worker: despublica e apaga o arquivo enquanto esta geração monta o HTML
+        with app.app_context():
+            UsuarioRepository.publicar_cardapio(usuario_id, False)
+        cardapio_publico.remover(slug_publicado)
+        return montar(usuario_id)
+
+    monkeypatch.setattr(CardapioService, 'montar_cardapio_primario', despublicar_no_meio)
+    cardapio_publico.gerar(1)
+
+    assert not cardapio_publico.caminho(slug_publicado).exists()
+    assert not cardapio_publico.caminho(slug_publicado, comprimido=True).exists()
+
+
+def test_geracao_de_despublicado_apaga_o_snapshot(app, slug_publicado):
+    from extensions import cardapio_publico
+    from repository.UsuarioRepository import UsuarioRepository
+
+    with app.app_context():
+        UsuarioRepository.publicar_cardapio(1, False)
+    cardapio_publico.gerar(1)
+
+    assert not cardapio_publico.caminho(slug_publicado).exists()
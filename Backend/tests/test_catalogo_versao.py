@@ -0,0 +1,55 @@
+"""
+Versão do catálogo (ETag) gravada na mesma transação da escrita: se a versão
+não sobe, os dados também não são gravados, e um GET condicional nunca
+responde 304 com o cardápio de antes de um commit.
+
+    python -m pytest tests
+"""
+import pytest
+
+
+def _versao(app):
+    from repository.CatalogoVersaoRepository import CatalogoVersaoRepository
+
+    with app.app_context():
+        return CatalogoVersaoRepository.buscar(1)[0]
+
+
+def _produtos(app):
+    from extensions import db
+    from model.ProdutoModel import ProdutoModel
+
+    with app.app_context():
+        return db.session.execute(db.select(db.func.count(ProdutoModel.id))).scalar()
+
+
+NOVO = {'nome': 'Produto versionado', 'preco': '5.00', 'categoria_id': 1}
+
+
+@pytest.mark.parametrize('requisicao', [
+    lambda c: c.post('/api/produtos/', json=NOVO),
+    lambda c: c.patch('/api/produtos/', json={'alteracoes': [{'id': 2, 'quantidade': 9}]}),
+    lambda c: c.put('/api/categorias/2', json={'nome': 'Categoria 2', 'descricao': 'Nova'}),
+])
+def test_escrita_sobe_a_versao_uma_vez(app, cliente, requisicao):
+    antes = _versao(app)
+
+    assert requisicao(cliente).status_code in (200, 201)
+
+    assert _versao(app) == antes + 1
+
+
+def test_falha_ao_subir_a_versao_desfaz_a_escrita(app, cliente, monkeypatch):
+    from repository.CatalogoVersaoRepository import CatalogoVersaoRepository
+
+    def falhar(sessao, usuario_id):
+        raise RuntimeError('versão indisponível')
+
+    etag = cliente.get('/api/produtos/cardapio').headers['ETag']
+    produtos = _produtos(app)
+    monkeypatch.setattr(CatalogoVersaoRepository, 'incrementar_na_transacao', falhar)
+
+    assert cliente.post('/api/produtos/', json=NOVO).status_code == 500
+
+    assert _produtos(app) == produtos
+    assert cliente.get('/api/produtos/cardapio', headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,55 @@
+"""
+Número de consultas ao catálogo por rota do cardápio: com o cache vazio,
+/cardapio e /api/produtos/cardapio montam o cardápio com uma única consulta
+(produtos + categorias); com o cache quente, nenhuma.
+
+    python -m pytest tests
+"""
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def consultas_catalogo(app):
+    """SQL emitido que lê produtos ou categorias durante o teste"""
+    from extensions import db
+
+    emitidas = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        if 'produtos' in statement or 'categorias' in statement:
+            emitidas.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', contar)
+    yield emitidas
+    event.remove(engine, 'before_cursor_execute', contar)
+
+
+@pytest.fixture
+def cliente(cliente):
+    """Cliente logado, com o cardápio do usuário fora do cache"""
+    from extensions import cardapio_cache
+
+    cardapio_cache.invalidar(1)
+    return cliente
+
+
+@pytest.mark.parametrize('rota', ['/cardapio', '/api/produtos/cardapio'])
+def test_cardapio_uma_consulta_ao_catalogo(cliente, consultas_catalogo, rota):
+    resposta = cliente.get(rota)
+
+    assert resposta.status_code == 200
+    assert len(consultas_catalogo) == 1, consultas_catalogo
+
+
+@pytest.mark.parametrize('rota', ['/cardapio', '/api/produtos/cardapio'])
+def test_cardapio_em_cache_nao_consulta_o_catalogo(cliente, consultas_catalogo, rota):
+    cliente.get(rota)
+    consultas_catalogo.clear()
+
+    resposta = cliente.get(rota)
+
+    assert resposta.status_code == 200
+    assert consultas_catalogo == []
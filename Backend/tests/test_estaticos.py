@@ -0,0 +1,53 @@
+"""
+Variantes pré-comprimidas dos estáticos: o .gz só é servido se não for mais
+antigo que o original, senão a URL com o hash novo ficaria um ano em cache
+com o conteúdo antigo.
+
+    python -m pytest tests
+"""
+import gzip
+import os
+
+import pytest
+from flask import Flask, url_for
+
+
+@pytest.fixture
+def estatico(tmp_path):
+    from estaticos import configurar_estaticos
+
+    app = Flask(__name__, static_folder=str(tmp_path))
+    app.config['JSON_GZIP_MINIMO'] = 0
+    configurar_estaticos(app)
+
+    original = tmp_path / 'app.css'
+    original.write_bytes(b'body { color: red }')
+    (tmp_path / 'app.css.gz').write_bytes(gzip.compress(original.read_bytes()))
+    return app, original
+
+
+def _pedir(app):
+    with app.test_request_context():
+        url = url_for('static', filename='app.css')
+    return app.test_client().get(url, headers={'Accept-Encoding': 'gzip'})
+
+
+def test_serve_o_gz_atualizado(estatico):
+    app, _ = estatico
+
+    resposta = _pedir(app)
+
+    assert resposta.headers.get('Content-Encoding') == 'gzip'
+    assert resposta.cache_control.immutable
+
+
+def test_gz_mais_antigo_que_o_original_e_ignorado(estatico):
+    app, original = estatico
+    original.write_bytes(b'body { color: blue }')
+    gz = original.with_name('app.css.gz')
+    os.utime(gz, (os.path.getmtime(original) - 10,) * 2)
+
+    resposta = _pedir(app)
+
+    assert 'Content-Encoding' not in resposta.headers
+    assert resposta.get_data() == b'body { color: blue }'
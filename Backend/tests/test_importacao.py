@@ -0,0 +1,28 @@
+"""Importação NDJSON com valores de tipo errado: a linha vira erro, as demais são gravadas"""
+import io
+import json
+
+import pytest
+
+
+def _ndjson(*registros):
+    return io.BytesIO('\n'.join(json.dumps(registro) for registro in registros).encode())
+
+
+@pytest.mark.parametrize('campo, valor', [
+    ('nome', 123),
+    ('nome', ['lista']),
+    ('categoria', 7),
+    ('descricao', {'texto': 'objeto'}),
+])
+def test_campo_de_texto_com_outro_tipo_e_erro_da_linha(cliente, campo, valor):
+    valido = {'nome': 'Importado', 'preco': '5.00', 'quantidade': 1, 'categoria': 'Categoria 1'}
+    invalido = dict(valido, **{campo: valor})
+
+    resposta = cliente.post('/api/produtos/importar?formato=ndjson',
+                            data={'arquivo': (_ndjson(invalido, valido), 'produtos.ndjson')})
+
+    assert resposta.status_code == 201
+    corpo = resposta.get_json()
+    assert corpo['importados'] == 1
+    assert corpo['erros'] == [{'linha': 1, 'erro': f"Campo '{campo}' deve ser texto"}]
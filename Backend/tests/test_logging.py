@@ -0,0 +1,27 @@
+"""
+Logging em fila: cada create_app() substitui o QueueListener anterior em vez
+de acumular threads e handlers na raiz.
+
+    python -m pytest tests
+"""
+import logging
+
+from flask import Flask
+
+
+def _app():
+    app = Flask(__name__)
+    app.config.update(LOG_FORMAT='texto', LOG_AMOSTRAGEM='', LOG_LEVEL='INFO')
+    return app
+
+
+def test_reconfigurar_substitui_o_listener():
+    from logging_config import HandlerFila, configurar_logging
+
+    primeiro = configurar_logging(_app())
+    segundo = configurar_logging(_app())
+
+    assert primeiro._thread is None
+    assert segundo._thread is not None and segundo._thread.is_alive()
+    filas = [h for h in logging.getLogger().handlers if isinstance(h, HandlerFila)]
+    assert len(filas) == 1 and filas[0].queue is segundo.queue
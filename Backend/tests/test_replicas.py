@@ -0,0 +1,95 @@
+"""
+Leitura das próprias escritas com réplicas e cache em memória por worker: o
+horário da escrita vai no cookie de sessão, então outro worker (outro
+RoteadorReplicas, sem a marca em memória) também lê do primário. E o que vai
+para o cache é montado no primário, assim como os contadores do dashboard
+são lidos de onde a recontagem grava. As rotas que escrevem carregam do
+primário as linhas que vão alterar.
+
+    python -m pytest tests
+"""
+from flask import session
+
+REPLICA = object()
+
+
+def _roteador():
+    """Roteador de um worker com uma réplica e a janela de escrita em memória vazia"""
+    from replicas import RoteadorReplicas
+
+    roteador = RoteadorReplicas()
+    roteador.engines = [REPLICA]
+    roteador.janela = 5
+    return roteador
+
+
+def test_escrita_recente_no_cookie_le_do_primario_em_outro_worker(app):
+    from extensions import db
+
+    with app.test_request_context():
+        _roteador().registrar_escrita(1)
+        cookie = dict(session)
+
+    outro_worker = _roteador()
+    with app.app_context():
+        with app.test_request_context():
+            session.update(cookie)
+            assert outro_worker.engine_leitura(db.session, 1) is None
+        with app.test_request_context():
+            assert outro_worker.engine_leitura(db.session, 1) is REPLICA
+
+
+def test_cache_do_cardapio_e_montado_no_primario(app, monkeypatch):
+    from extensions import cardapio_cache, roteador_replicas
+    from service.CardapioService import CardapioService
+
+    perguntas = []
+
+    def engine_leitura(sessao, usuario_id=None):
+        perguntas.append(usuario_id)
+        return None
+
+    monkeypatch.setattr(roteador_replicas, 'engines', [REPLICA])
+    monkeypatch.setattr(roteador_replicas, 'engine_leitura', engine_leitura)
+    cardapio_cache.invalidar(1)
+
+    with app.app_context():
+        CardapioService.obter_cardapio(1)
+
+    # Só a versão do catálogo pode vir da réplica; o cardápio guardado, não
+    assert perguntas == [1]
+
+
+def test_contadores_sao_lidos_do_primario(app, monkeypatch):
+    from extensions import roteador_replicas
+    from repository.EstatisticasRepository import EstatisticasRepository
+
+    perguntas = []
+    monkeypatch.setattr(roteador_replicas, 'engines', [REPLICA])
+    monkeypatch.setattr(roteador_replicas, 'engine_leitura', lambda sessao, usuario_id=None: perguntas.append(1))
+
+    with app.app_context():
+        EstatisticasRepository.recontar(1)
+        linhas = EstatisticasRepository.buscar_contadores(1)
+
+    assert linhas and all(linha.valido for linha in linhas)
+    assert perguntas == []
+
+
+def test_escritas_nao_leem_da_replica(app, cliente, monkeypatch):
+    from extensions import roteador_replicas
+
+    perguntas = []
+    monkeypatch.setattr(roteador_replicas, 'engines', [REPLICA])
+    monkeypatch.setattr(roteador_replicas, 'engine_leitura',
+                        lambda sessao, usuario_id=None: perguntas.append(sessao.info.get('escreveu')))
+
+    assert cliente.put('/api/produtos/3', json={'quantidade': 7}).status_code == 200
+    resposta = cliente.patch('/api/produtos/', json={'alteracoes': [
+        {'id': 3, 'quantidade': 3}, {'id': 999, 'quantidade': 1}]})
+    assert [r['status'] for r in resposta.get_json()['resultados']] == ['atualizado', 'nao_encontrado']
+    assert cliente.post('/api/categorias/', json={'nome': 'Categoria 1'}).status_code == 409
+    assert cliente.put('/api/categorias/1', json={'nome': 'Categoria 1'}).status_code == 200
+    assert cliente.delete('/api/produtos/999').status_code == 404
+
+    assert perguntas == []
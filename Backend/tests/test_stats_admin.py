@@ -0,0 +1,23 @@
+"""/api/stats/* expõe métricas de todos os tenants: só administradores acessam"""
+import pytest
+
+ROTAS = ['/api/stats/cache', '/api/stats/cache/usuarios', '/api/stats/pool', '/api/stats/endpoints',
+         '/api/stats/cardapio-publico', '/api/stats/replicas', '/api/stats/contadores']
+
+
+@pytest.mark.parametrize('rota', ROTAS)
+def test_usuario_comum_recebe_403(app, cliente, monkeypatch, rota):
+    monkeypatch.setitem(app.config, 'ADMIN_USUARIO_IDS', set())
+
+    assert cliente.get(rota).status_code == 403
+
+
+@pytest.mark.parametrize('rota', ROTAS)
+def test_administrador_acessa(app, cliente, monkeypatch, rota):
+    monkeypatch.setitem(app.config, 'ADMIN_USUARIO_IDS', {1})
+
+    assert cliente.get(rota).status_code == 200
+
+
+def test_anonimo_vai_para_o_login(app):
+    assert app.test_client().get('/api/stats/endpoints').status_code == 302